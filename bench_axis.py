@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import re
+import sys
+import logging
+import json
+import time
+import argparse
+
+from migen import *
+
+from litex.build.sim.verilator import verilator_build_args, verilator_build_argdict
+
+from litex.soc.integration.soc_core import *
+from litex.soc.interconnect.axi import *
+
+from verilog_axis.axis_common import *
+
+from sim.runner import run_sim, run_parallel
+
+from test_axis import Platform
+
+# Duty Cycle ---------------------------------------------------------------------------------------
+
+class DutyCycle(Module):
+    def __init__(self, duty=100, period=100):
+        assert 0 <= duty <= 100
+        self.o = Signal()
+
+        # # #
+
+        count = Signal(max=period)
+        self.sync += [
+            count.eq(count + 1),
+            If(count == (period - 1),
+                count.eq(0)
+            )
+        ]
+        self.comb += self.o.eq(count < (duty*period)//100)
+
+# AXIS Bench Generator -----------------------------------------------------------------------------
+
+# Generates beats with the current cycle as timestamp (replicated over the data width) and a valid
+# duty cycle. Data/Valid are only updated when the beat is accepted (or not presented) to respect
+# AXI-Stream rules, the timestamp is the cycle the beat is first presented on the interface.
+
+class AXISBenchGenerator(Module):
+    def __init__(self, axis, timestamp, duty=100):
+        data_width = len(axis.data)
+        ts_width   = min(len(timestamp), data_width)
+
+        # # #
+
+        self.submodules.duty = duty = DutyCycle(duty)
+        self.sync += If(~axis.valid | axis.ready,
+            axis.valid.eq(duty.o),
+            axis.data.eq(Replicate(timestamp[:ts_width], (data_width + ts_width - 1)//ts_width)),
+        )
+        self.comb += axis.keep.eq(2**len(axis.keep) - 1)
+
+# AXIS Bench Checker -------------------------------------------------------------------------------
+
+# Consumes beats with a ready duty cycle and measures beats, first-beat latency, max (tail) latency
+# and accumulated latency from the timestamp of each beat.
+
+class AXISBenchChecker(Module):
+    def __init__(self, axis, timestamp, duty=100):
+        ts_width = min(len(timestamp), len(axis.data))
+        ts_mask  = 2**ts_width - 1
+
+        self.beats         = Signal(32)
+        self.first_latency = Signal(32)
+        self.max_latency   = Signal(32)
+        self.sum_latency   = Signal(64)
+        self.first_cycle   = Signal(32)
+
+        # # #
+
+        self.submodules.duty = duty = DutyCycle(duty)
+        self.comb += axis.ready.eq(duty.o)
+
+        latency = Signal(32)
+        self.comb += latency.eq((timestamp - axis.data[:ts_width]) & ts_mask)
+        self.sync += If(axis.valid & axis.ready,
+            self.beats.eq(self.beats + 1),
+            self.sum_latency.eq(self.sum_latency + latency),
+            If(self.beats == 0,
+                self.first_latency.eq(latency),
+                self.first_cycle.eq(timestamp),
+            ),
+            If(latency > self.max_latency,
+                self.max_latency.eq(latency)
+            )
+        )
+
+# AXIS Benches -------------------------------------------------------------------------------------
+
+# Each bench instantiates a single wrapper configuration in the SoC and returns the (s_axis, m_axis)
+# interfaces to drive/measure. Other ports of multi-ports wrappers are left idle.
+
+axis_benches = {}
+
+def axis_bench(name, **config):
+    def decorator(func):
+        axis_benches[name] = (func, config)
+        return func
+    return decorator
+
+for _reg_type in [0, 1, 2]:
+    @axis_bench(f"axis_register_reg_type{_reg_type}", reg_type=_reg_type)
+    def axis_register_bench(soc, platform, reg_type):
+        from verilog_axis.axis_register import AXISRegister
+        s_axis = AXIStreamInterface(data_width=32)
+        m_axis = AXIStreamInterface(data_width=32)
+        soc.submodules.axis_register = AXISRegister(platform, s_axis, m_axis, reg_type=reg_type)
+        return s_axis, m_axis
+
+@axis_bench("axis_srl_register")
+def axis_srl_register_bench(soc, platform):
+    from verilog_axis.axis_srl_register import AXISSRLRegister
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_srl_register = AXISSRLRegister(platform, s_axis, m_axis)
+    return s_axis, m_axis
+
+for _pipeline_output in [1, 2, 3]:
+    @axis_bench(f"axis_fifo_pipeline_output{_pipeline_output}", depth=1024, pipeline_output=_pipeline_output)
+    def axis_fifo_bench(soc, platform, depth, pipeline_output):
+        from verilog_axis.axis_fifo import AXISFIFO
+        s_axis = AXIStreamInterface(data_width=32)
+        m_axis = AXIStreamInterface(data_width=32)
+        soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis,
+            depth           = depth,
+            pipeline_output = pipeline_output,
+        )
+        return s_axis, m_axis
+
+@axis_bench("axis_srl_fifo", depth=16)
+def axis_srl_fifo_bench(soc, platform, depth):
+    from verilog_axis.axis_srl_fifo import AXISSRLFIFO
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_srl_fifo = AXISSRLFIFO(platform, s_axis, m_axis, depth=depth)
+    return s_axis, m_axis
+
+@axis_bench("axis_async_fifo", depth=1024)
+def axis_async_fifo_bench(soc, platform, depth):
+    from verilog_axis.axis_async_fifo import AXISAsyncFIFO
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_async_fifo = AXISAsyncFIFO(platform, s_axis, m_axis, depth=depth)
+    return s_axis, m_axis
+
+for _s_data_width, _m_data_width, _direction in [(32, 64, "up"), (64, 32, "down")]:
+    @axis_bench(f"axis_adapter_{_direction}", s_data_width=_s_data_width, m_data_width=_m_data_width)
+    def axis_adapter_bench(soc, platform, s_data_width, m_data_width):
+        from verilog_axis.axis_adapter import AXISAdapter
+        s_axis = AXIStreamInterface(data_width=s_data_width)
+        m_axis = AXIStreamInterface(data_width=m_data_width)
+        soc.submodules.axis_adapter = AXISAdapter(platform, s_axis, m_axis)
+        return s_axis, m_axis
+
+@axis_bench("axis_rate_limit")
+def axis_rate_limit_bench(soc, platform):
+    from verilog_axis.axis_rate_limit import AXISRateLimit
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_rate_limit = AXISRateLimit(platform, s_axis, m_axis)
+    return s_axis, m_axis
+
+@axis_bench("axis_broadcast")
+def axis_broadcast_bench(soc, platform):
+    from verilog_axis.axis_broadcast import AXISBroadcast
+    s_axis  = AXIStreamInterface(data_width=32)
+    m_axis0 = AXIStreamInterface(data_width=32)
+    m_axis1 = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_broadcast = AXISBroadcast(platform, s_axis, [m_axis0, m_axis1])
+    soc.comb += m_axis1.ready.eq(1)
+    return s_axis, m_axis0
+
+@axis_bench("axis_arb_mux")
+def axis_arb_mux_bench(soc, platform):
+    from verilog_axis.axis_arb_mux import AXISArbMux
+    s_axis0 = AXIStreamInterface(data_width=32)
+    s_axis1 = AXIStreamInterface(data_width=32)
+    m_axis  = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_arb_mux = AXISArbMux(platform, [s_axis0, s_axis1], m_axis)
+    return s_axis0, m_axis
+
+@axis_bench("axis_mux")
+def axis_mux_bench(soc, platform):
+    from verilog_axis.axis_mux import AXISMux
+    s_axis0 = AXIStreamInterface(data_width=32)
+    s_axis1 = AXIStreamInterface(data_width=32)
+    m_axis  = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_mux = AXISMux(platform, [s_axis0, s_axis1], m_axis)
+    return s_axis0, m_axis
+
+@axis_bench("axis_demux")
+def axis_demux_bench(soc, platform):
+    from verilog_axis.axis_demux import AXISDemux
+    s_axis  = AXIStreamInterface(data_width=32)
+    m_axis0 = AXIStreamInterface(data_width=32)
+    m_axis1 = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_demux = AXISDemux(platform, s_axis, [m_axis0, m_axis1])
+    return s_axis, m_axis0
+
+@axis_bench("axis_switch", s_count=2, m_count=2)
+def axis_switch_bench(soc, platform, s_count, m_count):
+    from verilog_axis.axis_switch import AXISSwitch
+    s_axis = [AXIStreamInterface(data_width=32) for _ in range(s_count)]
+    m_axis = [AXIStreamInterface(data_width=32) for _ in range(m_count)]
+    soc.submodules.axis_switch = AXISSwitch(platform, s_axis=s_axis, m_axis=m_axis)
+    return s_axis[0], m_axis[0]
+
+# AXISBenchSoC -------------------------------------------------------------------------------------
+
+class AXISBenchSoC(SoCMini):
+    def __init__(self, bench, valid_duty=100, ready_duty=100, cycles=10000):
+        # Parameters.
+        sys_clk_freq = int(100e6)
+
+        # Platform.
+        platform     = Platform()
+
+        # CRG --------------------------------------------------------------------------------------
+        self.submodules.crg = CRG(platform.request("sys_clk"))
+
+        # SoCMini ----------------------------------------------------------------------------------
+        SoCMini.__init__(self, platform, clk_freq=sys_clk_freq)
+
+        # AXIS Bench -------------------------------------------------------------------------------
+        timestamp = Signal(32)
+        self.sync += timestamp.eq(timestamp + 1)
+
+        bench_func, bench_config = axis_benches[bench]
+        s_axis, m_axis = bench_func(self, platform, **bench_config)
+        self.submodules.generator = AXISBenchGenerator(s_axis, timestamp, duty=valid_duty)
+        self.submodules.checker   = checker = AXISBenchChecker(m_axis, timestamp, duty=ready_duty)
+
+        # Finish -----------------------------------------------------------------------------------
+        self.sync += If(timestamp == cycles,
+            Display("-"*80),
+            Display("Bench Cycles: %d / Beats: %d / First Cycle: %d / First Latency: %d / Max Latency: %d / Sum Latency: %d",
+                timestamp,
+                checker.beats,
+                checker.first_cycle,
+                checker.first_latency,
+                checker.max_latency,
+                checker.sum_latency),
+            Finish(),
+        )
+
+# Bench Runner -------------------------------------------------------------------------------------
+
+_bench_re = re.compile(r"Bench Cycles:\s*(?P<cycles>\d+) / Beats:\s*(?P<beats>\d+) / First Cycle:\s*(?P<first_cycle>\d+) / "
+    r"First Latency:\s*(?P<first_latency>\d+) / Max Latency:\s*(?P<max_latency>\d+) / Sum Latency:\s*(?P<sum_latency>\d+)")
+
+class AXISBenchResult:
+    def __init__(self, sim_result, bench, valid_duty, ready_duty, status, measures={}):
+        self.name       = sim_result.name
+        self.bench      = bench
+        self.valid_duty = valid_duty
+        self.ready_duty = ready_duty
+        self.status     = status
+        self.measures   = measures
+        self.duration   = sim_result.duration
+        self.log        = sim_result.log
+        self.cached     = sim_result.cached
+
+    @property
+    def passed(self):
+        return self.status == "PASS"
+
+    def to_dict(self):
+        return {
+            "bench"      : self.bench,
+            "config"     : axis_benches[self.bench][1],
+            "valid_duty" : self.valid_duty,
+            "ready_duty" : self.ready_duty,
+            "status"     : self.status,
+            **self.measures,
+        }
+
+def _parse_bench(log, data_width):
+    with open(log) as f:
+        for line in f:
+            m = _bench_re.search(line)
+            if m is not None:
+                v = {k: int(v) for k, v in m.groupdict().items()}
+                active_cycles = max(1, v["cycles"] - v["first_cycle"])
+                return {
+                    "cycles"          : v["cycles"],
+                    "beats"           : v["beats"],
+                    "beats_per_cycle" : v["beats"]/active_cycles,
+                    "bytes_per_cycle" : v["beats"]*data_width/8/active_cycles,
+                    "first_latency"   : v["first_latency"],
+                    "avg_latency"     : v["sum_latency"]/max(1, v["beats"]),
+                    "max_latency"     : v["max_latency"],
+                }
+    return None
+
+def run_axis_bench(point, cycles=10000, **kwargs):
+    bench, valid_duty, ready_duty = point
+    name = f"{bench}_v{valid_duty}_r{ready_duty}"
+    r = run_sim(name,
+        soc_factory  = lambda: AXISBenchSoC(bench, valid_duty, ready_duty, cycles),
+        cache_extra  = {"bench": bench, "valid_duty": valid_duty, "ready_duty": ready_duty, "cycles": cycles},
+        python_files = [__file__],
+        **kwargs
+    )
+    if not r.done:
+        return AXISBenchResult(r, bench, valid_duty, ready_duty, r.status)
+
+    # Analyze.
+    config     = axis_benches[bench][1]
+    data_width = config.get("m_data_width", 32)
+    measures   = _parse_bench(r.log, data_width)
+    if (measures is None) or (measures["beats"] == 0):
+        return AXISBenchResult(r, bench, valid_duty, ready_duty, "SIM ERROR")
+    return AXISBenchResult(r, bench, valid_duty, ready_duty, "PASS", measures)
+
+def axis_benches_report(results):
+    print("-"*100)
+    print(f"{'Bench':<32s} {'Valid':>5s} {'Ready':>5s} {'Status':<18s} {'Beats/Cycle':>11s} {'First Lat':>9s} {'Avg Lat':>8s} {'Max Lat':>8s}")
+    print("-"*100)
+    for r in results:
+        if r.passed:
+            m = r.measures
+            print(f"{r.bench:<32s} {r.valid_duty:>4d}% {r.ready_duty:>4d}% {r.status:<18s} {m['beats_per_cycle']:>11.3f} {m['first_latency']:>9d} {m['avg_latency']:>8.1f} {m['max_latency']:>8d}")
+        else:
+            print(f"{r.bench:<32s} {r.valid_duty:>4d}% {r.ready_duty:>4d}% {r.status:<18s} See {r.log}")
+    print("-"*100)
+
+# Build --------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX Verilog AXIS throughput/latency benchmarks.")
+    parser.add_argument("--bench",       default=[], action="append",  help="Bench(es) to run (default: all).", choices=list(axis_benches.keys()))
+    parser.add_argument("--valid-duty",  default=[], action="append", type=int, help="Generator valid duty cycle(s) in %% (default: 100).")
+    parser.add_argument("--ready-duty",  default=[], action="append", type=int, help="Checker ready duty cycle(s) in %% (default: 100, 50).")
+    parser.add_argument("--parallel",    default=os.cpu_count(), type=int, help="Number of benches built/simulated in parallel.")
+    parser.add_argument("--cycles",      default=10000,          type=int, help="Number of simulated cycles per bench.")
+    parser.add_argument("--timeout",     default=None,           type=float, help="Simulation timeout per bench (s).")
+    parser.add_argument("--output-dir",  default="build/bench",            help="Base output directory.")
+    parser.add_argument("--cache-dir",   default="build/cache",            help="Build cache directory.")
+    parser.add_argument("--cache-size",  default=4.0,            type=float, help="Build cache maximum size (GB).")
+    parser.add_argument("--no-cache",    action="store_true",              help="Disable build cache.")
+    parser.add_argument("--json",        default="bench_axis.json",        help="JSON results file.")
+    verilator_build_args(parser)
+    args = parser.parse_args()
+
+    # Wrappers logs (in each test/benchmark log).
+    logging.basicConfig(level=logging.INFO)
+
+    benches     = args.bench      if len(args.bench)      else list(axis_benches.keys())
+    valid_dutys = args.valid_duty if len(args.valid_duty) else [100]
+    ready_dutys = args.ready_duty if len(args.ready_duty) else [100, 50]
+    points      = [(b, v, r) for b in benches for v in valid_dutys for r in ready_dutys]
+
+    results = run_parallel(run_axis_bench, points,
+        jobs                   = args.parallel,
+        output_dir             = args.output_dir,
+        cycles                 = args.cycles,
+        timeout                = args.timeout,
+        verilator_build_kwargs = verilator_build_argdict(args),
+        cache_dir              = None if args.no_cache else args.cache_dir,
+        cache_size             = int(args.cache_size*1e9),
+    )
+    axis_benches_report(results)
+
+    with open(args.json, "w") as f:
+        json.dump({
+            "date"    : time.strftime("%Y-%m-%d %H:%M:%S"),
+            "cycles"  : args.cycles,
+            "results" : [r.to_dict() for r in results],
+        }, f, indent=4)
+    print(f"Results written to {args.json}.")
+    sys.exit(0 if all(r.passed for r in results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+from migen import *
+
+from litex.soc.interconnect.axi import AXIStreamInterface
+
+import verilog_axis
+from verilog_axis.axis_common import *
+
+from test_axis import Platform
+
+# Elaboration Benches ------------------------------------------------------------------------------
+
+# Each bench elaborates n identical wrappers (kwargs) between (s_axis, m_axis) interfaces with:
+# - logged : One constructor call per wrapper, per-instance parameters logs (INFO enabled).
+# - report : One constructor call per wrapper, parameters collected in an AXISElaborationReport.
+# Interfaces are created outside of the measurement.
+
+elab_benches = {
+    "axis_fifo"         : dict(depth=64),
+    "axis_srl_fifo"     : dict(depth=16),
+    "axis_async_fifo"   : dict(depth=64),
+    "axis_register"     : dict(),
+    "axis_srl_register" : dict(),
+    "axis_rate_limit"   : dict(),
+}
+
+elab_modes = ["logged", "report"]
+
+def elab_interfaces(n, data_width=32):
+    return [(AXIStreamInterface(data_width=data_width, name=f"s_axis{i}"),
+             AXIStreamInterface(data_width=data_width, name=f"m_axis{i}")) for i in range(n)]
+
+def run_elab_bench(name, mode, n=1000, data_width=32):
+    cls        = verilog_axis.get(name)
+    kwargs     = elab_benches[name]
+    interfaces = elab_interfaces(n, data_width)
+    platform   = Platform()
+    report     = AXISElaborationReport()
+    top        = Module()
+    start      = time.perf_counter()
+    if mode == "logged":
+        wrappers = [cls(platform, *args, **kwargs) for args in interfaces]
+    elif mode == "report":
+        with report:
+            wrappers = [cls(platform, *args, **kwargs) for args in interfaces]
+    top.submodules += wrappers
+    top.get_fragment()
+    return {
+        "bench"    : name,
+        "mode"     : mode,
+        "n"        : n,
+        "duration" : time.perf_counter() - start,
+        "report"   : report.as_list(),
+    }
+
+def elab_benches_report(results):
+    print("-"*80)
+    print(f"{'Bench':<20s} {'Mode':<8s} {'Instances':>10s} {'Duration':>10s} {'us/Instance':>12s} {'Speedup':>8s}")
+    print("-"*80)
+    baselines = {r["bench"]: r["duration"] for r in results if r["mode"] == "logged"}
+    for r in results:
+        baseline = baselines.get(r["bench"])
+        speedup  = "-" if baseline is None else f"{baseline/r['duration']:.1f}x"
+        print(f"{r['bench']:<20s} {r['mode']:<8s} {r['n']:>10d} {r['duration']:>9.3f}s "
+            f"{1e6*r['duration']/r['n']:>12.1f} {speedup:>8s}")
+    print("-"*80)
+    for r in results:
+        for entry in r["report"]:
+            print(f"{r['bench']} / {r['mode']}: {entry['wrapper']} x{entry['count']}: " +
+                ", ".join(f"{k}: {v}" for k, v in entry["parameters"].items()))
+
+# Build --------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX Verilog AXIS elaboration-time benchmark.")
+    parser.add_argument("--bench",      default=[], action="append", help="Bench(es) to run (default: all).", choices=list(elab_benches.keys()))
+    parser.add_argument("--mode",       default=[], action="append", help="Mode(s) to run (default: all).",   choices=elab_modes)
+    parser.add_argument("--n",          default=1000,  type=int,     help="Number of instances.")
+    parser.add_argument("--data-width", default=32,    type=int,     help="Interfaces data width.")
+    parser.add_argument("--json",       default="bench_elab.json",   help="JSON results file.")
+    args = parser.parse_args()
+
+    # Wrappers logs enabled (as in the tests) but discarded: measures formatting/emission overhead.
+    logging.basicConfig(level=logging.INFO, stream=open(os.devnull, "w"))
+
+    results = []
+    for bench in (args.bench if len(args.bench) else list(elab_benches.keys())):
+        for mode in (args.mode if len(args.mode) else elab_modes):
+            results.append(run_elab_bench(bench, mode, n=args.n, data_width=args.data_width))
+    elab_benches_report(results)
+
+    with open(args.json, "w") as f:
+        json.dump({
+            "date"    : time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results" : results,
+        }, f, indent=4)
+    print(f"Results written to {args.json}.")
+
+if __name__ == "__main__":
+    main()
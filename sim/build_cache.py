@@ -0,0 +1,201 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Content-hash build cache for the Verilator simulations.
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import functools
+import subprocess
+
+from importlib import metadata
+
+from migen import *
+from migen.fhdl.specials import Instance
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def _file_hash(filename):
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _dir_size(path):
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for f in files:
+            try:
+                size += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return size
+
+def _iter_instances(module):
+    # Walk the Module hierarchy (without finalizing it, the design is then built normally on a miss).
+    for special in module._fragment.specials:
+        if isinstance(special, Instance):
+            yield special
+    for _, submodule in module._submodules:
+        yield from _iter_instances(submodule)
+
+def _instance_description(instance):
+    items = []
+    for item in instance.items:
+        if isinstance(item, Instance.Parameter):
+            value = item.value
+            if isinstance(value, Constant):
+                value = (value.value, value.nbits, value.signed)
+            items.append(("p", item.name, repr(value)))
+        else:
+            items.append((item.__class__.__name__, item.name, len(item.expr)))
+    return (instance.of, sorted(items))
+
+@functools.lru_cache(maxsize=None)
+def _toolchain_versions():
+    # Versions of the Python packages generating the design/simulation (LiteX, Migen) and of
+    # Verilator (None when not installed/found).
+    versions = {}
+    for package in ["litex", "migen"]:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    try:
+        versions["verilator"] = subprocess.run(["verilator", "--version"],
+            capture_output=True, text=True).stdout.strip()
+    except OSError:
+        versions["verilator"] = None
+    return versions
+
+# Build Key ----------------------------------------------------------------------------------------
+
+# The key covers the Instances of the design (module name, parameters and port widths), the content
+# of the sources added to the platform, the build (Verilator) arguments, the toolchain versions
+# (LiteX, Migen, Verilator) and the Python sources describing the design (wrappers, simulation
+# helpers and test harness): any change affecting the generated Verilog or the simulation binary
+# invalidates the cached build.
+
+def build_key(soc, build_kwargs={}, extra={}, python_packages=["verilog_axis", "sim"], python_files=[]):
+    h = hashlib.sha256()
+    def update(name, value):
+        h.update(json.dumps([name, value], sort_keys=True, default=repr).encode())
+
+    # Instances.
+    update("instances", sorted(repr(_instance_description(i)) for i in _iter_instances(soc)))
+
+    # Sources.
+    update("sources", sorted((os.path.basename(f), _file_hash(f)) for f, *_ in soc.platform.sources))
+
+    # Build arguments.
+    update("build_kwargs", build_kwargs)
+
+    # Toolchain versions.
+    update("toolchain", _toolchain_versions())
+
+    # Extra user parameters.
+    update("extra", extra)
+
+    # Python sources.
+    python_files = list(python_files)
+    for name, module in sorted(sys.modules.items()):
+        if name.split(".")[0] in python_packages and getattr(module, "__file__", None) is not None:
+            python_files.append(module.__file__)
+    update("python", sorted((os.path.basename(f), _file_hash(f)) for f in set(python_files)))
+
+    return h.hexdigest()
+
+# Build Cache --------------------------------------------------------------------------------------
+
+# Local on-disk cache of simulation builds with size-bounded LRU eviction. Each entry is stored in
+# its own directory named from its build key. Entries are written to a temporary directory and
+# atomically renamed so that the cache can be shared between parallel builds, the modification time
+# of an entry is updated on each hit and used for LRU eviction.
+
+class BuildCache:
+    # Files required to run a simulation from a gateware directory.
+    files = ["obj_dir/Vsim", "modules", "sim_config.js"]
+
+    def __init__(self, path, max_size=int(4e9)):
+        self.path     = os.path.abspath(path)
+        self.max_size = max_size
+        os.makedirs(self.path, exist_ok=True)
+
+    def _entry(self, key):
+        return os.path.join(self.path, key)
+
+    def get(self, key, gateware_dir):
+        entry = self._entry(key)
+        if not os.path.isdir(entry):
+            return False
+        try:
+            os.makedirs(gateware_dir, exist_ok=True)
+            for f in self.files:
+                src = os.path.join(entry, f)
+                dst = os.path.join(gateware_dir, f)
+                if os.path.isdir(src):
+                    shutil.rmtree(dst, ignore_errors=True)
+                    shutil.copytree(src, dst)
+                else:
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    shutil.copy2(src, dst)
+            os.utime(entry)
+        except OSError:
+            # Entry evicted/corrupted while reading: consider it as a miss.
+            return False
+        return True
+
+    def put(self, key, gateware_dir):
+        entry = self._entry(key)
+        if os.path.isdir(entry):
+            return
+        tmp = f"{entry}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        for f in self.files:
+            src = os.path.join(gateware_dir, f)
+            dst = os.path.join(tmp, f)
+            if os.path.isdir(src):
+                shutil.copytree(src, dst)
+            else:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copy2(src, dst)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # Entry already added by another build.
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def entries(self):
+        entries = []
+        for key in os.listdir(self.path):
+            entry = self._entry(key)
+            if ".tmp-" in key or not os.path.isdir(entry):
+                continue
+            try:
+                entries.append((os.path.getmtime(entry), _dir_size(entry), entry))
+            except OSError:
+                pass
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total   = sum(size for _, size, _ in entries)
+        while total > self.max_size and len(entries):
+            _, size, entry = entries.pop(0)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
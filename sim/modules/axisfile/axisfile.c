@@ -0,0 +1,424 @@
+/*
+ * This file is part of LiteX-Verilog-AXIS-Test
+ *
+ * Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+ * SPDX-License-Identifier: BSD-2-Clause
+ */
+
+/*
+ * File-backed AXI-Stream stimulus/capture LiteX simulation module.
+ *
+ * Streams an input file (pcap: one frame per packet, raw: frames of frame_size bytes, 0: a single
+ * frame) to the axis_file source pads (64-bit data/keep/last) and writes the frames received on the
+ * axis_file sink pads to an output file (same format). The input file is memory-mapped and consumed
+ * sequentially (consumed pages are released), the output file is written through a buffered stream:
+ * multi-GB captures are replayed without being loaded in memory. The done pad is set once the input
+ * is consumed and no beat has been received for drain cycles.
+ *
+ * Args (JSON): {"input": "in.pcap", "output": "out.pcap", "format": "pcap", "frame_size": 0, "drain": 1000}
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <json-c/json.h>
+
+#include "error.h"
+#include "modules.h"
+
+#define PCAP_MAGIC      0xa1b2c3d4
+#define PCAP_MAGIC_NS   0xa1b23c4d
+#define PCAP_SNAPLEN    65535
+#define RELEASE_SIZE    (64 << 20)
+#define OUTPUT_BUF_SIZE (16 << 20)
+
+struct pcap_hdr_s {
+  uint32_t magic;
+  uint16_t version_major;
+  uint16_t version_minor;
+  int32_t  thiszone;
+  uint32_t sigfigs;
+  uint32_t snaplen;
+  uint32_t network;
+};
+
+struct pcap_rec_s {
+  uint32_t ts_sec;
+  uint32_t ts_frac;
+  uint32_t incl_len;
+  uint32_t orig_len;
+};
+
+struct session_s {
+  /* Pads. */
+  char     *sys_clk;
+  char     *source_valid;
+  char     *source_ready;
+  uint64_t *source_data;
+  char     *source_keep;
+  char     *source_last;
+  char     *sink_valid;
+  char     *sink_ready;
+  uint64_t *sink_data;
+  char     *sink_keep;
+  char     *sink_last;
+  char     *done;
+
+  /* Config. */
+  int      pcap;
+  uint64_t frame_size;
+  uint64_t drain;
+
+  /* Input (mmap). */
+  uint8_t *in;
+  uint64_t in_size;
+  uint64_t in_pos;       /* Current position in the input file.   */
+  uint64_t in_released;  /* Input bytes released from the mapping. */
+  uint64_t frame_pos;    /* Position in the current frame.         */
+  uint64_t frame_len;    /* Length of the current frame (0: none).  */
+  int      swapped;      /* pcap with swapped endianness.          */
+  int      ns;           /* pcap with ns timestamps.               */
+
+  /* Output. */
+  FILE    *out;
+  uint8_t *frame;
+  uint64_t frame_out_len;
+
+  /* Stats. */
+  uint64_t cycles;
+  uint64_t idle;
+  uint64_t frames_in;
+  uint64_t bytes_in;
+  uint64_t frames_out;
+  uint64_t bytes_out;
+  int      reported;
+  clk_edge_state_t edge;
+};
+
+/* Helpers ----------------------------------------------------------------------------------------*/
+
+static int axisfile_get_arg(char *args, char *arg, char **val)
+{
+  json_object *jsobj = NULL;
+  json_object *obj   = NULL;
+
+  *val = NULL;
+  if(!args)
+    return RC_ERROR;
+  jsobj = json_tokener_parse(args);
+  if(!jsobj || !json_object_is_type(jsobj, json_type_object)) {
+    fprintf(stderr, "[axisfile] Error parsing json arg: %s\n", args);
+    return RC_JSERROR;
+  }
+  if(json_object_object_get_ex(jsobj, arg, &obj))
+    *val = strdup(json_object_get_string(obj));
+  json_object_put(jsobj);
+  return *val ? RC_OK : RC_ERROR;
+}
+
+static void axisfile_pads_get(struct pad_s *pads, char *name, void **signal)
+{
+  int i = 0;
+  *signal = NULL;
+  while(pads[i].name) {
+    if(!strcmp(pads[i].name, name)) {
+      *signal = (void*)pads[i].signal;
+      break;
+    }
+    i++;
+  }
+}
+
+static uint32_t axisfile_u32(struct session_s *s, uint32_t v)
+{
+  return s->swapped ? __builtin_bswap32(v) : v;
+}
+
+/* Start a new input frame (return 0 when the input is consumed). */
+static int axisfile_next_frame(struct session_s *s)
+{
+  struct pcap_rec_s rec;
+
+  s->frame_pos = 0;
+  s->frame_len = 0;
+  if(s->pcap) {
+    while(s->in_pos + sizeof(rec) <= s->in_size) {
+      memcpy(&rec, s->in + s->in_pos, sizeof(rec));
+      s->in_pos += sizeof(rec);
+      s->frame_len = axisfile_u32(s, rec.incl_len);
+      if(s->in_pos + s->frame_len > s->in_size)
+        s->frame_len = s->in_size - s->in_pos;
+      if(s->frame_len)
+        return 1;
+    }
+    return 0;
+  }
+  if(s->in_pos >= s->in_size)
+    return 0;
+  s->frame_len = s->in_size - s->in_pos;
+  if(s->frame_size && (s->frame_len > s->frame_size))
+    s->frame_len = s->frame_size;
+  return 1;
+}
+
+/* Release consumed input pages to keep the resident memory bounded on large inputs. */
+static void axisfile_release(struct session_s *s)
+{
+  uint64_t page = sysconf(_SC_PAGESIZE);
+  uint64_t end  = (s->in_pos/page)*page;
+  if(end - s->in_released >= RELEASE_SIZE) {
+    madvise(s->in + s->in_released, end - s->in_released, MADV_DONTNEED);
+    s->in_released = end;
+  }
+}
+
+static void axisfile_write_frame(struct session_s *s, uint64_t time_ps)
+{
+  struct pcap_rec_s rec;
+  if(!s->out)
+    return;
+  if(s->pcap) {
+    rec.ts_sec   = time_ps/1000000000000ULL;
+    rec.ts_frac  = (time_ps/1000000ULL)%1000000ULL;
+    rec.incl_len = s->frame_out_len;
+    rec.orig_len = s->frame_out_len;
+    fwrite(&rec, sizeof(rec), 1, s->out);
+  }
+  fwrite(s->frame, 1, s->frame_out_len, s->out);
+  s->frame_out_len = 0;
+}
+
+static void axisfile_report(struct session_s *s)
+{
+  printf("[axisfile] In: %llu frames / %llu bytes, Out: %llu frames / %llu bytes\n",
+    (unsigned long long)s->frames_in,  (unsigned long long)s->bytes_in,
+    (unsigned long long)s->frames_out, (unsigned long long)s->bytes_out);
+  fflush(stdout);
+}
+
+/* Module -----------------------------------------------------------------------------------------*/
+
+static int axisfile_start(void *b)
+{
+  printf("[axisfile] loaded\n");
+  return RC_OK;
+}
+
+static int axisfile_new(void **sess, char *args)
+{
+  struct session_s *s = NULL;
+  char *input      = NULL;
+  char *output     = NULL;
+  char *format     = NULL;
+  char *frame_size = NULL;
+  char *drain      = NULL;
+  struct stat st;
+  int fd;
+
+  if(!sess)
+    return RC_INVARG;
+
+  s = (struct session_s*)malloc(sizeof(struct session_s));
+  if(!s)
+    return RC_NOENMEM;
+  memset(s, 0, sizeof(struct session_s));
+
+  axisfile_get_arg(args, "input",      &input);
+  axisfile_get_arg(args, "output",     &output);
+  axisfile_get_arg(args, "format",     &format);
+  axisfile_get_arg(args, "frame_size", &frame_size);
+  axisfile_get_arg(args, "drain",      &drain);
+  s->pcap       = format && !strcmp(format, "pcap");
+  s->frame_size = frame_size ? strtoull(frame_size, NULL, 0) : 0;
+  s->drain      = drain      ? strtoull(drain,      NULL, 0) : 1000;
+
+  /* Input. */
+  if(input) {
+    fd = open(input, O_RDONLY);
+    if((fd < 0) || fstat(fd, &st)) {
+      fprintf(stderr, "[axisfile] Unable to open %s\n", input);
+      return RC_ERROR;
+    }
+    s->in_size = st.st_size;
+    if(s->in_size) {
+      s->in = mmap(NULL, s->in_size, PROT_READ, MAP_PRIVATE, fd, 0);
+      if(s->in == MAP_FAILED) {
+        fprintf(stderr, "[axisfile] Unable to map %s\n", input);
+        return RC_ERROR;
+      }
+      madvise(s->in, s->in_size, MADV_SEQUENTIAL);
+    }
+    close(fd);
+    if(s->pcap) {
+      struct pcap_hdr_s hdr;
+      if(s->in_size < sizeof(hdr)) {
+        fprintf(stderr, "[axisfile] Invalid pcap file %s\n", input);
+        return RC_ERROR;
+      }
+      memcpy(&hdr, s->in, sizeof(hdr));
+      s->swapped = (hdr.magic == __builtin_bswap32(PCAP_MAGIC)) || (hdr.magic == __builtin_bswap32(PCAP_MAGIC_NS));
+      s->ns      = (axisfile_u32(s, hdr.magic) == PCAP_MAGIC_NS);
+      if((axisfile_u32(s, hdr.magic) != PCAP_MAGIC) && !s->ns) {
+        fprintf(stderr, "[axisfile] Invalid pcap magic in %s\n", input);
+        return RC_ERROR;
+      }
+      s->in_pos = sizeof(hdr);
+    }
+    axisfile_next_frame(s);
+  }
+
+  /* Output. */
+  if(output) {
+    s->out = fopen(output, "wb");
+    if(!s->out) {
+      fprintf(stderr, "[axisfile] Unable to create %s\n", output);
+      return RC_ERROR;
+    }
+    setvbuf(s->out, NULL, _IOFBF, OUTPUT_BUF_SIZE);
+    if(s->pcap) {
+      struct pcap_hdr_s hdr = {PCAP_MAGIC, 2, 4, 0, 0, PCAP_SNAPLEN, 1};
+      fwrite(&hdr, sizeof(hdr), 1, s->out);
+    }
+  }
+  s->frame = (uint8_t*)malloc(s->pcap ? PCAP_SNAPLEN : (s->frame_size ? s->frame_size : OUTPUT_BUF_SIZE));
+
+  free(input);
+  free(output);
+  free(format);
+  free(frame_size);
+  free(drain);
+  *sess = (void*)s;
+  return RC_OK;
+}
+
+static int axisfile_add_pads(void *sess, struct pad_list_s *plist)
+{
+  struct session_s *s = (struct session_s*)sess;
+  struct pad_s *pads;
+
+  if(!sess || !plist)
+    return RC_INVARG;
+  pads = plist->pads;
+  if(!strcmp(plist->name, "axis_file")) {
+    axisfile_pads_get(pads, "source_valid", (void**)&s->source_valid);
+    axisfile_pads_get(pads, "source_ready", (void**)&s->source_ready);
+    axisfile_pads_get(pads, "source_data",  (void**)&s->source_data);
+    axisfile_pads_get(pads, "source_keep",  (void**)&s->source_keep);
+    axisfile_pads_get(pads, "source_last",  (void**)&s->source_last);
+    axisfile_pads_get(pads, "sink_valid",   (void**)&s->sink_valid);
+    axisfile_pads_get(pads, "sink_ready",   (void**)&s->sink_ready);
+    axisfile_pads_get(pads, "sink_data",    (void**)&s->sink_data);
+    axisfile_pads_get(pads, "sink_keep",    (void**)&s->sink_keep);
+    axisfile_pads_get(pads, "sink_last",    (void**)&s->sink_last);
+    axisfile_pads_get(pads, "done",         (void**)&s->done);
+  }
+  if(!strcmp(plist->name, "sys_clk"))
+    axisfile_pads_get(pads, "sys_clk", (void**)&s->sys_clk);
+  return RC_OK;
+}
+
+static int axisfile_close(void *sess)
+{
+  struct session_s *s = (struct session_s*)sess;
+  if(s->out) {
+    if(s->frame_out_len)
+      axisfile_write_frame(s, 0);
+    fclose(s->out);
+  }
+  if(s->in)
+    munmap(s->in, s->in_size);
+  if(!s->reported)
+    axisfile_report(s);
+  free(s->frame);
+  free(s);
+  return RC_OK;
+}
+
+static int axisfile_tick(void *sess, uint64_t time_ps)
+{
+  struct session_s *s = (struct session_s*)sess;
+  uint64_t n, i, data;
+  uint8_t keep;
+
+  if(!clk_pos_edge(&s->edge, *s->sys_clk))
+    return RC_OK;
+  s->cycles++;
+
+  /* Source: present the current beat, advance when accepted. */
+  *s->source_valid = s->frame_len != 0;
+  if(s->frame_len) {
+    n = s->frame_len - s->frame_pos;
+    if(n > 8)
+      n = 8;
+    data = 0;
+    memcpy(&data, s->in + s->in_pos, n);
+    keep = (n == 8) ? 0xff : ((1 << n) - 1);
+    *s->source_data = data;
+    *s->source_keep = keep;
+    *s->source_last = (s->frame_pos + n) == s->frame_len;
+    if(*s->source_ready) {
+      s->in_pos    += n;
+      s->frame_pos += n;
+      s->bytes_in  += n;
+      if(s->frame_pos == s->frame_len) {
+        s->frames_in++;
+        axisfile_next_frame(s);
+        axisfile_release(s);
+      }
+    }
+  }
+
+  /* Sink: capture beats/frames. */
+  *s->sink_ready = 1;
+  s->idle++;
+  if(*s->sink_valid) {
+    s->idle = 0;
+    data = *s->sink_data;
+    keep = *s->sink_keep;
+    for(i = 0; i < 8; i++) {
+      if(keep & (1 << i)) {
+        if(s->frame_out_len < (s->pcap ? PCAP_SNAPLEN : (s->frame_size ? s->frame_size : OUTPUT_BUF_SIZE)))
+          s->frame[s->frame_out_len++] = (data >> (8*i)) & 0xff;
+        s->bytes_out++;
+      }
+    }
+    if(*s->sink_last) {
+      s->frames_out++;
+      axisfile_write_frame(s, time_ps);
+    } else if(!s->pcap && !s->frame_size && (s->frame_out_len == OUTPUT_BUF_SIZE)) {
+      axisfile_write_frame(s, time_ps);
+    }
+  }
+
+  /* Done. */
+  if((s->frame_len == 0) && (s->idle >= s->drain)) {
+    *s->done = 1;
+    if(!s->reported) {
+      if(s->out)
+        fflush(s->out);
+      axisfile_report(s);
+      s->reported = 1;
+    }
+  }
+
+  return RC_OK;
+}
+
+static struct ext_module_s ext_mod = {
+  "axisfile",
+  axisfile_start,
+  axisfile_new,
+  axisfile_add_pads,
+  axisfile_close,
+  axisfile_tick
+};
+
+int litex_sim_ext_module_init(int (*register_module)(struct ext_module_s *))
+{
+  return register_module(&ext_mod);
+}
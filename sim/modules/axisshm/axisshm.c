@@ -0,0 +1,318 @@
+/*
+ * This file is part of LiteX-Verilog-AXIS-Test
+ *
+ * Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+ * SPDX-License-Identifier: BSD-2-Clause
+ */
+
+/*
+ * Shared-memory AXI-Stream bridge LiteX simulation module.
+ *
+ * Connects the axis_shm source/sink pads (64-bit data/keep/last) to two lock-free single-producer/
+ * single-consumer rings in a shared memory file created by the host (see sim/shm_bridge.py):
+ * - Host -> Sim ring: beats pushed by the host are presented on the source pads.
+ * - Sim -> Host ring: beats received on the sink pads are pushed to the host (with backpressure
+ *   when the ring is full).
+ * Head/Tail indexes are only written by their owner (producer: head, consumer: tail) with
+ * release/acquire ordering and cached locally, so the shared cache lines are only read when the
+ * local view is exhausted. The done pad is set once the host has set host_done, the Host -> Sim
+ * ring is empty and no beat has been received for drain cycles.
+ *
+ * Args (JSON): {"path": "/dev/shm/axis_shm", "drain": 1000}
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <json-c/json.h>
+
+#include "error.h"
+#include "modules.h"
+
+/* Shared memory layout (must match sim/shm_bridge.py). */
+#define SHM_MAGIC        0x314d485353495841ULL /* "AXISSHM1" */
+#define SHM_HEADER_SIZE  4096
+#define SHM_MAGIC_OFF    0
+#define SHM_CAPACITY_OFF 8
+#define SHM_HOST_DONE    16
+#define SHM_SIM_DONE     24
+#define SHM_H2S_HEAD     64
+#define SHM_H2S_TAIL     128
+#define SHM_S2H_HEAD     192
+#define SHM_S2H_TAIL     256
+
+struct shm_entry_s {
+  uint64_t data;
+  uint64_t ctrl; /* keep[7:0], last[8]. */
+};
+
+struct session_s {
+  /* Pads. */
+  char     *sys_clk;
+  char     *source_valid;
+  char     *source_ready;
+  uint64_t *source_data;
+  char     *source_keep;
+  char     *source_last;
+  char     *sink_valid;
+  char     *sink_ready;
+  uint64_t *sink_data;
+  char     *sink_keep;
+  char     *sink_last;
+  char     *done;
+
+  /* Shared memory. */
+  uint8_t  *shm;
+  uint64_t  shm_size;
+  uint64_t  capacity;
+  uint64_t *host_done;
+  uint64_t *sim_done;
+  uint64_t *h2s_head;
+  uint64_t *h2s_tail;
+  uint64_t *s2h_head;
+  uint64_t *s2h_tail;
+  struct shm_entry_s *h2s;
+  struct shm_entry_s *s2h;
+
+  /* Local views. */
+  uint64_t h2s_tail_local;
+  uint64_t h2s_head_cached;
+  uint64_t s2h_head_local;
+  uint64_t s2h_tail_cached;
+
+  /* Stats. */
+  uint64_t drain;
+  uint64_t idle;
+  uint64_t beats_in;
+  uint64_t beats_out;
+  int      reported;
+  clk_edge_state_t edge;
+};
+
+/* Helpers ----------------------------------------------------------------------------------------*/
+
+static int axisshm_get_arg(char *args, char *arg, char **val)
+{
+  json_object *jsobj = NULL;
+  json_object *obj   = NULL;
+
+  *val = NULL;
+  if(!args)
+    return RC_ERROR;
+  jsobj = json_tokener_parse(args);
+  if(!jsobj || !json_object_is_type(jsobj, json_type_object)) {
+    fprintf(stderr, "[axisshm] Error parsing json arg: %s\n", args);
+    return RC_JSERROR;
+  }
+  if(json_object_object_get_ex(jsobj, arg, &obj))
+    *val = strdup(json_object_get_string(obj));
+  json_object_put(jsobj);
+  return *val ? RC_OK : RC_ERROR;
+}
+
+static void axisshm_pads_get(struct pad_s *pads, char *name, void **signal)
+{
+  int i = 0;
+  *signal = NULL;
+  while(pads[i].name) {
+    if(!strcmp(pads[i].name, name)) {
+      *signal = (void*)pads[i].signal;
+      break;
+    }
+    i++;
+  }
+}
+
+static void axisshm_report(struct session_s *s)
+{
+  printf("[axisshm] In: %llu beats, Out: %llu beats\n",
+    (unsigned long long)s->beats_in, (unsigned long long)s->beats_out);
+  fflush(stdout);
+}
+
+/* Module -----------------------------------------------------------------------------------------*/
+
+static int axisshm_start(void *b)
+{
+  printf("[axisshm] loaded\n");
+  return RC_OK;
+}
+
+static int axisshm_new(void **sess, char *args)
+{
+  struct session_s *s = NULL;
+  char *path  = NULL;
+  char *drain = NULL;
+  struct stat st;
+  int fd;
+
+  if(!sess)
+    return RC_INVARG;
+
+  s = (struct session_s*)malloc(sizeof(struct session_s));
+  if(!s)
+    return RC_NOENMEM;
+  memset(s, 0, sizeof(struct session_s));
+
+  axisshm_get_arg(args, "path",  &path);
+  axisshm_get_arg(args, "drain", &drain);
+  s->drain = drain ? strtoull(drain, NULL, 0) : 1000;
+  if(!path) {
+    fprintf(stderr, "[axisshm] Missing path arg\n");
+    return RC_INVARG;
+  }
+
+  /* Map shared memory (created by the host). */
+  fd = open(path, O_RDWR);
+  if((fd < 0) || fstat(fd, &st) || (st.st_size < SHM_HEADER_SIZE)) {
+    fprintf(stderr, "[axisshm] Unable to open %s\n", path);
+    return RC_ERROR;
+  }
+  s->shm_size = st.st_size;
+  s->shm = mmap(NULL, s->shm_size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+  close(fd);
+  if(s->shm == MAP_FAILED) {
+    fprintf(stderr, "[axisshm] Unable to map %s\n", path);
+    return RC_ERROR;
+  }
+  if(*(uint64_t*)(s->shm + SHM_MAGIC_OFF) != SHM_MAGIC) {
+    fprintf(stderr, "[axisshm] Invalid magic in %s\n", path);
+    return RC_ERROR;
+  }
+  s->capacity  = *(uint64_t*)(s->shm + SHM_CAPACITY_OFF);
+  if(SHM_HEADER_SIZE + 2*s->capacity*sizeof(struct shm_entry_s) > s->shm_size) {
+    fprintf(stderr, "[axisshm] Invalid size of %s\n", path);
+    return RC_ERROR;
+  }
+  s->host_done = (uint64_t*)(s->shm + SHM_HOST_DONE);
+  s->sim_done  = (uint64_t*)(s->shm + SHM_SIM_DONE);
+  s->h2s_head  = (uint64_t*)(s->shm + SHM_H2S_HEAD);
+  s->h2s_tail  = (uint64_t*)(s->shm + SHM_H2S_TAIL);
+  s->s2h_head  = (uint64_t*)(s->shm + SHM_S2H_HEAD);
+  s->s2h_tail  = (uint64_t*)(s->shm + SHM_S2H_TAIL);
+  s->h2s       = (struct shm_entry_s*)(s->shm + SHM_HEADER_SIZE);
+  s->s2h       = s->h2s + s->capacity;
+  s->h2s_tail_local  = __atomic_load_n(s->h2s_tail, __ATOMIC_ACQUIRE);
+  s->h2s_head_cached = __atomic_load_n(s->h2s_head, __ATOMIC_ACQUIRE);
+  s->s2h_head_local  = __atomic_load_n(s->s2h_head, __ATOMIC_ACQUIRE);
+  s->s2h_tail_cached = __atomic_load_n(s->s2h_tail, __ATOMIC_ACQUIRE);
+
+  free(path);
+  free(drain);
+  *sess = (void*)s;
+  return RC_OK;
+}
+
+static int axisshm_add_pads(void *sess, struct pad_list_s *plist)
+{
+  struct session_s *s = (struct session_s*)sess;
+  struct pad_s *pads;
+
+  if(!sess || !plist)
+    return RC_INVARG;
+  pads = plist->pads;
+  if(!strcmp(plist->name, "axis_shm")) {
+    axisshm_pads_get(pads, "source_valid", (void**)&s->source_valid);
+    axisshm_pads_get(pads, "source_ready", (void**)&s->source_ready);
+    axisshm_pads_get(pads, "source_data",  (void**)&s->source_data);
+    axisshm_pads_get(pads, "source_keep",  (void**)&s->source_keep);
+    axisshm_pads_get(pads, "source_last",  (void**)&s->source_last);
+    axisshm_pads_get(pads, "sink_valid",   (void**)&s->sink_valid);
+    axisshm_pads_get(pads, "sink_ready",   (void**)&s->sink_ready);
+    axisshm_pads_get(pads, "sink_data",    (void**)&s->sink_data);
+    axisshm_pads_get(pads, "sink_keep",    (void**)&s->sink_keep);
+    axisshm_pads_get(pads, "sink_last",    (void**)&s->sink_last);
+    axisshm_pads_get(pads, "done",         (void**)&s->done);
+  }
+  if(!strcmp(plist->name, "sys_clk"))
+    axisshm_pads_get(pads, "sys_clk", (void**)&s->sys_clk);
+  return RC_OK;
+}
+
+static int axisshm_close(void *sess)
+{
+  struct session_s *s = (struct session_s*)sess;
+  __atomic_store_n(s->sim_done, 1, __ATOMIC_RELEASE);
+  if(!s->reported)
+    axisshm_report(s);
+  munmap(s->shm, s->shm_size);
+  free(s);
+  return RC_OK;
+}
+
+static int axisshm_tick(void *sess, uint64_t time_ps)
+{
+  struct session_s *s = (struct session_s*)sess;
+  struct shm_entry_s *e;
+  uint64_t mask = s->capacity - 1;
+  int empty, full;
+
+  if(!clk_pos_edge(&s->edge, *s->sys_clk))
+    return RC_OK;
+
+  /* Source (Host -> Sim): present the beat at tail, pop it when accepted. */
+  empty = s->h2s_tail_local == s->h2s_head_cached;
+  if(empty) {
+    s->h2s_head_cached = __atomic_load_n(s->h2s_head, __ATOMIC_ACQUIRE);
+    empty = s->h2s_tail_local == s->h2s_head_cached;
+  }
+  *s->source_valid = !empty;
+  if(!empty) {
+    e = &s->h2s[s->h2s_tail_local & mask];
+    *s->source_data = e->data;
+    *s->source_keep = e->ctrl & 0xff;
+    *s->source_last = (e->ctrl >> 8) & 1;
+    if(*s->source_ready) {
+      s->h2s_tail_local++;
+      s->beats_in++;
+      __atomic_store_n(s->h2s_tail, s->h2s_tail_local, __ATOMIC_RELEASE);
+    }
+  }
+
+  /* Sink (Sim -> Host): push received beats, backpressure when full. */
+  full = (s->s2h_head_local - s->s2h_tail_cached) == s->capacity;
+  if(full) {
+    s->s2h_tail_cached = __atomic_load_n(s->s2h_tail, __ATOMIC_ACQUIRE);
+    full = (s->s2h_head_local - s->s2h_tail_cached) == s->capacity;
+  }
+  *s->sink_ready = !full;
+  s->idle = *s->sink_valid ? 0 : s->idle + 1;
+  if(*s->sink_valid && !full) {
+    e = &s->s2h[s->s2h_head_local & mask];
+    e->data = *s->sink_data;
+    e->ctrl = (*s->sink_keep & 0xff) | ((uint64_t)(*s->sink_last & 1) << 8);
+    s->s2h_head_local++;
+    s->beats_out++;
+    __atomic_store_n(s->s2h_head, s->s2h_head_local, __ATOMIC_RELEASE);
+  }
+
+  /* Done. */
+  if(empty && __atomic_load_n(s->host_done, __ATOMIC_ACQUIRE) && (s->idle >= s->drain)) {
+    *s->done = 1;
+    if(!s->reported) {
+      axisshm_report(s);
+      s->reported = 1;
+    }
+  }
+
+  return RC_OK;
+}
+
+static struct ext_module_s ext_mod = {
+  "axisshm",
+  axisshm_start,
+  axisshm_new,
+  axisshm_add_pads,
+  axisshm_close,
+  axisshm_tick
+};
+
+int litex_sim_ext_module_init(int (*register_module)(struct ext_module_s *))
+{
+  return register_module(&ext_mod);
+}
@@ -0,0 +1,28 @@
+//
+// This file is part of LiteX-Verilog-AXIS-Test
+//
+// Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+// SPDX-License-Identifier: BSD-2-Clause
+
+// Simulation run length, overridable at runtime with +cycles=N/+beats=N/+frames=N plusargs (the
+// same simulation binary can then be used for short smoke runs and long soak runs).
+
+`timescale 1ns / 1ps
+
+module sim_run_length #(
+    parameter [63:0] CYCLES = 64'd10000,
+    parameter [63:0] BEATS  = 64'd0,
+    parameter [63:0] FRAMES = 64'd0
+) (
+    output reg [63:0] cycles,
+    output reg [63:0] beats,
+    output reg [63:0] frames
+);
+
+initial begin
+    if (!$value$plusargs("cycles=%d", cycles)) cycles = CYCLES;
+    if (!$value$plusargs("beats=%d",  beats))  beats  = BEATS;
+    if (!$value$plusargs("frames=%d", frames)) frames = FRAMES;
+end
+
+endmodule
@@ -0,0 +1,206 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Parallel Verilator simulation runner.
+
+import os
+import sys
+import time
+import shutil
+import threading
+import subprocess
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from litex.build.sim.config import SimConfig
+from litex.soc.integration.builder import Builder
+
+from verilog_axis.axis_common import colorer
+
+from sim.build_cache import BuildCache, build_key
+
+# Sim Result ---------------------------------------------------------------------------------------
+
+class SimResult:
+    def __init__(self, name, status, duration=0.0, log=None, cached=False, sim_duration=0.0, host=None):
+        self.name         = name
+        self.status       = status # DONE, ELABORATION ERROR, BUILD ERROR, TIMEOUT.
+        self.duration     = duration     # Total (Elaboration + Build + Simulation) wall-clock time.
+        self.sim_duration = sim_duration # Simulation wall-clock time.
+        self.log          = log
+        self.cached       = cached
+        self.host         = host # Return value of the simulation host (see run_sim).
+
+    @property
+    def done(self):
+        return self.status == "DONE"
+
+# Simulation modules (LiteX sim C modules) provided by the harness.
+sim_modules_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules")
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def _run(cmd, cwd, log, timeout=None):
+    with open(log, "a") as f:
+        return subprocess.run(cmd, cwd=cwd, stdout=f, stderr=subprocess.STDOUT, timeout=timeout).returncode
+
+class _redirect_output:
+    # Redirect stdout/stderr (at file descriptor level, to also capture logging and sub-processes)
+    # to a log file, to avoid interleaving outputs of parallel simulations.
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.stdout_fd = os.dup(1)
+        self.stderr_fd = os.dup(2)
+        self.f = open(self.log, "a")
+        os.dup2(self.f.fileno(), 1)
+        os.dup2(self.f.fileno(), 2)
+
+    def __exit__(self, *args):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(self.stdout_fd, 1)
+        os.dup2(self.stderr_fd, 2)
+        os.close(self.stdout_fd)
+        os.close(self.stderr_fd)
+        self.f.close()
+
+# Run Sim ------------------------------------------------------------------------------------------
+
+def run_sim(name, soc_factory, output_dir="build", timeout=None, verilator_build_kwargs={},
+    cache_dir    = None,
+    cache_size   = int(4e9),
+    cache_extra  = {},
+    python_files = [],
+    sim_args     = [],
+    sim_host     = None):
+    # Elaborate (with soc_factory), generate, compile and simulate a SoC in <output_dir>/<name>. The
+    # simulation output is written to <output_dir>/<name>/<name>.log for the caller to analyze. The
+    # sim_args (ex +plusargs) are passed to the simulation binary at runtime (not part of the build).
+    # The optional sim_host function (ex Python host of a shared-memory bridge) is run in a thread
+    # during the simulation with a threading.Event set once the simulation process has exited.
+    start        = time.time()
+    sim_dir      = os.path.abspath(os.path.join(output_dir, name))
+    gateware_dir = os.path.join(sim_dir, "gateware")
+    log          = os.path.join(sim_dir, f"{name}.log")
+    cache        = None if cache_dir is None else BuildCache(cache_dir, max_size=cache_size)
+    cache_key    = None
+    cache_hit    = False
+    sim_start    = None
+    host         = None
+    os.makedirs(sim_dir, exist_ok=True)
+    if os.path.exists(log):
+        os.remove(log)
+
+    def result(status):
+        sim_duration = 0.0 if sim_start is None else time.time() - sim_start
+        return SimResult(name, status, time.time() - start, log, cached=cache_hit, sim_duration=sim_duration, host=host)
+
+    # Elaborate/Generate (LiteX's Builder changes the current directory to the build directory and
+    # does not restore it on errors: restored here since pool workers are reused between tests).
+    cwd = os.getcwd()
+    try:
+        with _redirect_output(log):
+            soc = soc_factory()
+
+            # Sim Config/Modules (SoC's sim_modules: list of SimConfig.add_module arguments).
+            sim_config  = SimConfig(default_clk="sys_clk")
+            sim_modules = getattr(soc, "sim_modules", [])
+            extra_mods  = []
+            for module in sim_modules:
+                sim_config.add_module(**module)
+                if os.path.isdir(os.path.join(sim_modules_dir, module["name"])):
+                    extra_mods.append(module["name"])
+            extra_mods_files = [os.path.join(sim_modules_dir, m, f)
+                for m in extra_mods for f in sorted(os.listdir(os.path.join(sim_modules_dir, m)))]
+
+            if cache is not None:
+                cache_key = build_key(soc,
+                    build_kwargs = verilator_build_kwargs,
+                    extra        = {"extra_mods": extra_mods, **cache_extra},
+                    python_files = python_files + extra_mods_files,
+                )
+                cache_hit = cache.get(cache_key, gateware_dir)
+            if not cache_hit:
+                # Extra modules are copied to the build directory (LiteX generates a variables.mak
+                # in the extra modules directory).
+                extra_mods_path = os.path.join(sim_dir, "extra_modules")
+                for m in extra_mods:
+                    shutil.copytree(os.path.join(sim_modules_dir, m), os.path.join(extra_mods_path, m), dirs_exist_ok=True)
+                builder = Builder(soc, output_dir=sim_dir)
+                builder.build(
+                    sim_config      = sim_config,
+                    run             = False,
+                    interactive     = False,
+                    extra_mods      = extra_mods if len(extra_mods) else None,
+                    extra_mods_path = extra_mods_path,
+                    **verilator_build_kwargs
+                )
+            else:
+                # Sim Config is runtime configuration (ex module args), always regenerated.
+                with open(os.path.join(gateware_dir, "sim_config.js"), "w") as f:
+                    f.write(sim_config.get_json())
+    except Exception as e:
+        with open(log, "a") as f:
+            f.write(f"{e!r}\n")
+        return result("ELABORATION ERROR")
+    finally:
+        os.chdir(cwd)
+
+    # Compile (When not already in cache).
+    if not cache_hit:
+        if _run(["bash", "build_sim.sh"], cwd=gateware_dir, log=log) != 0:
+            return result("BUILD ERROR")
+        if cache is not None:
+            cache.put(cache_key, gateware_dir)
+
+    # Simulate.
+    sim_start   = time.time()
+    sim_exited  = threading.Event()
+    host_thread = None
+    if sim_host is not None:
+        def _host():
+            nonlocal host
+            try:
+                host = sim_host(sim_exited)
+            except Exception as e:
+                with open(log, "a") as f:
+                    f.write(f"Sim host: {e!r}\n")
+        host_thread = threading.Thread(target=_host)
+        host_thread.start()
+    try:
+        _run(["obj_dir/Vsim", *sim_args], cwd=gateware_dir, log=log, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return result("TIMEOUT")
+    finally:
+        sim_exited.set()
+        if host_thread is not None:
+            host_thread.join()
+
+    return result("DONE")
+
+# Run Parallel -------------------------------------------------------------------------------------
+
+def run_parallel(func, items, jobs=None, **kwargs):
+    # Run func(item, **kwargs) for each item in a process pool and return the results (in items
+    # order). Results must provide name/status/passed/duration/cached attributes for progress report.
+    results = [None]*len(items)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(func, item, **kwargs): n for n, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures)):
+            r = future.result()
+            print("[{:>3d}/{:>3d}] {:<32s} {} ({:.1f}s{})".format(
+                done + 1,
+                len(items),
+                r.name,
+                colorer(r.status, color="green" if r.passed else "red"),
+                r.duration,
+                ", cached" if r.cached else ""))
+            results[futures[future]] = r
+    return results
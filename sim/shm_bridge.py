@@ -0,0 +1,244 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Shared-memory AXI-Stream bridge between a Python host and the Verilator simulations (host side of
+# the axisshm simulation module, see sim/modules/axisshm).
+
+import os
+import mmap
+import array
+import asyncio
+import collections
+import struct
+
+# Shared Memory Layout -----------------------------------------------------------------------------
+
+# Header (4KB) followed by the Host -> Sim and Sim -> Host rings (capacity entries of 16 bytes: data
+# and ctrl (keep[7:0], last[8]) 64-bit words). Each index is on its own cache line and only written
+# by its owner (head: producer, tail: consumer): the rings are lock-free single-producer/single-
+# consumer rings. The host relies on the ordering of aligned 64-bit stores (entries are written
+# before the head is published), as provided by x86 (TSO).
+
+SHM_MAGIC        = 0x314d485353495841 # "AXISSHM1"
+SHM_HEADER_SIZE  = 4096
+SHM_MAGIC_OFF    = 0
+SHM_CAPACITY_OFF = 8
+SHM_HOST_DONE    = 16
+SHM_SIM_DONE     = 24
+SHM_H2S_HEAD     = 64
+SHM_H2S_TAIL     = 128
+SHM_S2H_HEAD     = 192
+SHM_S2H_TAIL     = 256
+SHM_ENTRY_SIZE   = 16
+
+BYTES_PER_BEAT = 8
+
+# Shared Memory Ring -------------------------------------------------------------------------------
+
+class SharedMemoryRing:
+    def __init__(self, shm, offset, capacity, head_offset, tail_offset):
+        self.shm         = shm
+        self.words       = memoryview(shm).cast("Q")
+        self.offset      = offset//8 # Entries offset (in 64-bit words).
+        self.capacity    = capacity
+        self.head_offset = head_offset//8
+        self.tail_offset = tail_offset//8
+
+    @property
+    def head(self):
+        return self.words[self.head_offset]
+
+    @property
+    def tail(self):
+        return self.words[self.tail_offset]
+
+    def level(self):
+        return self.head - self.tail
+
+    def push(self, words):
+        # Push entries (interleaved data/ctrl 64-bit words) as long as there is space, return the
+        # number of entries pushed.
+        head  = self.head
+        count = min(len(words)//2, self.capacity - (head - self.tail))
+        done  = 0
+        while done < count:
+            index = (head + done) % self.capacity
+            n     = min(count - done, self.capacity - index)
+            start = self.offset + 2*index
+            self.words[start:start + 2*n] = words[2*done:2*(done + n)]
+            done += n
+        self.words[self.head_offset] = head + count
+        return count
+
+    def pop(self, max_entries=None):
+        # Pop available entries, return them as interleaved data/ctrl 64-bit words.
+        tail  = self.tail
+        count = self.head - tail
+        if max_entries is not None:
+            count = min(count, max_entries)
+        words = array.array("Q")
+        done  = 0
+        while done < count:
+            index = (tail + done) % self.capacity
+            n     = min(count - done, self.capacity - index)
+            start = self.offset + 2*index
+            words.extend(self.words[start:start + 2*n])
+            done += n
+        self.words[self.tail_offset] = tail + count
+        return words
+
+# AXIS Shared Memory Bridge ------------------------------------------------------------------------
+
+# Host side of the bridge: creates the shared memory file (to be passed as path to the axisshm
+# simulation module) and provides bulk non-blocking (push/pop beats) and async (send/recv frames)
+# APIs. Beats are interleaved data/ctrl 64-bit words (see frame_words).
+
+class AXISSharedMemoryBridge:
+    def __init__(self, path, capacity=2**16, create=True):
+        assert capacity & (capacity - 1) == 0
+        self.path = path
+        size      = SHM_HEADER_SIZE + 2*capacity*SHM_ENTRY_SIZE
+        if create:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.ftruncate(fd, size)
+        else:
+            fd = os.open(path, os.O_RDWR)
+        self.shm = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        os.close(fd)
+        if create:
+            struct.pack_into("<QQ", self.shm, SHM_MAGIC_OFF, SHM_MAGIC, capacity)
+        else:
+            magic, capacity = struct.unpack_from("<QQ", self.shm, SHM_MAGIC_OFF)
+            assert magic == SHM_MAGIC
+        self.capacity = capacity
+        self.h2s = SharedMemoryRing(self.shm, SHM_HEADER_SIZE,                               capacity, SHM_H2S_HEAD, SHM_H2S_TAIL)
+        self.s2h = SharedMemoryRing(self.shm, SHM_HEADER_SIZE + capacity*SHM_ENTRY_SIZE, capacity, SHM_S2H_HEAD, SHM_S2H_TAIL)
+        self.exited     = None # Optional threading.Event set when the simulation process exits.
+        self._rx        = bytearray()
+        self._rx_frames = collections.deque()
+
+    # Control.
+    def set_host_done(self):
+        # Signal the simulation that the host will not push more beats.
+        struct.pack_into("<Q", self.shm, SHM_HOST_DONE, 1)
+
+    @property
+    def sim_done(self):
+        # Set by the simulation module on close, or simulation process exited (ex crash/timeout).
+        if (self.exited is not None) and self.exited.is_set():
+            return True
+        return struct.unpack_from("<Q", self.shm, SHM_SIM_DONE)[0] != 0
+
+    def close(self, unlink=True):
+        self.h2s.words.release()
+        self.s2h.words.release()
+        self.shm.close()
+        if unlink and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    # Bulk beats (non-blocking).
+    @staticmethod
+    def frame_words(frame):
+        # Convert a frame (bytes) to interleaved data/ctrl words.
+        n      = max(1, (len(frame) + BYTES_PER_BEAT - 1)//BYTES_PER_BEAT)
+        padded = bytes(frame) + bytes(n*BYTES_PER_BEAT - len(frame))
+        words  = array.array("Q", bytes(2*n*8))
+        words[0::2] = array.array("Q", padded)
+        words[1::2] = array.array("Q", [0xff])*n
+        last_bytes  = len(frame) - (n - 1)*BYTES_PER_BEAT
+        words[-1]   = (2**last_bytes - 1) | (1 << 8)
+        return words
+
+    def push(self, words):
+        return self.h2s.push(words)
+
+    def pop(self, max_beats=None):
+        return self.s2h.pop(max_beats)
+
+    def _rx_frames_update(self):
+        # Decode the received beats in bulk: data words are converted to bytes at once and split on
+        # the last beats (found on byte 1 of the ctrl words: last bit), keep only being applied on
+        # the last beat of each frame (other beats are full).
+        words = self.pop()
+        if len(words) == 0:
+            return
+        data  = words[0::2].tobytes()
+        lasts = words[1::2].tobytes()[1::8]
+        start = 0
+        end   = lasts.find(1)
+        while end >= 0:
+            keep = words[2*end + 1] & 0xff
+            self._rx += data[8*start:8*end + bin(keep).count("1")]
+            self._rx_frames.append(bytes(self._rx))
+            self._rx = bytearray()
+            start = end + 1
+            end   = lasts.find(1, start)
+        self._rx += data[8*start:]
+
+    # Async API.
+    async def send(self, words, poll=1e-6):
+        # Send interleaved data/ctrl words, waiting for space in the ring.
+        done = 0
+        while done < len(words)//2:
+            n = self.push(words[2*done:])
+            done += n
+            if n == 0:
+                if self.sim_done:
+                    raise BrokenPipeError("Simulation done.")
+                await asyncio.sleep(poll)
+
+    async def send_frame(self, frame, **kwargs):
+        await self.send(self.frame_words(frame), **kwargs)
+
+    async def recv_frame(self, poll=1e-6):
+        # Receive a frame (bytes), None if the simulation is done and no frame is available.
+        while True:
+            self._rx_frames_update()
+            if len(self._rx_frames):
+                return self._rx_frames.popleft()
+            if self.sim_done and self.s2h.level() == 0:
+                return None
+            await asyncio.sleep(poll)
+
+# Loopback Host ------------------------------------------------------------------------------------
+
+# Sends frames through the simulation and checks that the same frames are received back (for cores
+# forwarding frames unmodified), returns a dict of stats.
+
+def shm_loopback_host(bridge, frames=1000, min_length=1, max_length=1500, seed=1):
+    import random
+    rng = random.Random(seed)
+    tx  = [rng.randbytes(rng.randint(min_length, max_length)) for _ in range(frames)]
+
+    async def producer():
+        try:
+            for frame in tx:
+                await bridge.send_frame(frame)
+        except BrokenPipeError:
+            pass
+        finally:
+            bridge.set_host_done()
+
+    async def consumer():
+        rx = []
+        while len(rx) < len(tx):
+            frame = await bridge.recv_frame()
+            if frame is None:
+                break
+            rx.append(frame)
+        return rx
+
+    async def run():
+        _, rx = await asyncio.gather(producer(), consumer())
+        return rx
+
+    rx = asyncio.run(run())
+    return {
+        "frames_tx" : len(tx),
+        "frames_rx" : len(rx),
+        "bytes"     : sum(len(f) for f in rx),
+        "errors"    : sum(a != b for a, b in zip(tx, rx)) + abs(len(tx) - len(rx)),
+    }
@@ -0,0 +1,85 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Windowed/Triggered waveform tracing for the Verilator simulations.
+
+import os
+import hashlib
+import tempfile
+
+from functools import reduce
+from operator import or_
+
+from migen import *
+
+# Sim Trace ----------------------------------------------------------------------------------------
+
+# Drives the platform trace signal (LiteX only dumps the waveform when it is set, with --trace and
+# --trace-fst for compressed FST output) from:
+# - A cycle window: [start, end) (end=None: until the end of the simulation).
+# - Hardware triggers: the first assertion of one of the triggers enables tracing for length cycles
+#   (length=0: until the end of the simulation).
+# When neither a window nor triggers (None) are provided, tracing is always enabled.
+
+class SimTrace(Module):
+    def __init__(self, trace, timestamp, start=None, end=None, triggers=None, length=0):
+        self.trigger   = Signal() # Trigger event (one-shot).
+        self.triggered = Signal() # Trigger seen.
+
+        # # #
+
+        # Always enabled.
+        if (start is None) and (end is None) and (triggers is None):
+            self.comb += trace.eq(1)
+            return
+
+        # Window.
+        window = Signal()
+        if (start is not None) or (end is not None):
+            window_start = (timestamp >= start) if start is not None else 1
+            window_end   = (timestamp <  end)   if end   is not None else 1
+            self.comb += window.eq(window_start & window_end)
+
+        # Triggers.
+        triggered = Signal()
+        if triggers:
+            count = Signal(64)
+            self.comb += self.trigger.eq(reduce(or_, triggers) & ~self.triggered)
+            self.sync += [
+                If(self.trigger,
+                    self.triggered.eq(1),
+                    count.eq(length)
+                ).Elif(count != 0,
+                    count.eq(count - 1)
+                )
+            ]
+            if length:
+                self.comb += triggered.eq(self.trigger | (count > 1))
+            else:
+                self.comb += triggered.eq(self.trigger | self.triggered)
+
+        self.comb += trace.eq(window | triggered)
+
+# Trace Scopes -------------------------------------------------------------------------------------
+
+# Restrict tracing to the Verilog instances matching scopes (the top-level signals, ie the AXI-Stream
+# interfaces of the harness, are still traced) with a Verilator configuration file added to the
+# sources. The file is content-addressed so that it can be shared by parallel builds.
+
+def add_trace_scopes(platform, scopes, top="TOP.sim"):
+    if len(scopes) == 0:
+        return
+    config  = "`verilator_config\n"
+    config += f"tracing_off -scope \"{top}.*\"\n"
+    for scope in scopes:
+        config += f"tracing_on -scope \"{top}.{scope}*\"\n"
+    digest   = hashlib.sha256(config.encode()).hexdigest()[:16]
+    filename = os.path.join(tempfile.gettempdir(), f"sim_trace_{digest}.vlt")
+    if not os.path.exists(filename):
+        with open(filename + f".{os.getpid()}", "w") as f:
+            f.write(config)
+        os.replace(filename + f".{os.getpid()}", filename)
+    platform.add_source(filename)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import sys
+import logging
+import json
+import time
+import argparse
+import itertools
+
+from functools import partial
+
+from migen import *
+
+from litex.build.sim.verilator import verilator_build_args, verilator_build_argdict
+
+from litex.soc.interconnect.axi import *
+
+from verilog_axis.axis_common import *
+
+from sim.runner import run_sim, run_parallel
+
+import test_axis
+from test_axis import AXISSimSoC, parse_checkers, parse_histograms, parse_status
+
+# AXIS Sweeps --------------------------------------------------------------------------------------
+
+# Each sweep describes a wrapper configuration function (soc, platform, **params) and a default grid
+# of parameters (lists of values). Every point of the grid (cartesian product) is elaborated, built
+# and simulated as its own test, with timestamps embedded in the data for latency measurements.
+
+axis_sweeps = {}
+
+def axis_sweep(name, **grid):
+    def decorator(func):
+        axis_sweeps[name] = (func, grid)
+        return func
+    return decorator
+
+_data_widths = [8, 32, 128, 512, 1024]
+
+def _axis(data_width=32, id_width=0, dest_width=0, user_width=0):
+    return AXIStreamInterface(
+        data_width = data_width,
+        id_width   = id_width,
+        dest_width = dest_width,
+        user_width = user_width,
+    )
+
+@axis_sweep("axis_fifo", data_width=_data_widths, depth=[64, 4096])
+def axis_fifo_sweep(soc, platform, data_width, depth):
+    from verilog_axis.axis_fifo import AXISFIFO
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=depth)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS FIFO", m_axis)
+
+@axis_sweep("axis_fifo_sideband", data_width=[32, 256], id_width=[0, 8], dest_width=[0, 8], user_width=[0, 8])
+def axis_fifo_sideband_sweep(soc, platform, data_width, id_width, dest_width, user_width):
+    from verilog_axis.axis_fifo import AXISFIFO
+    s_axis = _axis(data_width, id_width, dest_width, user_width)
+    m_axis = _axis(data_width, id_width, dest_width, user_width)
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=1024)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS FIFO", m_axis)
+
+@axis_sweep("axis_srl_fifo", data_width=_data_widths, depth=[2, 16])
+def axis_srl_fifo_sweep(soc, platform, data_width, depth):
+    from verilog_axis.axis_srl_fifo import AXISSRLFIFO
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    soc.submodules.axis_srl_fifo = AXISSRLFIFO(platform, s_axis, m_axis, depth=depth)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS SRL FIFO", m_axis)
+
+@axis_sweep("axis_async_fifo", data_width=[8, 64, 1024], depth=[64, 4096])
+def axis_async_fifo_sweep(soc, platform, data_width, depth):
+    from verilog_axis.axis_async_fifo import AXISAsyncFIFO
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    soc.submodules.axis_async_fifo = AXISAsyncFIFO(platform, s_axis, m_axis, depth=depth)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Async FIFO", m_axis)
+
+@axis_sweep("axis_register", data_width=_data_widths, reg_type=[0, 1, 2])
+def axis_register_sweep(soc, platform, data_width, reg_type):
+    from verilog_axis.axis_register import AXISRegister
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    soc.submodules.axis_register = AXISRegister(platform, s_axis, m_axis, reg_type=reg_type)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Register", m_axis)
+
+@axis_sweep("axis_srl_register", data_width=_data_widths)
+def axis_srl_register_sweep(soc, platform, data_width):
+    from verilog_axis.axis_srl_register import AXISSRLRegister
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    soc.submodules.axis_srl_register = AXISSRLRegister(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS SRL Register", m_axis)
+
+@axis_sweep("axis_broadcast", data_width=[8, 64, 512], m_count=[2, 4, 8])
+def axis_broadcast_sweep(soc, platform, data_width, m_count):
+    from verilog_axis.axis_broadcast import AXISBroadcast
+    s_axis = _axis(data_width)
+    m_axis = [_axis(data_width) for _ in range(m_count)]
+    soc.submodules.axis_broadcast = AXISBroadcast(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis)
+    for n in range(m_count):
+        soc.add_checker(f"AXIS Broadcast {n}", m_axis[n])
+
+@axis_sweep("axis_arb_mux", data_width=[8, 64, 512], s_count=[2, 4, 8])
+def axis_arb_mux_sweep(soc, platform, data_width, s_count):
+    from verilog_axis.axis_arb_mux import AXISArbMux
+    s_axis = [_axis(data_width) for _ in range(s_count)]
+    m_axis = _axis(data_width)
+    soc.submodules.axis_arb_mux = AXISArbMux(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis[0])
+    soc.add_checker("AXIS Arb Mux", m_axis)
+
+@axis_sweep("axis_demux", data_width=[8, 64, 512], m_count=[2, 4, 8])
+def axis_demux_sweep(soc, platform, data_width, m_count):
+    from verilog_axis.axis_demux import AXISDemux
+    s_axis = _axis(data_width)
+    m_axis = [_axis(data_width) for _ in range(m_count)]
+    soc.submodules.axis_demux = AXISDemux(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Demux", m_axis[0])
+
+@axis_sweep("axis_switch", data_width=[8, 64, 512], s_count=[1, 2, 4], m_count=[1, 2, 4])
+def axis_switch_sweep(soc, platform, data_width, s_count, m_count, s_reg_type=0, m_reg_type=2):
+    from verilog_axis.axis_switch import AXISSwitch
+    # Slave tdest MSBs select the Master port (default routing), generator sends to Master 0.
+    m_dest_width = 1
+    s_dest_width = m_dest_width + log2_int(m_count, need_pow2=False)
+    s_axis = [_axis(data_width, dest_width=s_dest_width) for _ in range(s_count)]
+    m_axis = [_axis(data_width, dest_width=m_dest_width) for _ in range(m_count)]
+    soc.submodules.axis_switch = AXISSwitch(platform, s_axis, m_axis,
+        s_reg_type = s_reg_type,
+        m_reg_type = m_reg_type,
+    )
+
+    soc.add_generator(s_axis[0])
+    soc.add_checker("AXIS Switch", m_axis[0])
+
+@axis_sweep("axis_switch_reg", data_width=[64], s_reg_type=[0, 1, 2], m_reg_type=[0, 1, 2])
+def axis_switch_reg_sweep(soc, platform, data_width, s_reg_type, m_reg_type):
+    axis_switch_sweep(soc, platform, data_width, s_count=2, m_count=2,
+        s_reg_type = s_reg_type,
+        m_reg_type = m_reg_type,
+    )
+
+def sweep_points(sweep, overrides={}):
+    # Return the (sweep, params) points of a sweep grid (with values overridden by overrides).
+    func, grid = axis_sweeps[sweep]
+    grid = {k: overrides.get(k, v) for k, v in grid.items()}
+    return [(sweep, dict(zip(grid.keys(), values))) for values in itertools.product(*grid.values())]
+
+def sweep_point_name(sweep, params):
+    return sweep + "".join(f"_{k}{v}" for k, v in params.items())
+
+# Sweep Runner -------------------------------------------------------------------------------------
+
+class AXISSweepResult:
+    def __init__(self, sim_result, sweep, params, status, measures={}):
+        self.name     = sim_result.name
+        self.sweep    = sweep
+        self.params   = params
+        self.status   = status
+        self.measures = measures
+        self.duration = sim_result.duration
+        self.log      = sim_result.log
+        self.cached   = sim_result.cached
+
+    @property
+    def passed(self):
+        return self.status == "PASS"
+
+    def to_dict(self):
+        return {
+            "sweep"  : self.sweep,
+            "params" : self.params,
+            "status" : self.status,
+            **self.measures,
+        }
+
+def run_axis_sweep(point, cycles=10000, soc_kwargs={}, **kwargs):
+    sweep, params = point
+    func, grid    = axis_sweeps[sweep]
+    name          = sweep_point_name(sweep, params)
+    r = run_sim(name,
+        soc_factory  = lambda: AXISSimSoC(tests=[partial(func, **params)], latency_histogram=True, **soc_kwargs),
+        cache_extra  = {"sweep": sweep, "params": params, **soc_kwargs},
+        python_files = [__file__, test_axis.__file__],
+        sim_args     = [f"+cycles={cycles}"],
+        **kwargs
+    )
+    if not r.done:
+        return AXISSweepResult(r, sweep, params, r.status)
+
+    # Analyze.
+    checkers  = parse_checkers(r.log)
+    latencies = parse_histograms(r.log)
+    sim_cycles, _ = parse_status(r.log)
+    if (len(checkers) == 0) or (sim_cycles == 0):
+        return AXISSweepResult(r, sweep, params, "SIM ERROR")
+    passed     = all((errors == 0) and (beats > 0) for _, errors, beats, _, _ in checkers)
+    beats      = min(beats for _, _, beats, _, _ in checkers)
+    data_width = params.get("data_width", 32)
+    measures   = {
+        "cycles"          : sim_cycles,
+        "beats"           : beats,
+        "beats_per_cycle" : beats/sim_cycles,
+        "bytes_per_cycle" : beats*data_width/8/sim_cycles,
+        "avg_latency"     : max(l["sum"]/max(1, sum(c for _, _, c in l["bins"])) for l in latencies.values()),
+        "max_latency"     : max(l["max"] for l in latencies.values()),
+    }
+    return AXISSweepResult(r, sweep, params, "PASS" if passed else "FAIL", measures)
+
+def axis_sweeps_report(results, sys_clk_freq=100e6):
+    print("-"*120)
+    print(f"{'Point':<60s} {'Status':<18s} {'Beats/Cycle':>11s} {'Gbps':>8s} {'Avg Lat':>8s} {'Max Lat':>8s}")
+    print("-"*120)
+    for r in results:
+        if len(r.measures):
+            m = r.measures
+            gbps = 8*m["bytes_per_cycle"]*sys_clk_freq/1e9
+            print(f"{r.name:<60s} {r.status:<18s} {m['beats_per_cycle']:>11.3f} {gbps:>8.2f} {m['avg_latency']:>8.1f} {m['max_latency']:>8d}")
+        else:
+            print(f"{r.name:<60s} {r.status:<18s} See {r.log}")
+    print("-"*120)
+    passed = sum(r.passed for r in results)
+    print(f"{passed}/{len(results)} points passed (Gbps @ {sys_clk_freq/1e6:.0f}MHz).")
+
+# Build --------------------------------------------------------------------------------------------
+
+def _param(s):
+    # key=v0,v1,... -> (key, [v0, v1, ...]).
+    key, values = s.split("=")
+    return key, [int(v, 0) for v in values.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX Verilog AXIS parameter sweep regression.")
+    parser.add_argument("--sweep",       default=[], action="append",  help="Sweep(s) to run (default: all).", choices=list(axis_sweeps.keys()))
+    parser.add_argument("--param",       default=[], action="append", type=_param, help="Override grid values (ex data_width=8,64,1024).")
+    parser.add_argument("--list",        action="store_true",              help="List sweep points and exit.")
+    parser.add_argument("--parallel",    default=os.cpu_count(), type=int, help="Number of points built/simulated in parallel.")
+    parser.add_argument("--cycles",      default=10000,          type=int, help="Number of simulated cycles per point.")
+    parser.add_argument("--timeout",     default=None,           type=float, help="Simulation timeout per point (s).")
+    parser.add_argument("--valid-probability", default=100,      type=int, help="Generators valid probability (%%).")
+    parser.add_argument("--ready-probability", default=100,      type=int, help="Checkers ready probability (%%).")
+    parser.add_argument("--seed",              default=1,        type=int, help="Generators/Checkers LFSR seed.")
+    parser.add_argument("--output-dir",  default="build/sweep",            help="Base output directory.")
+    parser.add_argument("--cache-dir",   default="build/cache",            help="Build cache directory.")
+    parser.add_argument("--cache-size",  default=4.0,            type=float, help="Build cache maximum size (GB).")
+    parser.add_argument("--no-cache",    action="store_true",              help="Disable build cache.")
+    parser.add_argument("--json",        default="sweep_axis.json",        help="JSON results file.")
+    verilator_build_args(parser)
+    args = parser.parse_args()
+
+    # Wrappers logs (in each test/benchmark log).
+    logging.basicConfig(level=logging.INFO)
+
+    sweeps = args.sweep if len(args.sweep) else list(axis_sweeps.keys())
+    points = []
+    for sweep in sweeps:
+        points += sweep_points(sweep, overrides=dict(args.param))
+    if args.list:
+        for sweep, params in points:
+            print(sweep_point_name(sweep, params))
+        return
+
+    results = run_parallel(run_axis_sweep, points,
+        jobs                   = args.parallel,
+        output_dir             = args.output_dir,
+        cycles                 = args.cycles,
+        soc_kwargs             = dict(
+            valid_probability = args.valid_probability,
+            ready_probability = args.ready_probability,
+            seed              = args.seed,
+        ),
+        timeout                = args.timeout,
+        verilator_build_kwargs = verilator_build_argdict(args),
+        cache_dir              = None if args.no_cache else args.cache_dir,
+        cache_size             = int(args.cache_size*1e9),
+    )
+    axis_sweeps_report(results)
+
+    with open(args.json, "w") as f:
+        json.dump({
+            "date"    : time.strftime("%Y-%m-%d %H:%M:%S"),
+            "cycles"  : args.cycles,
+            "results" : [r.to_dict() for r in results],
+        }, f, indent=4)
+    print(f"Results written to {args.json}.")
+    sys.exit(0 if all(r.passed for r in results) else 1)
+
+if __name__ == "__main__":
+    main()
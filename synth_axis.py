@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import hashlib
+import argparse
+import itertools
+import subprocess
+
+from migen import *
+from migen.fhdl import verilog
+
+from litex.soc.interconnect.axi import AXIStreamInterface
+
+from verilog_axis.axis_common import *
+from verilog_axis.axis_resources import axis_resources, axis_instances, yosys_stat_resources, AXISResourceModel
+
+from sim.runner import run_parallel, _redirect_output
+
+from test_axis import Platform
+
+# AXIS Synths --------------------------------------------------------------------------------------
+
+# Each synth describes a wrapper configuration function (platform, **params) returning the wrapper
+# and its interfaces and a default grid of parameters (lists of values). Every point of the grid
+# (cartesian product) is elaborated standalone (interfaces as top-level ports), synthesized with
+# Yosys and placed/routed with nextpnr (out-of-context, Fmax from the nextpnr report).
+
+axis_synths = {}
+
+def axis_synth(name, **grid):
+    def decorator(func):
+        axis_synths[name] = (func, grid)
+        return func
+    return decorator
+
+def _axis(data_width=32, id_width=0, dest_width=0, user_width=0, clock_domain="sys"):
+    return AXIStreamInterface(
+        data_width   = data_width,
+        id_width     = id_width,
+        dest_width   = dest_width,
+        user_width   = user_width,
+        clock_domain = clock_domain,
+    )
+
+@axis_synth("axis_fifo", data_width=[8, 64, 512], depth=[64, 4096])
+def axis_fifo_synth(platform, data_width, depth):
+    from verilog_axis.axis_fifo import AXISFIFO
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    return AXISFIFO(platform, s_axis, m_axis, depth=depth), [s_axis, m_axis]
+
+@axis_synth("axis_srl_fifo", data_width=[8, 64, 512], depth=[4, 16])
+def axis_srl_fifo_synth(platform, data_width, depth):
+    from verilog_axis.axis_srl_fifo import AXISSRLFIFO
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    return AXISSRLFIFO(platform, s_axis, m_axis, depth=depth), [s_axis, m_axis]
+
+@axis_synth("axis_async_fifo", data_width=[8, 64, 512], depth=[64, 4096])
+def axis_async_fifo_synth(platform, data_width, depth):
+    from verilog_axis.axis_async_fifo import AXISAsyncFIFO
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width, clock_domain="m")
+    return AXISAsyncFIFO(platform, s_axis, m_axis, depth=depth), [s_axis, m_axis]
+
+@axis_synth("axis_register", data_width=[8, 64, 512], reg_type=[0, 1, 2])
+def axis_register_synth(platform, data_width, reg_type):
+    from verilog_axis.axis_register import AXISRegister
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    return AXISRegister(platform, s_axis, m_axis, reg_type=reg_type), [s_axis, m_axis]
+
+@axis_synth("axis_srl_register", data_width=[8, 64, 512])
+def axis_srl_register_synth(platform, data_width):
+    from verilog_axis.axis_srl_register import AXISSRLRegister
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    return AXISSRLRegister(platform, s_axis, m_axis), [s_axis, m_axis]
+
+@axis_synth("axis_adapter", s_data_width=[8, 64, 512], m_data_width=[8, 64, 512])
+def axis_adapter_synth(platform, s_data_width, m_data_width):
+    from verilog_axis.axis_adapter import AXISAdapter
+    s_axis = _axis(s_data_width)
+    m_axis = _axis(m_data_width)
+    return AXISAdapter(platform, s_axis, m_axis), [s_axis, m_axis]
+
+@axis_synth("axis_arb_mux", data_width=[8, 64, 512], s_count=[2, 4, 8])
+def axis_arb_mux_synth(platform, data_width, s_count):
+    from verilog_axis.axis_arb_mux import AXISArbMux
+    s_axis = [_axis(data_width) for _ in range(s_count)]
+    m_axis = _axis(data_width)
+    return AXISArbMux(platform, s_axis, m_axis), s_axis + [m_axis]
+
+@axis_synth("axis_demux", data_width=[8, 64, 512], m_count=[2, 4, 8])
+def axis_demux_synth(platform, data_width, m_count):
+    from verilog_axis.axis_demux import AXISDemux
+    s_axis = _axis(data_width)
+    m_axis = [_axis(data_width) for _ in range(m_count)]
+    return AXISDemux(platform, s_axis, m_axis), [s_axis] + m_axis
+
+@axis_synth("axis_broadcast", data_width=[8, 64, 512], m_count=[2, 4, 8])
+def axis_broadcast_synth(platform, data_width, m_count):
+    from verilog_axis.axis_broadcast import AXISBroadcast
+    s_axis = _axis(data_width)
+    m_axis = [_axis(data_width) for _ in range(m_count)]
+    return AXISBroadcast(platform, s_axis, m_axis), [s_axis] + m_axis
+
+@axis_synth("axis_switch", data_width=[8, 64, 512], s_count=[2, 4], m_count=[2, 4])
+def axis_switch_synth(platform, data_width, s_count, m_count):
+    from verilog_axis.axis_switch import AXISSwitch
+    m_dest_width = 1
+    s_dest_width = m_dest_width + log2_int(m_count, need_pow2=False)
+    s_axis = [_axis(data_width, dest_width=s_dest_width) for _ in range(s_count)]
+    m_axis = [_axis(data_width, dest_width=m_dest_width) for _ in range(m_count)]
+    return AXISSwitch(platform, s_axis, m_axis), s_axis + m_axis
+
+@axis_synth("axis_rate_limit", data_width=[8, 64, 512])
+def axis_rate_limit_synth(platform, data_width):
+    from verilog_axis.axis_rate_limit import AXISRateLimit
+    s_axis = _axis(data_width)
+    m_axis = _axis(data_width)
+    return AXISRateLimit(platform, s_axis, m_axis), [s_axis, m_axis]
+
+def synth_points(synth, overrides={}):
+    # Return the (synth, params) points of a synth grid (with values overridden by overrides).
+    func, grid = axis_synths[synth]
+    grid = {k: overrides.get(k, v) for k, v in grid.items()}
+    return [(synth, dict(zip(grid.keys(), values))) for values in itertools.product(*grid.values())]
+
+def synth_point_name(synth, params):
+    return synth + "".join(f"_{k}{v}" for k, v in params.items())
+
+# Synthesis Flows ----------------------------------------------------------------------------------
+
+# Yosys synthesis script and nextpnr command (None: utilization only) of each family.
+
+synth_flows = {
+    "ecp5"   : dict(synth="synth_ecp5 -top top -json top.json",         pnr="nextpnr-ecp5 --{device} --package CABGA381"),
+    "xilinx" : dict(synth="synth_xilinx -flatten -top top -json top.json", pnr=None),
+}
+
+def _tool_version(tool):
+    try:
+        return subprocess.run([tool, "--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            timeout=30).stdout.decode(errors="replace").strip()
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+def _hash(h, name, value):
+    h.update(json.dumps([name, value], sort_keys=True, default=repr).encode())
+
+def _parse_yosys_stat(filename):
+    # Cells count ({cell: count}) of the top (flattened) design from a Yosys "stat -json" report.
+    with open(filename) as f:
+        content = f.read()
+    stat = json.loads(content[content.index("{"):])
+    if "design" in stat:
+        return stat["design"]["num_cells_by_type"]
+    return next(iter(stat["modules"].values()))["num_cells_by_type"]
+
+def _parse_nextpnr_report(filename):
+    # Minimum achieved frequency (MHz) over the clocks from a nextpnr JSON report.
+    with open(filename) as f:
+        report = json.load(f)
+    fmax = [clk["achieved"] for clk in report.get("fmax", {}).values()]
+    return min(fmax) if len(fmax) else None
+
+# Synth Runner -------------------------------------------------------------------------------------
+
+class AXISSynthResult:
+    def __init__(self, name, synth, params, status, duration=0.0, log=None, cached=False, measures={}, instances=[]):
+        self.name      = name
+        self.synth     = synth
+        self.params    = params
+        self.status    = status # DONE, ELABORATION ERROR, SYNTH ERROR, PNR ERROR, TIMEOUT, NO TOOLS.
+        self.duration  = duration
+        self.log       = log
+        self.cached    = cached
+        self.measures  = measures
+        self.instances = instances
+
+    @property
+    def passed(self):
+        return self.status == "DONE"
+
+    def to_dict(self):
+        return {
+            "synth"     : self.synth,
+            "params"    : self.params,
+            "status"    : self.status,
+            "instances" : self.instances,
+            **self.measures,
+        }
+
+def run_axis_synth(point, family="ecp5", device="45k", freq=200, output_dir="build/synth",
+    cache_dir = "build/synth_cache",
+    timeout   = None):
+    # Elaborate/Synthesize/Place & Route a synth point in <output_dir>/<name>, results are cached in
+    # <cache_dir>/<key>.json with key hashing the point, the flow, the tools versions and the content
+    # of the generated top and of the Verilog sources (so a bump of the verilog submodule invalidates
+    # the results).
+    synth, params = point
+    func, grid    = axis_synths[synth]
+    name          = synth_point_name(synth, params)
+    flow          = synth_flows[family]
+    build_dir     = os.path.abspath(os.path.join(output_dir, family, name))
+    log           = os.path.join(build_dir, f"{name}.log")
+    start         = time.time()
+    os.makedirs(build_dir, exist_ok=True)
+    if os.path.exists(log):
+        os.remove(log)
+
+    def result(status, **kwargs):
+        return AXISSynthResult(name, synth, params, status, time.time() - start, log, **kwargs)
+
+    # Elaborate/Generate.
+    try:
+        with _redirect_output(log):
+            platform        = Platform()
+            wrapper, axis   = func(platform, **params)
+            instances       = [{"core": core, "parameters": parameters} for core, parameters in axis_instances(wrapper)]
+            top             = Module()
+            top.submodules += wrapper
+            ios             = {s for interface in axis for s in interface.flatten()}
+            verilog.convert(top, ios=ios, name="top").write(os.path.join(build_dir, "top.v"))
+            sources = [os.path.join(build_dir, "top.v")] + [f for f, *_ in platform.sources]
+    except Exception as e:
+        with open(log, "a") as f:
+            f.write(f"{e!r}\n")
+        return result("ELABORATION ERROR")
+
+    # Cache.
+    yosys  = "yosys"
+    pnr    = None if flow["pnr"] is None else flow["pnr"].format(device=device)
+    tools  = [yosys] + ([] if pnr is None else [pnr.split()[0]])
+    if any(shutil.which(tool) is None for tool in tools):
+        return result("NO TOOLS", instances=instances)
+    h = hashlib.sha256()
+    _hash(h, "point",   [synth, params])
+    _hash(h, "flow",    [family, device, freq, flow])
+    _hash(h, "tools",   [_tool_version(tool) for tool in tools])
+    for source in sources:
+        with open(source, "rb") as f:
+            _hash(h, os.path.basename(source), hashlib.sha256(f.read()).hexdigest())
+    cache_file = None if cache_dir is None else os.path.join(cache_dir, f"{h.hexdigest()}.json")
+    if (cache_file is not None) and os.path.exists(cache_file):
+        with open(cache_file) as f:
+            measures = json.load(f)
+        return result("DONE", cached=True, measures=measures, instances=instances)
+
+    def run(cmd):
+        with open(log, "a") as f:
+            f.write(f"$ {' '.join(cmd)}\n")
+            f.flush()
+            return subprocess.run(cmd, cwd=build_dir, stdout=f, stderr=subprocess.STDOUT, timeout=timeout).returncode
+
+    try:
+        # Synthesis.
+        script = "; ".join([f"read_verilog {source}" for source in sources] + [
+            flow["synth"],
+            "tee -q -o stat.json stat -json",
+        ])
+        if run([yosys, "-q", "-p", script]) != 0:
+            return result("SYNTH ERROR", instances=instances)
+        cells     = _parse_yosys_stat(os.path.join(build_dir, "stat.json"))
+        resources = yosys_stat_resources(cells, family)
+
+        # Place & Route (Out-of-context: interfaces are not placed on IOs).
+        fmax = None
+        if pnr is not None:
+            cmd = pnr.split() + ["--json", "top.json", "--out-of-context", "--freq", str(freq),
+                "--report", "report.json"]
+            if run(cmd) != 0:
+                return result("PNR ERROR", instances=instances)
+            fmax = _parse_nextpnr_report(os.path.join(build_dir, "report.json"))
+    except subprocess.TimeoutExpired:
+        return result("TIMEOUT", instances=instances)
+
+    measures = {**resources, "fmax": fmax, "cells": cells}
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{cache_file}.tmp-{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(measures, f)
+        os.replace(tmp, cache_file)
+    return result("DONE", measures=measures, instances=instances)
+
+# Report/Regressions -------------------------------------------------------------------------------
+
+def axis_synths_report(results):
+    print("-"*120)
+    print(f"{'Point':<50s} {'Status':<18s} " + " ".join(f"{r.upper():>7s}" for r in axis_resources) + f" {'Fmax':>9s}")
+    print("-"*120)
+    for r in results:
+        if r.passed:
+            fmax = "-" if r.measures["fmax"] is None else f"{r.measures['fmax']:.1f}MHz"
+            print(f"{r.name:<50s} {r.status:<18s} " + " ".join(f"{r.measures[k]:>7g}" for k in axis_resources) + f" {fmax:>9s}")
+        else:
+            print(f"{r.name:<50s} {r.status:<18s} See {r.log}")
+    print("-"*120)
+    print(f"{sum(r.passed for r in results)}/{len(results)} points synthesized.")
+
+def axis_synths_regressions(results, baseline, fmax_tolerance=5.0):
+    # Return the points whose Fmax decreased by more than fmax_tolerance (%) compared to baseline
+    # (results JSON file of a previous run).
+    with open(baseline) as f:
+        reference = {synth_point_name(r["synth"], r["params"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        ref = reference.get(r.name, {})
+        if r.passed and (r.measures["fmax"] is not None) and (ref.get("fmax", None) is not None):
+            if r.measures["fmax"] < ref["fmax"]*(1 - fmax_tolerance/100):
+                regressions.append((r.name, ref["fmax"], r.measures["fmax"]))
+    return regressions
+
+def axis_synths_calibrate(results, family, filename):
+    # Calibrate an AXISResourceModel on the points with a single Verilog-AXIS Instance.
+    samples = [(r.instances[0]["core"], r.instances[0]["parameters"], r.measures)
+        for r in results if r.passed and len(r.instances) == 1]
+    model = AXISResourceModel()
+    model.calibrate(samples, family=family)
+    model.save(filename)
+    print(f"Resource model calibrated on {len(samples)} points, mean relative error: " +
+        ", ".join(f"{k}: {100*v:.1f}%" for k, v in model.error(samples).items()))
+    print(f"Resource model written to {filename}.")
+
+# Build --------------------------------------------------------------------------------------------
+
+def _param(s):
+    # key=v0,v1,... -> (key, [v0, v1, ...]).
+    key, values = s.split("=")
+    return key, [int(v, 0) for v in values.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX Verilog AXIS synthesis (Yosys/nextpnr) benchmark.")
+    parser.add_argument("--synth",       default=[], action="append",  help="Synth(s) to run (default: all).", choices=list(axis_synths.keys()))
+    parser.add_argument("--param",       default=[], action="append", type=_param, help="Override grid values (ex data_width=8,64,1024).")
+    parser.add_argument("--list",        action="store_true",              help="List synth points and exit.")
+    parser.add_argument("--family",      default="ecp5",                   help="FPGA family.", choices=list(synth_flows.keys()))
+    parser.add_argument("--device",      default="45k",                    help="nextpnr device (ex 25k, 45k, 85k for ECP5).")
+    parser.add_argument("--freq",        default=200,            type=float, help="nextpnr target frequency (MHz).")
+    parser.add_argument("--parallel",    default=os.cpu_count(), type=int, help="Number of points synthesized in parallel.")
+    parser.add_argument("--timeout",     default=None,           type=float, help="Synthesis/PnR timeout per point (s).")
+    parser.add_argument("--output-dir",  default="build/synth",            help="Base output directory.")
+    parser.add_argument("--cache-dir",   default="build/synth_cache",      help="Results cache directory.")
+    parser.add_argument("--no-cache",    action="store_true",              help="Disable results cache.")
+    parser.add_argument("--baseline",    default=None,                     help="Previous JSON results file to check Fmax regressions against.")
+    parser.add_argument("--fmax-tolerance", default=5.0,         type=float, help="Fmax regression tolerance (%%).")
+    parser.add_argument("--calibrate",   default=None,                     help="Calibrate the resource model on the results and write it to this JSON file.")
+    parser.add_argument("--json",        default="synth_axis.json",        help="JSON results file.")
+    args = parser.parse_args()
+
+    # Wrappers logs (in each point log).
+    logging.basicConfig(level=logging.INFO)
+
+    synths = args.synth if len(args.synth) else list(axis_synths.keys())
+    points = []
+    for synth in synths:
+        points += synth_points(synth, overrides=dict(args.param))
+    if args.list:
+        for synth, params in points:
+            print(synth_point_name(synth, params))
+        return
+
+    results = run_parallel(run_axis_synth, points,
+        jobs       = args.parallel,
+        family     = args.family,
+        device     = args.device,
+        freq       = args.freq,
+        output_dir = args.output_dir,
+        cache_dir  = None if args.no_cache else args.cache_dir,
+        timeout    = args.timeout,
+    )
+    axis_synths_report(results)
+
+    regressions = []
+    if args.baseline is not None:
+        regressions = axis_synths_regressions(results, args.baseline, args.fmax_tolerance)
+        for name, ref, fmax in regressions:
+            print(colorer(f"Fmax regression: {name}: {ref:.1f}MHz -> {fmax:.1f}MHz", color="red"))
+
+    if args.calibrate is not None:
+        axis_synths_calibrate(results, args.family, args.calibrate)
+
+    with open(args.json, "w") as f:
+        json.dump({
+            "date"    : time.strftime("%Y-%m-%d %H:%M:%S"),
+            "family"  : args.family,
+            "device"  : args.device,
+            "results" : [r.to_dict() for r in results],
+        }, f, indent=4)
+    print(f"Results written to {args.json}.")
+    sys.exit(0 if all(r.passed for r in results) and not len(regressions) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,15 @@
 # Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
 # SPDX-License-Identifier: BSD-2-Clause
 
+import os
+import re
+import sys
+import logging
 import argparse
+import tempfile
+
+from functools import reduce
+from operator import and_, or_
 
 from migen import *
 
@@ -23,6 +31,10 @@ from litex.soc.interconnect.axi import *
 
 from verilog_axis.axis_common import *
 
+from sim.runner import run_sim, run_parallel
+from sim.trace import SimTrace, add_trace_scopes
+from sim.shm_bridge import AXISSharedMemoryBridge, shm_loopback_host
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -40,6 +52,40 @@ _io = [
         Subsignal("sink_ready", Pins(1)),
         Subsignal("sink_data",  Pins(8)),
     ),
+
+    # AXIS File (File-backed stimulus/capture, see sim/modules/axisfile).
+    ("axis_file", 0,
+        Subsignal("source_valid", Pins(1)),
+        Subsignal("source_ready", Pins(1)),
+        Subsignal("source_data",  Pins(64)),
+        Subsignal("source_keep",  Pins(8)),
+        Subsignal("source_last",  Pins(1)),
+
+        Subsignal("sink_valid", Pins(1)),
+        Subsignal("sink_ready", Pins(1)),
+        Subsignal("sink_data",  Pins(64)),
+        Subsignal("sink_keep",  Pins(8)),
+        Subsignal("sink_last",  Pins(1)),
+
+        Subsignal("done", Pins(1)),
+    ),
+
+    # AXIS Shared Memory (Python host bridge, see sim/modules/axisshm and sim/shm_bridge.py).
+    ("axis_shm", 0,
+        Subsignal("source_valid", Pins(1)),
+        Subsignal("source_ready", Pins(1)),
+        Subsignal("source_data",  Pins(64)),
+        Subsignal("source_keep",  Pins(8)),
+        Subsignal("source_last",  Pins(1)),
+
+        Subsignal("sink_valid", Pins(1)),
+        Subsignal("sink_ready", Pins(1)),
+        Subsignal("sink_data",  Pins(64)),
+        Subsignal("sink_keep",  Pins(8)),
+        Subsignal("sink_last",  Pins(1)),
+
+        Subsignal("done", Pins(1)),
+    ),
 ]
 
 # Platform -----------------------------------------------------------------------------------------
@@ -49,400 +95,1371 @@ class Platform(SimPlatform):
     def __init__(self):
         SimPlatform.__init__(self, "SIM", _io)
 
+# LFSR Pattern -------------------------------------------------------------------------------------
+
+# Seedable pseudo-random enable pattern: every burst cycles, a 32-bit Xorshift LFSR is compared
+# against the probability to enable/disable the output for the next burst cycles.
+
+class LFSRPattern(Module):
+    def __init__(self, probability=100, burst=1, seed=1):
+        assert 0 <= probability <= 100
+        assert burst >= 1
+        self.o = Signal(reset=int(probability == 100))
+
+        # # #
+
+        if probability in [0, 100]:
+            return
+
+        lfsr  = Signal(32, reset=(seed & 0xffffffff) or 1)
+        lfsr0 = Signal(32)
+        lfsr1 = Signal(32)
+        count = Signal(max=burst + 1)
+        threshold = (probability*2**16)//100
+        self.comb += [
+            lfsr0.eq(lfsr  ^ (lfsr  << 13)),
+            lfsr1.eq(lfsr0 ^ (lfsr0 >> 17)),
+        ]
+        self.sync += [
+            lfsr.eq(lfsr1 ^ (lfsr1 << 5)),
+            count.eq(count - 1),
+            If(count == 0,
+                count.eq(burst - 1),
+                self.o.eq(lfsr[:16] < threshold)
+            )
+        ]
+
 # AXIS Generator -----------------------------------------------------------------------------------
 
-# FIXME: Minimal Generator, Improve.
+# Generates incrementing data with a pseudo-random valid pattern (valid_probability in %, held for
+# valid_burst cycles). Valid/Data are only updated when the beat is accepted (or not presented) to
+# respect AXI-Stream rules. When a timestamp is provided, it is embedded in the timestamp_field
+# ("data" or "user") of each beat when first presented on the interface (for latency measurements).
 
 class AXISGenerator(Module):
-    def __init__(self, axis):
-        self.comb += axis.valid.eq(1)
-        self.sync += If(axis.valid & axis.ready, axis.data.eq(axis.data + 1))
+    def __init__(self, axis, valid_probability=100, valid_burst=1, seed=1,
+        timestamp       = None,
+        timestamp_field = "data"):
+        assert timestamp_field in ["data", "user"]
+        self.submodules.pattern = pattern = LFSRPattern(valid_probability, valid_burst, seed)
+        self.sync += If(~axis.valid | axis.ready,
+            axis.valid.eq(pattern.o)
+        )
+        if timestamp is not None:
+            field = getattr(axis, timestamp_field)
+            self.sync += If(~axis.valid | axis.ready,
+                field.eq(timestamp[:len(field)])
+            )
+        if (timestamp is None) or (timestamp_field != "data"):
+            self.sync += If(axis.valid & axis.ready,
+                axis.data.eq(axis.data + 1)
+            )
 
 # AXIS Checker -------------------------------------------------------------------------------------
 
-# FIXME: Minimal Checker, Improve.
+# Checks incrementing data with a pseudo-random ready pattern (ready_probability in %, held for
+# ready_burst cycles) and counts data beats (cycles), stall cycles (valid & ~ready: backpressure
+# from the checker) and idle cycles (~valid & ready: bubbles from the core) separately.
 
 class AXISChecker(Module):
-    def __init__(self, axis):
+    def __init__(self, axis, ready_probability=100, ready_burst=1, seed=1, data_check=True):
         self.errors = Signal(32)
-        self.cycles = Signal(32)
+        self.cycles = Signal(64)
+        self.stalls = Signal(64)
+        self.idles  = Signal(64)
+
+        # # #
+
+        self.submodules.pattern = pattern = LFSRPattern(ready_probability, ready_burst, seed)
+        self.comb += axis.ready.eq(pattern.o)
 
         axis_data_last = Signal(len(axis.data), reset=(2**len(axis.data)-1))
-        self.comb += axis.ready.eq(1)
+        axis_data_next = Signal(len(axis.data))
+        self.comb += axis_data_next.eq(axis_data_last + 1)
         self.sync += [
             If(axis.valid & axis.ready,
                 self.cycles.eq(self.cycles + 1),
-                If(axis.data != (axis_data_last + 1),
+                If((axis.data != axis_data_next) & data_check,
                     self.errors.eq(self.errors + 1)
                 ),
                 axis_data_last.eq(axis.data)
+            ),
+            If(axis.valid & ~axis.ready,
+                self.stalls.eq(self.stalls + 1)
+            ),
+            If(~axis.valid & axis.ready,
+                self.idles.eq(self.idles + 1)
+            )
+        ]
+
+# AXIS Latency Checker -----------------------------------------------------------------------------
+
+# AXISChecker measuring the latency (timestamp - timestamp embedded by the AXISGenerator) of each
+# beat in an on-chip histogram of bins (of bin_width cycles, the last bin also collects the higher
+# latencies). With timestamps in data, the data check verifies that timestamps are increasing.
+
+class AXISLatencyChecker(AXISChecker):
+    def __init__(self, axis, timestamp, timestamp_field="data", bins=16, bin_width=1, **kwargs):
+        assert timestamp_field in ["data", "user"]
+        AXISChecker.__init__(self, axis, data_check=(timestamp_field != "data"), **kwargs)
+        self.bins        = bins
+        self.bin_width   = bin_width
+        self.histogram   = [Signal(32) for _ in range(bins)]
+        self.max_latency = Signal(32)
+        self.sum_latency = Signal(64)
+
+        # # #
+
+        field    = getattr(axis, timestamp_field)
+        ts_width = min(len(timestamp), len(field))
+        ts_mask  = 2**ts_width - 1
+
+        # Latency.
+        latency = Signal(32)
+        self.comb += latency.eq((timestamp - field[:ts_width]) & ts_mask)
+
+        # Bin.
+        bin = Signal(max=max(2, bins))
+        for i in range(1, bins):
+            self.comb += If(latency >= i*bin_width, bin.eq(i))
+
+        # Histogram/Stats.
+        histogram = Array(self.histogram)
+        self.sync += If(axis.valid & axis.ready,
+            histogram[bin].eq(histogram[bin] + 1),
+            self.sum_latency.eq(self.sum_latency + latency),
+            If(latency > self.max_latency,
+                self.max_latency.eq(latency)
+            )
+        )
+
+        # Timestamps check.
+        if timestamp_field == "data":
+            ts_last  = Signal(ts_width)
+            ts_delta = Signal(ts_width)
+            self.comb += ts_delta.eq(field[:ts_width] - ts_last)
+            self.sync += If(axis.valid & axis.ready,
+                ts_last.eq(field[:ts_width]),
+                If((self.cycles != 0) & ((ts_delta == 0) | ts_delta[-1]),
+                    self.errors.eq(self.errors + 1)
+                )
+            )
+
+    def get_displays(self, name):
+        displays = [Display(f"{name:<18s}Latency Max: %d / Sum: %d", self.max_latency, self.sum_latency)]
+        for i in range(self.bins):
+            low  = i*self.bin_width
+            high = "inf" if i == (self.bins - 1) else str((i + 1)*self.bin_width - 1)
+            displays.append(Display(f"{name:<18s}Latency [{low}-{high}]: %d", self.histogram[i]))
+        return displays
+
+# AXIS Frames -------------------------------------------------------------------------------------
+
+# Frame parameters are derived from the frame number (through a 16-bit Xorshift hash) so that the
+# AXISFrameScoreboard can recompute them from the frame number carried in the data and tolerate
+# dropped/routed frames: frame length from the lengths table (a frame-size distribution, see
+# frame_lengths), bad frame marker (bad_probability in %) and dest (from the dests table).
+
+def frame_lengths(distribution="uniform", min_length=64, max_length=1518, n=16):
+    if isinstance(distribution, (list, tuple)):
+        lengths = list(distribution)
+    elif distribution == "fixed":
+        lengths = [max_length]
+    elif distribution == "uniform":
+        lengths = [min_length + (i*(max_length - min_length))//(n - 1) for i in range(n)]
+    elif distribution == "imix":
+        lengths = [64]*9 + [576]*5 + [1500]*2
+        lengths = [min(max(l, min_length), max_length) for l in lengths]
+    else:
+        raise ValueError(f"Unknown frame distribution {distribution}.")
+    return lengths
+
+def _pow2_table(values):
+    # Repeat values to a power of 2 table size (indexed by hash bits).
+    size = max(2, 2**log2_int(len(values), need_pow2=False))
+    return [values[i%len(values)] for i in range(size)]
+
+class _AXISFrameParams(Module):
+    def __init__(self, frame, data_width, lengths=[64], bad_probability=0, dests=[0], frame_seed=0):
+        assert min(lengths) >= 1
+        bytes_per_beat = data_width//8
+        self.beats     = Signal(16)
+        self.last_keep = Signal(bytes_per_beat)
+        self.bad       = Signal()
+        self.dest      = Signal(max=max(2, max(dests) + 1))
+
+        # # #
+
+        # Hash.
+        h0 = Signal(16)
+        h1 = Signal(16)
+        h2 = Signal(16)
+        self.comb += [
+            h0.eq((frame ^ frame_seed) ^ ((frame ^ frame_seed) << 7)),
+            h1.eq(h0 ^ (h0 >> 9)),
+            h2.eq(h1 ^ (h1 << 8)),
+        ]
+
+        # Length/Beats/Last Keep.
+        lengths = _pow2_table(lengths)
+        beats   = [(l + bytes_per_beat - 1)//bytes_per_beat for l in lengths]
+        keeps   = [2**(l - (b - 1)*bytes_per_beat) - 1 for l, b in zip(lengths, beats)]
+        index   = h2[:log2_int(len(lengths))]
+        self.comb += [
+            self.beats.eq(Array(beats)[index]),
+            self.last_keep.eq(Array(keeps)[index]),
+        ]
+
+        # Bad.
+        self.comb += self.bad.eq(h2[8:16] < (bad_probability*256)//100)
+
+        # Dest.
+        dests = _pow2_table(dests)
+        self.comb += self.dest.eq(Array(dests)[h2[4:4 + log2_int(len(dests))]])
+
+# AXIS Frame Generator -----------------------------------------------------------------------------
+
+# Generates frames (tlast/tkeep with partial tkeep on the last beat, tdest, bad frame marker on
+# tuser[0] of the last beat, constant tid) with a pseudo-random valid pattern. Each beat carries
+# Cat(frame number, beat number) (replicated over the data width).
+
+class AXISFrameGenerator(Module):
+    def __init__(self, axis, lengths=[64], bad_probability=0, dests=[0], id=0, frame_seed=0,
+        valid_probability = 100,
+        valid_burst       = 1,
+        seed              = 1):
+        data_width = len(axis.data)
+        assert data_width >= 32
+
+        # # #
+
+        frame = Signal(16)
+        beat  = Signal(16)
+        self.submodules.params = params = _AXISFrameParams(frame, data_width,
+            lengths         = lengths,
+            bad_probability = bad_probability,
+            dests           = dests,
+            frame_seed      = frame_seed)
+        self.submodules.pattern = pattern = LFSRPattern(valid_probability, valid_burst, seed)
+
+        last = Signal()
+        self.comb += last.eq(beat == (params.beats - 1))
+        self.sync += If(~axis.valid | axis.ready,
+            axis.valid.eq(pattern.o),
+            axis.data.eq(Replicate(Cat(frame, beat), data_width//32)),
+            axis.last.eq(last),
+            axis.keep.eq(Mux(last, params.last_keep, 2**len(axis.keep) - 1)),
+            axis.id.eq(id),
+            axis.dest.eq(params.dest),
+            axis.user.eq(params.bad & last),
+            If(pattern.o,
+                beat.eq(beat + 1),
+                If(last,
+                    beat.eq(0),
+                    frame.eq(frame + 1)
+                )
             )
+        )
+
+# AXIS Frame Scoreboard ----------------------------------------------------------------------------
+
+# AXISChecker verifying the integrity of the frames of an AXISFrameGenerator (configured with the
+# same lengths/bad_probability/dests/frame_seed): increasing frame numbers (frames can be dropped or
+# routed elsewhere), beat numbers, tlast position, tkeep, tdest (when dest is specified) and bad frame
+# marker (bad frames must be dropped when drop_bad is set). Also counts frames, bytes and bad frames.
+
+class AXISFrameScoreboard(AXISChecker):
+    def __init__(self, axis, lengths=[64], bad_probability=0, dests=[0], frame_seed=0,
+        dest     = None,
+        drop_bad = False,
+        **kwargs):
+        AXISChecker.__init__(self, axis, data_check=False, **kwargs)
+        data_width = len(axis.data)
+        assert data_width >= 32
+        self.frames     = Signal(64)
+        self.bytes      = Signal(64)
+        self.bad_frames = Signal(64)
+
+        # # #
+
+        sof        = Signal(reset=1)
+        first      = Signal(reset=1)
+        frame      = Signal(16)
+        frame_last = Signal(16)
+        frame_diff = Signal(16)
+        beat       = Signal(16)
+        data_frame = Signal(16)
+        data_beat  = Signal(16)
+        self.comb += [
+            data_frame.eq(axis.data[0:16]),
+            data_beat.eq(axis.data[16:32]),
+            frame.eq(data_frame),
+            frame_diff.eq(data_frame - frame_last),
         ]
+        self.submodules.params = params = _AXISFrameParams(frame, data_width,
+            lengths         = lengths,
+            bad_probability = bad_probability,
+            dests           = dests,
+            frame_seed      = frame_seed)
+
+        # Checks.
+        last  = Signal()
+        error = Signal()
+        self.comb += [
+            last.eq(beat == (params.beats - 1)),
+            # Frame/Beat numbers.
+            If(sof,
+                If(~first & ((frame_diff == 0) | frame_diff[-1]), error.eq(1))
+            ).Else(
+                If(data_frame != frame_last, error.eq(1))
+            ),
+            If(data_beat != beat, error.eq(1)),
+            # Last/Keep.
+            If(axis.last != last, error.eq(1)),
+            If(axis.keep != Mux(last, params.last_keep, 2**len(axis.keep) - 1), error.eq(1)),
+            # Bad frame.
+            If(last & params.bad & drop_bad, error.eq(1)),
+        ]
+        if dest is not None:
+            self.comb += If(axis.dest != dest, error.eq(1))
+        if axis.user_width > 0:
+            self.comb += If(last & (axis.user[0] != params.bad), error.eq(1))
+
+        # Bytes.
+        keep_bytes = Signal(max=len(axis.keep) + 1)
+        self.comb += keep_bytes.eq(sum(axis.keep[i] for i in range(len(axis.keep))))
+
+        self.sync += If(axis.valid & axis.ready,
+            first.eq(0),
+            frame_last.eq(data_frame),
+            beat.eq(beat + 1),
+            sof.eq(0),
+            self.bytes.eq(self.bytes + keep_bytes),
+            If(axis.last,
+                beat.eq(0),
+                sof.eq(1),
+                self.frames.eq(self.frames + 1),
+                If(params.bad,
+                    self.bad_frames.eq(self.bad_frames + 1)
+                )
+            ),
+            If(error,
+                self.errors.eq(self.errors + 1)
+            )
+        )
+
+    def get_displays(self, name):
+        return [Display(f"{name:<18s}Frames: %d / Bytes: %d / Bad: %d", self.frames, self.bytes, self.bad_frames)]
+
+# AXIS Tests ---------------------------------------------------------------------------------------
+
+# Each test instantiates a single wrapper configuration in the SoC and connects its interfaces to
+# AXISGenerators/AXISCheckers (soc.add_generator/add_checker). Tests are built/simulated independently
+# so that a failure on one wrapper does not prevent testing the others. Tests with a known issue are
+# declared with skip=<reason>: they are reported as skipped and only run when selected explicitly.
+
+axis_tests         = {}
+axis_tests_skipped = {} # Test -> Skip reason.
+
+def axis_test(name, skip=None):
+    def decorator(func):
+        axis_tests[name] = func
+        if skip is not None:
+            axis_tests_skipped[name] = skip
+        return func
+    return decorator
+
+@axis_test("axis_fifo")
+def axis_fifo_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=4096)
+    soc.add_trigger("overflow", soc.axis_fifo.overflow)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS FIFO", m_axis)
+
+@axis_test("axis_fifo_stats")
+def axis_fifo_stats_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    # Statistics CSRs (with_csr), snapshot from the logic every 1024 cycles and displayed on the
+    # next cycle.
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=4096, with_csr=True)
+    statistics = soc.axis_fifo.statistics
+    soc.comb += statistics.snapshot.eq(soc.timestamp[:10] == 0)
+    soc.sync += If(soc.timestamp[:10] == 1,
+        Display("AXIS FIFO Stats          : S Beats: %d / S Stalls: %d / M Beats: %d / M Idles: %d / Level: %d / Peak: %d",
+            statistics.s_axis_beats.status,
+            statistics.s_axis_stalls.status,
+            statistics.m_axis_beats.status,
+            statistics.m_axis_idles.status,
+            statistics.level.status,
+            statistics.peak.status)
+    )
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS FIFO Stats", m_axis)
+
+@axis_test("axis_perf_monitor")
+def axis_perf_monitor_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    from verilog_axis.axis_rate_limit import AXISRateLimit
+    from verilog_axis.axis_register import AXISRegister
+    from verilog_axis.axis_perf_monitor import AXISPerfMonitor
+    # Perf monitors on each hop of a FIFO -> Rate Limit (50%) -> Register chain: the Rate Limit
+    # input shows backpressure while its output shows starvation. Samples are drained (and
+    # displayed) from the logic.
+    axis = [AXIStreamInterface(data_width=32) for _ in range(4)]
+    soc.submodules.axis_fifo       = AXISFIFO(platform, axis[0], axis[1], depth=256)
+    soc.submodules.axis_rate_limit = AXISRateLimit(platform, axis[1], axis[2])
+    soc.submodules.axis_register   = AXISRegister(platform, axis[2], axis[3])
+    soc.comb += soc.axis_rate_limit.rate_num.eq(64)
+    for i in range(4):
+        monitor = AXISPerfMonitor(axis[i], window=1024, depth=4)
+        setattr(soc.submodules, f"axis_perf_monitor{i}", monitor)
+        soc.comb += monitor.pop.eq(monitor.level.status != 0)
+        soc.sync += If(monitor.level.status != 0,
+            Display(f"AXIS Perf Monitor {i}      : Beats: %d / Stalls: %d / Idles: %d / Max Stall: %d",
+                monitor.sample_beats.status,
+                monitor.sample_stalls.status,
+                monitor.sample_idles.status,
+                monitor.sample_max_stall.status)
+        )
+
+    soc.add_generator(axis[0])
+    soc.add_checker("AXIS Perf Monitor", axis[3])
+
+@axis_test("axis_srl_fifo")
+def axis_srl_fifo_test(soc, platform):
+    from verilog_axis.axis_srl_fifo import AXISSRLFIFO
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_srl_fifo = AXISSRLFIFO(platform, s_axis, m_axis, depth=16)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS SRL FIFO", m_axis)
+
+@axis_test("axis_auto_fifo")
+def axis_auto_fifo_test(soc, platform):
+    from verilog_axis.axis_auto_fifo import AXISAutoFIFO
+    # Chain of AXISAutoFIFOs covering the 3 implementations: SRL (16), Distributed RAM (64) and
+    # Block RAM (1000 -> 1024).
+    axis = [AXIStreamInterface(data_width=32) for _ in range(4)]
+    for i, depth in enumerate([16, 64, 1000]):
+        setattr(soc.submodules, f"axis_auto_fifo{i}", AXISAutoFIFO(platform, axis[i], axis[i+1], depth=depth))
+
+    soc.add_generator(axis[0])
+    soc.add_checker("AXIS Auto FIFO", axis[-1])
+
+@axis_test("axis_async_fifo")
+def axis_async_fifo_test(soc, platform):
+    from verilog_axis.axis_async_fifo import AXISAsyncFIFO
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_async_fifo = AXISAsyncFIFO(platform, s_axis, m_axis, depth=4096)
+    soc.add_trigger("overflow", soc.axis_async_fifo.s_overflow | soc.axis_async_fifo.m_overflow)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Async FIFO", m_axis)
+
+@axis_test("axis_fifo_cdc")
+def axis_fifo_cdc_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    # Automatic CDC: sys (100MHz) -> sys_div2 (50MHz), AXISAsyncFIFO inserted on Master side.
+    soc.add_clock_domain("sys_div2", divider=2)
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32, clock_domain="sys_div2")
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=1024,
+        cdc = dict(burst=256, s_clk_freq=100e6, m_clk_freq=50e6)
+    )
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS FIFO CDC", m_axis)
+
+@axis_test("axis_fifo_adapt")
+def axis_fifo_adapt_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    # Automatic Width Adaptation: 32-bit -> 64-bit -> 32-bit, AXISAdapter on Slave side for the first
+    # FIFO (upsizing, 64-bit core) and for the second one (downsizing before a 32-bit core: the 32-bit
+    # Master side limits the sustained bandwidth at the same clock).
+    s_axis = AXIStreamInterface(data_width=32)
+    i_axis = AXIStreamInterface(data_width=64)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_fifo_up   = AXISFIFO(platform, s_axis, i_axis, depth=512, adapt=True)
+    soc.submodules.axis_fifo_down = AXISFIFO(platform, i_axis, m_axis, depth=512, adapt=True)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS FIFO Adapt", m_axis)
+
+@axis_test("axis_rate_limit_cdc")
+def axis_rate_limit_cdc_test(soc, platform):
+    from verilog_axis.axis_rate_limit import AXISRateLimit
+    # Automatic CDC: sys_div2 (50MHz) -> sys (100MHz), AXISAsyncFIFO inserted on Slave side.
+    soc.add_clock_domain("sys_div2", divider=2)
+    s_axis = AXIStreamInterface(data_width=32, clock_domain="sys_div2")
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_rate_limit = AXISRateLimit(platform, s_axis, m_axis, cdc=True)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Rate Limit CDC", m_axis)
+
+@axis_test("axis_register")
+def axis_register_test(soc, platform):
+    from verilog_axis.axis_register import AXISRegister
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_register = AXISRegister(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Register", m_axis)
+
+@axis_test("axis_srl_register")
+def axis_srl_register_test(soc, platform):
+    from verilog_axis.axis_srl_register import AXISSRLRegister
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_srl_register = AXISSRLRegister(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS SRL Register", m_axis)
+
+@axis_test("axis_adapter")
+def axis_adapter_test(soc, platform):
+    from verilog_axis.axis_adapter import AXISAdapter
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_adapter = AXISAdapter(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Adapter", m_axis)
+
+@axis_test("axis_rate_limit")
+def axis_rate_limit_test(soc, platform):
+    from verilog_axis.axis_rate_limit import AXISRateLimit
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_rate_limit = AXISRateLimit(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Rate Limit", m_axis)
+
+@axis_test("axis_tap")
+def axis_tap_test(soc, platform):
+    from verilog_axis.axis_tap import AXISTap
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_tap = AXISTap(platform, s_axis, m_axis)
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Tap", m_axis)
+
+@axis_test("axis_stat_counter")
+def axis_stat_counter_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    from verilog_axis.axis_stat_counter import AXISStatCounters
+    # Stat counters attached (tap mode) to the interfaces of a FIFO, triggered every 1024 cycles,
+    # decoded to CSRs (displayed) and also merged on a stats stream.
+    s_axis = AXIStreamInterface(data_width=32)
+    m_axis = AXIStreamInterface(data_width=32)
+    stats  = AXIStreamInterface(data_width=8, user_width=1)
+    soc.submodules.axis_fifo  = AXISFIFO(platform, s_axis, m_axis, depth=4096)
+    soc.submodules.axis_stats = AXISStatCounters(platform, {"s_axis": s_axis, "m_axis": m_axis},
+        m_axis = stats,
+        period = 1024,
+    )
+    soc.comb += stats.ready.eq(1)
+    soc.sync += If(soc.timestamp[:10] == 512,
+        Display("AXIS Stat Counter        : S Ticks: %d / S Bytes: %d / M Bytes: %d / M Frames: %d",
+            soc.axis_stats.s_axis_ticks.status,
+            soc.axis_stats.s_axis_bytes.status,
+            soc.axis_stats.m_axis_bytes.status,
+            soc.axis_stats.m_axis_frames.status)
+    )
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Stat Counter", m_axis)
+
+@axis_test("axis_broadcast")
+def axis_broadcast_test(soc, platform):
+    from verilog_axis.axis_broadcast import AXISBroadcast
+    s_axis  = AXIStreamInterface(data_width=32)
+    m_axis0 = AXIStreamInterface(data_width=32)
+    m_axis1 = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_broadcast = AXISBroadcast(platform, s_axis, [m_axis0, m_axis1])
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Broadcast 0", m_axis0)
+    soc.add_checker("AXIS Broadcast 1", m_axis1)
+
+@axis_test("axis_arb_mux")
+def axis_arb_mux_test(soc, platform):
+    from verilog_axis.axis_arb_mux import AXISArbMux
+    s_axis0 = AXIStreamInterface(data_width=32)
+    s_axis1 = AXIStreamInterface(data_width=32)
+    m_axis  = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_arb_mux = AXISArbMux(platform, [s_axis0, s_axis1], m_axis)
+
+    soc.add_generator(s_axis0)
+    soc.add_checker("AXIS Arb Mux", m_axis)
+
+@axis_test("axis_mux")
+def axis_mux_test(soc, platform):
+    from verilog_axis.axis_mux import AXISMux
+    s_axis0 = AXIStreamInterface(data_width=32)
+    s_axis1 = AXIStreamInterface(data_width=32)
+    m_axis  = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_mux = AXISMux(platform, [s_axis0, s_axis1], m_axis)
+
+    soc.add_generator(s_axis0)
+    soc.add_checker("AXIS Mux", m_axis)
+
+@axis_test("axis_demux")
+def axis_demux_test(soc, platform):
+    from verilog_axis.axis_demux import AXISDemux
+    s_axis  = AXIStreamInterface(data_width=32)
+    m_axis0 = AXIStreamInterface(data_width=32)
+    m_axis1 = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_demux = AXISDemux(platform, s_axis, [m_axis0, m_axis1])
+
+    soc.add_generator(s_axis)
+    soc.add_checker("AXIS Demux", m_axis0)
+
+@axis_test("axis_crosspoint", skip="Verilator compilation issue")
+def axis_crosspoint_test(soc, platform):
+    from verilog_axis.axis_crosspoint import AXISCrosspoint
+    s_axis0 = AXIStreamInterface(data_width=32)
+    s_axis1 = AXIStreamInterface(data_width=32)
+    m_axis0 = AXIStreamInterface(data_width=32)
+    m_axis1 = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_crosspoint = AXISCrosspoint(platform,
+        s_axis = [s_axis0, s_axis1],
+        m_axis = [m_axis0, m_axis1]
+    )
+
+    soc.add_generator(s_axis0)
+    soc.add_checker("AXIS Crosspoint", m_axis0)
+
+@axis_test("axis_switch")
+def axis_switch_test(soc, platform):
+    from verilog_axis.axis_switch import AXISSwitch
+    s_axis0 = AXIStreamInterface(data_width=32)
+    s_axis1 = AXIStreamInterface(data_width=32)
+    m_axis0 = AXIStreamInterface(data_width=32)
+    m_axis1 = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_switch = AXISSwitch(platform,
+        s_axis = [s_axis0, s_axis1],
+        m_axis = [m_axis0, m_axis1]
+    )
+
+    soc.add_generator(s_axis0)
+    soc.add_checker("AXIS Switch", m_axis0)
+
+@axis_test("axis_switch_planned")
+def axis_switch_planned_test(soc, platform):
+    from verilog_axis.axis_switch import AXISSwitch
+    from verilog_axis.axis_fifo import AXISFIFO
+    from verilog_axis.axis_pipeline import AXISPipelinePlanner
+    # 512-bit 2x2 Switch -> FIFO (with long route) at 250MHz, registers selected by the planner.
+    planner = AXISPipelinePlanner(clk_freq=250e6)
+    planner.add_node("generator", "source", data_width=512)
+    planner.add_node("switch",    "switch", data_width=512, s_count=2, m_count=2)
+    planner.add_node("fifo",      "fifo",   data_width=512)
+    planner.add_edge("generator", "switch")
+    planner.add_edge("switch",    "fifo", levels=2)
+    plan = planner.plan()
+    logging.getLogger("AXISPipelinePlanner").info(f"Plan:\n{plan}")
+
+    s_axis0 = AXIStreamInterface(data_width=512, dest_width=2)
+    s_axis1 = AXIStreamInterface(data_width=512, dest_width=2)
+    m_axis0 = AXIStreamInterface(data_width=512, dest_width=1)
+    m_axis1 = AXIStreamInterface(data_width=512, dest_width=1)
+    f_axis  = AXIStreamInterface(data_width=512, dest_width=1)
+    o_axis  = AXIStreamInterface(data_width=512, dest_width=1)
+    soc.submodules.axis_switch = AXISSwitch(platform,
+        s_axis = [s_axis0, s_axis1],
+        m_axis = [m_axis0, m_axis1],
+        **plan.switch_parameters("switch")
+    )
+    plan.connect(soc, platform, "switch", "fifo", m_axis0, f_axis)
+    soc.submodules.axis_fifo = AXISFIFO(platform, f_axis, o_axis, depth=4096)
+
+    soc.add_generator(s_axis0)
+    soc.add_checker("AXIS Switch Planned", o_axis)
+
+@axis_test("axis_ram_switch", skip="Verilator compilation issue")
+def axis_ram_switch_test(soc, platform):
+    from verilog_axis.axis_ram_switch import AXISRAMSwitch
+    s_axis0 = AXIStreamInterface(data_width=32)
+    s_axis1 = AXIStreamInterface(data_width=32)
+    m_axis0 = AXIStreamInterface(data_width=32)
+    m_axis1 = AXIStreamInterface(data_width=32)
+    soc.submodules.axis_ram_switch = AXISRAMSwitch(platform,
+        s_axis = [s_axis0, s_axis1],
+        m_axis = [m_axis0, m_axis1]
+    )
+    soc.add_trigger("overflow", soc.axis_ram_switch.s_overflow != 0)
+
+    soc.add_generator(s_axis0)
+    soc.add_checker("AXIS RAM Switch", m_axis0)
+
+# AXIS Frame Tests ---------------------------------------------------------------------------------
+
+# Frame-aware tests: AXISFrameGenerators send frames (with partial tkeep, tdest and bad frame marker
+# on tuser) that are verified by AXISFrameScoreboards.
+
+@axis_test("axis_fifo_frame")
+def axis_fifo_frame_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    s_axis = AXIStreamInterface(data_width=32, user_width=1)
+    m_axis = AXIStreamInterface(data_width=32, user_width=1)
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=4096,
+        frame_fifo     = 1,
+        drop_bad_frame = 1,
+    )
+    soc.add_trigger("overflow", soc.axis_fifo.overflow)
+
+    frames = dict(lengths=frame_lengths("uniform", 16, 512), bad_probability=10)
+    soc.add_frame_generator(s_axis, **frames)
+    soc.add_frame_scoreboard("AXIS FIFO", m_axis, drop_bad=True, **frames)
+
+@axis_test("axis_fifo_drop_oversize")
+def axis_fifo_drop_oversize_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    s_axis = AXIStreamInterface(data_width=32, user_width=1)
+    m_axis = AXIStreamInterface(data_width=32, user_width=1)
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=256,
+        frame_fifo          = 1,
+        drop_oversize_frame = 1,
+    )
+    soc.add_trigger("overflow", soc.axis_fifo.overflow)
+
+    frames = dict(lengths=frame_lengths("imix", 64, 1500))
+    soc.add_frame_generator(s_axis, **frames)
+    soc.add_frame_scoreboard("AXIS FIFO", m_axis, **frames)
+
+@axis_test("axis_demux_frame")
+def axis_demux_frame_test(soc, platform):
+    from verilog_axis.axis_demux import AXISDemux
+    # Slave tdest MSB selects the Master port (tdest_route).
+    s_axis  = AXIStreamInterface(data_width=64, dest_width=2)
+    m_axis0 = AXIStreamInterface(data_width=64, dest_width=1)
+    m_axis1 = AXIStreamInterface(data_width=64, dest_width=1)
+    soc.submodules.axis_demux = AXISDemux(platform, s_axis, [m_axis0, m_axis1], tdest_route=1)
+
+    frames = dict(lengths=frame_lengths("uniform", 1, 256), dests=[0b00, 0b10])
+    soc.add_frame_generator(s_axis, **frames)
+    soc.add_frame_scoreboard("AXIS Demux 0", m_axis0, dest=0, **frames)
+    soc.add_frame_scoreboard("AXIS Demux 1", m_axis1, dest=0, **frames)
+
+@axis_test("axis_switch_frame")
+def axis_switch_frame_test(soc, platform):
+    from verilog_axis.axis_switch import AXISSwitch
+    # Slave tdest MSB selects the Master port (default routing).
+    s_axis0 = AXIStreamInterface(data_width=64, dest_width=2)
+    s_axis1 = AXIStreamInterface(data_width=64, dest_width=2)
+    m_axis0 = AXIStreamInterface(data_width=64, dest_width=1)
+    m_axis1 = AXIStreamInterface(data_width=64, dest_width=1)
+    soc.submodules.axis_switch = AXISSwitch(platform,
+        s_axis = [s_axis0, s_axis1],
+        m_axis = [m_axis0, m_axis1]
+    )
+
+    frames = dict(lengths=frame_lengths("imix", 64, 1500), dests=[0b00, 0b10])
+    soc.add_frame_generator(s_axis0, **frames)
+    soc.add_frame_scoreboard("AXIS Switch 0", m_axis0, dest=0, **frames)
+    soc.add_frame_scoreboard("AXIS Switch 1", m_axis1, dest=0, **frames)
+
+# AXIS File Tests ----------------------------------------------------------------------------------
+
+# File-backed tests: frames from an input file (pcap/raw, --input) are replayed through the cores and
+# the output frames captured to a file (see AXISSimSoC.add_file_stream). Only run when an input file
+# is provided.
+
+@axis_test("axis_fifo_file")
+def axis_fifo_file_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    s_axis = AXIStreamInterface(data_width=64)
+    m_axis = AXIStreamInterface(data_width=64)
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=16384)
+    soc.add_trigger("overflow", soc.axis_fifo.overflow)
+
+    soc.add_file_stream(s_axis, m_axis, **soc.file_stream)
+
+@axis_test("axis_switch_file")
+def axis_switch_file_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    from verilog_axis.axis_switch import AXISSwitch
+    # AXISFIFO -> AXISSwitch pipeline, frames routed to Master 0 (tdest = 0).
+    s_axis  = AXIStreamInterface(data_width=64)
+    f_axis  = AXIStreamInterface(data_width=64, dest_width=2)
+    s_axis1 = AXIStreamInterface(data_width=64, dest_width=2)
+    m_axis0 = AXIStreamInterface(data_width=64, dest_width=1)
+    m_axis1 = AXIStreamInterface(data_width=64, dest_width=1)
+    soc.submodules.axis_fifo   = AXISFIFO(platform, s_axis, f_axis, depth=16384)
+    soc.submodules.axis_switch = AXISSwitch(platform,
+        s_axis = [f_axis, s_axis1],
+        m_axis = [m_axis0, m_axis1]
+    )
+    soc.add_trigger("overflow", soc.axis_fifo.overflow)
+
+    soc.add_file_stream(s_axis, m_axis0, **soc.file_stream)
+
+# AXIS Shared Memory Tests -------------------------------------------------------------------------
+
+# Host-driven tests: frames are pushed/pulled by a Python host through the shared-memory bridge (see
+# AXISSimSoC.add_shm_stream and sim/shm_bridge.py), the run ends once the host is done.
+
+@axis_test("axis_fifo_shm")
+def axis_fifo_shm_test(soc, platform):
+    from verilog_axis.axis_fifo import AXISFIFO
+    s_axis = AXIStreamInterface(data_width=64)
+    m_axis = AXIStreamInterface(data_width=64)
+    soc.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=4096)
+    soc.add_trigger("overflow", soc.axis_fifo.overflow)
+
+    soc.add_shm_stream(s_axis, m_axis, **soc.shm_stream)
+
+@axis_test("axis_switch_shm")
+def axis_switch_shm_test(soc, platform):
+    from verilog_axis.axis_switch import AXISSwitch
+    # Frames routed to Master 0 (tdest = 0).
+    s_axis0 = AXIStreamInterface(data_width=64, dest_width=2)
+    s_axis1 = AXIStreamInterface(data_width=64, dest_width=2)
+    m_axis0 = AXIStreamInterface(data_width=64, dest_width=1)
+    m_axis1 = AXIStreamInterface(data_width=64, dest_width=1)
+    soc.submodules.axis_switch = AXISSwitch(platform,
+        s_axis = [s_axis0, s_axis1],
+        m_axis = [m_axis0, m_axis1]
+    )
+
+    soc.add_shm_stream(s_axis0, m_axis0, **soc.shm_stream)
 
 # AXISSimSoC ---------------------------------------------------------------------------------------
 
-class AXISSimSoC(SoCCore):
-    def __init__(self):
+# Runs for cycles or, when beats/frames targets are given, until every checker has seen beats beats
+# (and every frame scoreboard frames frames) with cycles used as a timeout guard. The run length can
+# also be overridden at runtime (+cycles=N/+beats=N/+frames=N simulation arguments). Tests are test
+# names (from axis_tests) or test functions (soc, platform).
+
+class AXISSimSoC(SoCMini):
+    def __init__(self, tests, cycles=10000, beats=None, frames=None,
+        valid_probability = 100,
+        valid_burst       = 1,
+        ready_probability = 100,
+        ready_burst       = 1,
+        seed              = 1,
+        latency_histogram = False,
+        histogram_bins    = 16,
+        histogram_width   = 1,
+        trace_start       = None,
+        trace_end         = None,
+        trace_triggers    = [],
+        trace_length      = 0,
+        trace_scopes      = [],
+        file_stream       = {},
+        shm_stream        = {}):
         # Parameters.
         sys_clk_freq = int(100e6)
 
         # Platform.
         platform     = Platform()
-        self.comb += platform.trace.eq(1)
 
         # CRG --------------------------------------------------------------------------------------
         self.submodules.crg = CRG(platform.request("sys_clk"))
 
-        # SoCCore ----------------------------------------------------------------------------------
+        # SoCMini ----------------------------------------------------------------------------------
         SoCMini.__init__(self, platform, clk_freq=sys_clk_freq)
 
-        # AXIS Tests --------------------------------------------------------------------------------
-        def axis_syntax_test():
-            # AXIS FIFO.
-            # ----------
-            from verilog_axis.axis_fifo import AXISFIFO
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=4096)
-
-            # AXIS SRL FIFO.
-            # --------------
-            from verilog_axis.axis_srl_fifo import AXISSRLFIFO
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_srl_fifo = AXISSRLFIFO(platform, s_axis, m_axis, depth=16)
-
-            # AXIS Async FIFO.
-            # ----------------
-            from verilog_axis.axis_async_fifo import AXISAsyncFIFO
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_async_fifo = AXISAsyncFIFO(platform, s_axis, m_axis, depth=4096)
-
-            # AXIS Regiser.
-            # -------------
-            from verilog_axis.axis_register import AXISRegister
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_register = AXISRegister(platform, s_axis, m_axis)
-
-            # AXIS SRL Regiser.
-            # -----------------
-            from verilog_axis.axis_srl_register import AXISSRLRegister
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_srl_register = AXISSRLRegister(platform, s_axis, m_axis)
-
-            # AXIS Adapter.
-            # -------------
-            from verilog_axis.axis_adapter import AXISAdapter
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_adapter = AXISAdapter(platform, s_axis, m_axis)
-
-            # AXIS Rate Limit.
-            # ----------------
-            from verilog_axis.axis_rate_limit import AXISRateLimit
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_rate_limit = AXISRateLimit(platform, s_axis, m_axis)
-
-            # AXIS Tap.
-            # ---------
-            from verilog_axis.axis_tap import AXISTap
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_tap = AXISTap(platform, s_axis, m_axis)
-
-            # AXIS Broadcast.
-            # ---------------
-            from verilog_axis.axis_broadcast import AXISBroadcast
-            s_axis  = AXIStreamInterface(data_width=32)
-            m_axis0 = AXIStreamInterface(data_width=32)
-            m_axis1 = AXIStreamInterface(data_width=32)
-            self.submodules.axis_broadcast = AXISBroadcast(platform, s_axis, [m_axis0, m_axis1])
-
-            # AXIS Arb Mux.
-            # -------------
-            from verilog_axis.axis_arb_mux import AXISArbMux
-            s_axis0 = AXIStreamInterface(data_width=32)
-            s_axis1 = AXIStreamInterface(data_width=32)
-            m_axis  = AXIStreamInterface(data_width=32)
-            self.submodules.axis_arb_mux = AXISArbMux(platform, [m_axis0, m_axis1], m_axis)
-
-            # AXIS Mux.
-            # ---------
-            from verilog_axis.axis_mux import AXISMux
-            s_axis0 = AXIStreamInterface(data_width=32)
-            s_axis1 = AXIStreamInterface(data_width=32)
-            m_axis  = AXIStreamInterface(data_width=32)
-            self.submodules.axis_mux = AXISMux(platform, [s_axis0, s_axis1], m_axis)
-
-            # AXIS Demux.
-            # -----------
-            from verilog_axis.axis_demux import AXISDemux
-            s_axis  = AXIStreamInterface(data_width=32)
-            m_axis0 = AXIStreamInterface(data_width=32)
-            m_axis1 = AXIStreamInterface(data_width=32)
-            self.submodules.axis_mux = AXISDemux(platform, s_axis, [m_axis0, m_axis1])
-
-            # AXIS Crosspoint.
-            # ----------------
-            from verilog_axis.axis_crosspoint import AXISCrosspoint
-            s_axis0 = AXIStreamInterface(data_width=32)
-            s_axis1 = AXIStreamInterface(data_width=32)
-            m_axis0 = AXIStreamInterface(data_width=32)
-            m_axis1 = AXIStreamInterface(data_width=32)
-            # FIXME: Verilator compil issue.
-            #self.submodules.axis_crosspoint = AXISCrosspoint(platform,
-            #    s_axis=[s_axis0, s_axis1],
-            #    m_axis=[m_axis0, m_axis1]
-            #)
-
-            # AXIS Switch.
-            # ------------
-            from verilog_axis.axis_switch import AXISSwitch
-            s_axis0 = AXIStreamInterface(data_width=32)
-            s_axis1 = AXIStreamInterface(data_width=32)
-            m_axis0 = AXIStreamInterface(data_width=32)
-            m_axis1 = AXIStreamInterface(data_width=32)
-            self.submodules.axis_switch = AXISSwitch(platform,
-                s_axis=[s_axis0, s_axis1],
-                m_axis=[m_axis0, m_axis1]
+        # Timestamp.
+        self.timestamp = timestamp = Signal(64)
+        self.sync += timestamp.eq(timestamp + 1)
+
+        # AXIS Tests -------------------------------------------------------------------------------
+        self.generator_config = dict(valid_probability=valid_probability, valid_burst=valid_burst)
+        self.checker_config   = dict(ready_probability=ready_probability, ready_burst=ready_burst)
+        self.histogram_config = dict(bins=histogram_bins, bin_width=histogram_width)
+        self.latency_histogram = latency_histogram
+        self.file_stream = file_stream
+        self.shm_stream  = shm_stream
+        self.seed        = seed
+        self.generators  = []
+        self.checkers    = []
+        self.triggers    = []
+        self.sim_modules = []
+        self.finish      = []
+        self.displays    = [] # Extra end of run Displays (ex instrumentation).
+        for test in tests:
+            test = axis_tests[test] if isinstance(test, str) else test
+            test(self, platform)
+
+        # Trace ------------------------------------------------------------------------------------
+        for name, checker in self.checkers:
+            self.add_trigger("error", checker.errors != 0)
+        self.submodules.tracer = SimTrace(platform.trace, timestamp,
+            start    = trace_start,
+            end      = trace_end,
+            triggers = [signal for kind, signal in self.triggers if kind in trace_triggers] if trace_triggers else None,
+            length   = trace_length,
+        )
+        self.sync += If(self.tracer.trigger,
+            Display("Trace Trigger            : %d", timestamp)
+        )
+        add_trace_scopes(platform, trace_scopes)
+
+        # Finish -----------------------------------------------------------------------------------
+        displays = list(self.displays)
+        for name, checker in self.checkers:
+            if hasattr(checker, "get_displays"):
+                displays += checker.get_displays(name)
+        self.add_run_length(cycles, beats, frames)
+        beats_done  = reduce(and_, [checker.cycles >= self.run_beats for _, checker in self.checkers], 1)
+        frames_done = reduce(and_, [checker.frames >= self.run_frames
+            for _, checker in self.checkers if hasattr(checker, "frames")], 1)
+        done    = Signal()
+        timeout = Signal()
+        if len(self.finish):
+            # Finish conditions from the tests (ex end of file stream), cycles is a timeout guard.
+            self.comb += [
+                done.eq(reduce(or_, self.finish)),
+                timeout.eq(~done & (timestamp == self.run_cycles))
+            ]
+        else:
+            self.comb += [
+                If((self.run_beats == 0) & (self.run_frames == 0),
+                    done.eq(timestamp == self.run_cycles)
+                ).Else(
+                    done.eq(((self.run_beats  == 0) | beats_done) &
+                            ((self.run_frames == 0) | frames_done)),
+                    timeout.eq(~done & (timestamp == self.run_cycles))
+                )
+            ]
+        self.sync += If(done | timeout,
+            Display("-"*80),
+            Display("Cycles                   : %d", timestamp),
+            If(timeout,
+                Display("Status                   : TIMEOUT")
+            ).Else(
+                Display("Status                   : DONE")
+            ),
+            *[Display(f"{name:<18s}Errors : %d / Cycles: %d / Stalls: %d / Idles: %d",
+                checker.errors,
+                checker.cycles,
+                checker.stalls,
+                checker.idles) for name, checker in self.checkers],
+            *displays,
+            Finish(),
+        )
+
+    def add_run_length(self, cycles=10000, beats=None, frames=None):
+        # Run length (cycles/beats/frames, 0: disabled) with runtime overrides from the simulation
+        # command line (+cycles=N/+beats=N/+frames=N).
+        self.run_cycles = Signal(64)
+        self.run_beats  = Signal(64)
+        self.run_frames = Signal(64)
+        self.specials += Instance("sim_run_length",
+            p_CYCLES = Constant(cycles,      64),
+            p_BEATS  = Constant(beats  or 0, 64),
+            p_FRAMES = Constant(frames or 0, 64),
+            o_cycles = self.run_cycles,
+            o_beats  = self.run_beats,
+            o_frames = self.run_frames,
+        )
+        self.platform.add_source(os.path.join(os.path.dirname(__file__), "sim", "rtl", "sim_run_length.v"))
+
+    def add_clock_domain(self, name, divider=2):
+        # Clock domain derived from sys_clk (sys_clk_freq/divider, even divider).
+        assert divider % 2 == 0
+        cd      = ClockDomain(name)
+        clk     = Signal()
+        counter = Signal(max=max(2, divider//2))
+        self.clock_domains += cd
+        self.sync += [
+            counter.eq(counter + 1),
+            If(counter == (divider//2 - 1),
+                counter.eq(0),
+                clk.eq(~clk)
             )
+        ]
+        self.comb += [
+            cd.clk.eq(clk),
+            cd.rst.eq(ResetSignal("sys")),
+        ]
 
-            # AXIS RAM Switch.
-            # ----------------
-            # FIXME: Verilator compil issue.
-            #from verilog_axis.axis_ram_switch import AXISRAMSwitch
-            #s_axis0 = AXIStreamInterface(data_width=32)
-            #s_axis1 = AXIStreamInterface(data_width=32)
-            #m_axis0 = AXIStreamInterface(data_width=32)
-            #m_axis1 = AXIStreamInterface(data_width=32)
-            #self.submodules.axis_ram_switch = AXISRAMSwitch(platform,
-            #    s_axis=[s_axis0, s_axis1],
-            #    m_axis=[m_axis0, m_axis1]
-            #)
-
-        def axis_integration_test():
-            # AXIS FIFO.
-            # ----------
-            from verilog_axis.axis_fifo import AXISFIFO
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_fifo = AXISFIFO(platform, s_axis, m_axis, depth=4096)
-
-            axis_fifo_generator = AXISGenerator(s_axis)
-            axis_fifo_checker   = AXISChecker(m_axis)
-            self.submodules += axis_fifo_generator, axis_fifo_checker
-
-            # AXIS SRL FIFO.
-            # --------------
-            from verilog_axis.axis_srl_fifo import AXISSRLFIFO
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_srl_fifo = AXISFIFO(platform, s_axis, m_axis, depth=4096)
-
-            axis_srl_fifo_generator = AXISGenerator(s_axis)
-            axis_srl_fifo_checker   = AXISChecker(m_axis)
-            self.submodules += axis_srl_fifo_generator, axis_srl_fifo_checker
-
-            # AXIS Async FIFO.
-            # ----------------
-            from verilog_axis.axis_async_fifo import AXISAsyncFIFO
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_async_fifo = AXISAsyncFIFO(platform, s_axis, m_axis, depth=4096)
-
-            axis_async_fifo_generator = AXISGenerator(s_axis)
-            axis_async_fifo_checker   = AXISChecker(m_axis)
-            self.submodules += axis_async_fifo_generator, axis_async_fifo_checker
-
-            # AXIS Register.
-            # --------------
-            from verilog_axis.axis_register import AXISRegister
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_register = AXISRegister(platform, s_axis, m_axis)
-
-            axis_register_generator = AXISGenerator(s_axis)
-            axis_register_checker  = AXISChecker(m_axis)
-            self.submodules += axis_register_generator, axis_register_checker
-
-            # AXIS SRL Register.
-            # ------------------
-            from verilog_axis.axis_srl_register import AXISSRLRegister
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_srl_register = AXISSRLRegister(platform, s_axis, m_axis)
-
-            axis_srl_register_generator = AXISGenerator(s_axis)
-            axis_srl_register_checker   = AXISChecker(m_axis)
-            self.submodules += axis_srl_register_generator, axis_srl_register_checker
-
-            # AXIS Adapter.
-            # -------------
-            from verilog_axis.axis_adapter import AXISAdapter
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_adapter = AXISAdapter(platform, s_axis, m_axis)
-
-            axis_adapter_generator = AXISGenerator(s_axis)
-            axis_adapter_checker   = AXISChecker(m_axis)
-            self.submodules += axis_adapter_generator, axis_adapter_checker
-
-            # AXIS Rate Limit.
-            # ----------------
-            from verilog_axis.axis_rate_limit import AXISRateLimit
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_rate_limit = AXISRateLimit(platform, s_axis, m_axis)
-
-            axis_rate_limit_generator = AXISGenerator(s_axis)
-            axis_rate_limit_checker   = AXISChecker(m_axis)
-            self.submodules += axis_rate_limit_generator, axis_rate_limit_checker
-
-            # AXIS Tap.
-            # ---------
-            from verilog_axis.axis_tap import AXISTap
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis = AXIStreamInterface(data_width=32)
-            self.submodules.axis_tap = AXISTap(platform, s_axis, m_axis)
-
-            axis_tap_generator = AXISGenerator(s_axis)
-            axis_tap_checker   = AXISChecker(m_axis)
-            self.submodules += axis_tap_generator, axis_tap_checker
-
-            # AXIS Broadcast.
-            # ---------------
-            from verilog_axis.axis_broadcast import AXISBroadcast
-            s_axis = AXIStreamInterface(data_width=32)
-            m_axis0 = AXIStreamInterface(data_width=32)
-            m_axis1 = AXIStreamInterface(data_width=32)
-            self.submodules.axis_broadcast = AXISBroadcast(platform, s_axis, [m_axis0, m_axis1])
-
-            axis_broadcast_generator = AXISGenerator(s_axis)
-            axis_broadcast_checker0  = AXISChecker(m_axis0)
-            axis_broadcast_checker1  = AXISChecker(m_axis1)
-            self.submodules += axis_broadcast_generator, axis_broadcast_checker0, axis_broadcast_checker1
-
-            # AXIS Arb Mux.
-            # -------------
-            from verilog_axis.axis_arb_mux import AXISArbMux
-            s_axis0 = AXIStreamInterface(data_width=32)
-            s_axis1 = AXIStreamInterface(data_width=32)
-            m_axis  = AXIStreamInterface(data_width=32)
-            self.submodules.axis_arb_mux = AXISArbMux(platform, [m_axis0, m_axis1], m_axis)
-
-            axis_arb_mux_generator = AXISGenerator(s_axis0)
-            axis_arb_mux_checker   = AXISChecker(m_axis)
-            self.submodules += axis_arb_mux_generator, axis_arb_mux_checker
-
-            # AXIS Mux.
-            # ---------
-            from verilog_axis.axis_mux import AXISMux
-            s_axis0 = AXIStreamInterface(data_width=32)
-            s_axis1 = AXIStreamInterface(data_width=32)
-            m_axis  = AXIStreamInterface(data_width=32)
-            self.submodules.axis_mux = AXISMux(platform, [s_axis0, s_axis1], m_axis)
-
-            axis_mux_generator = AXISGenerator(s_axis0)
-            axis_mux_checker   = AXISChecker(m_axis)
-            self.submodules += axis_mux_generator, axis_mux_checker
-
-            # AXIS Demux.
-            # -----------
-            from verilog_axis.axis_demux import AXISDemux
-            s_axis  = AXIStreamInterface(data_width=32)
-            m_axis0 = AXIStreamInterface(data_width=32)
-            m_axis1 = AXIStreamInterface(data_width=32)
-            self.submodules.axis_demux = AXISDemux(platform, s_axis, [m_axis0, m_axis1])
-
-            axis_demux_generator = AXISGenerator(s_axis)
-            axis_demux_checker   = AXISChecker(m_axis0)
-            self.submodules += axis_demux_generator, axis_demux_checker
-
-            # AXIS Switch.
-            # ------------
-            from verilog_axis.axis_switch import AXISSwitch
-            s_axis0 = AXIStreamInterface(data_width=32)
-            s_axis1 = AXIStreamInterface(data_width=32)
-            m_axis0 = AXIStreamInterface(data_width=32)
-            m_axis1 = AXIStreamInterface(data_width=32)
-            self.submodules.axis_demux = AXISSwitch(platform,
-                s_axis=[s_axis0, s_axis1],
-                m_axis=[m_axis0, m_axis1]
-            )
-            axis_switch_generator = AXISGenerator(s_axis0)
-            axis_switch_checker   = AXISChecker(m_axis0)
-            self.submodules += axis_switch_generator, axis_switch_checker
-
-            # Finish -------------------------------------------------------------------------------
-            cycles = Signal(32)
-            self.sync += cycles.eq(cycles + 1)
-            self.sync += If(cycles == 10000,
-                Display("-"*80),
-                Display("Cycles                   : %d", cycles),
-                Display("AXIS FIFO         Errors : %d / Cycles: %d",
-                    axis_fifo_checker.errors,
-                    axis_fifo_checker.cycles),
-                Display("AXIS SRL FIFO     Errors : %d / Cycles: %d",
-                    axis_srl_fifo_checker.errors,
-                    axis_srl_fifo_checker.cycles),
-                Display("AXIS Async FIFO   Errors : %d / Cycles: %d",
-                    axis_async_fifo_checker.errors,
-                    axis_async_fifo_checker.cycles),
-                Display("AXIS Register     Errors : %d / Cycles: %d",
-                    axis_register_checker.errors,
-                    axis_register_checker.cycles),
-                Display("AXIS SRL Register Errors : %d / Cycles: %d",
-                    axis_srl_register_checker.errors,
-                    axis_srl_register_checker.cycles),
-                Display("AXIS Adapter      Errors : %d / Cycles: %d",
-                    axis_adapter_checker.errors,
-                    axis_adapter_checker.cycles),
-                Display("AXIS Rate Limit   Errors : %d / Cycles: %d",
-                    axis_rate_limit_checker.errors,
-                    axis_rate_limit_checker.cycles),
-                Display("AXIS Tap          Errors : %d / Cycles: %d",
-                    axis_tap_checker.errors,
-                    axis_tap_checker.cycles),
-                Display("AXIS Broadcast 0  Errors : %d / Cycles: %d",
-                    axis_broadcast_checker0.errors,
-                    axis_broadcast_checker0.cycles),
-                Display("AXIS Broadcast 1  Errors : %d / Cycles: %d",
-                    axis_broadcast_checker1.errors,
-                    axis_broadcast_checker1.cycles),
-               Display("AXIS Arb Mux       Errors : %d / Cycles: %d",
-                    axis_arb_mux_checker.errors,
-                    axis_arb_mux_checker.cycles),
-               Display("AXIS Mux           Errors : %d / Cycles: %d",
-                    axis_mux_checker.errors,
-                    axis_mux_checker.cycles),
-               Display("AXIS Demux         Errors : %d / Cycles: %d",
-                    axis_demux_checker.errors,
-                    axis_demux_checker.cycles),
-               Display("AXIS Switch        Errors : %d / Cycles: %d",
-                    axis_switch_checker.errors,
-                    axis_switch_checker.cycles),
-                Finish(),
-            )
+    def add_trigger(self, kind, signal):
+        # Hardware trace trigger (kind: error, overflow).
+        self.triggers.append((kind, signal))
+
+    def add_file_stream(self, s_axis, m_axis, input=None, output=None, format="raw", frame_size=0, drain=1000):
+        # Stream input file to s_axis and capture m_axis to output file (64-bit interfaces) through
+        # the axisfile simulation module; the simulation ends once the input has been replayed.
+        assert len(s_axis.data) == 64
+        assert len(m_axis.data) == 64
+        assert format in ["raw", "pcap"]
+        pads = self.platform.request("axis_file")
+        self.add_stream_pads(pads, s_axis, m_axis)
+        args = {"format": format, "frame_size": str(frame_size), "drain": str(drain)}
+        if input is not None:
+            args["input"] = os.path.abspath(input)
+        if output is not None:
+            args["output"] = os.path.abspath(output)
+        self.sim_modules.append(dict(name="axisfile", interfaces=["axis_file"], args=args))
+        self.finish.append(pads.done)
+
+    def add_shm_stream(self, s_axis, m_axis, path=None, drain=1000):
+        # Connect s_axis/m_axis (64-bit interfaces) to the Host -> Sim/Sim -> Host rings of the shared
+        # memory file created by the host at path (runtime argument) through the axisshm simulation
+        # module; the simulation ends once the host is done and the output is drained.
+        assert len(s_axis.data) == 64
+        assert len(m_axis.data) == 64
+        pads = self.platform.request("axis_shm")
+        self.add_stream_pads(pads, s_axis, m_axis)
+        args = {"drain": str(drain)}
+        if path is not None:
+            args["path"] = os.path.abspath(path)
+        self.sim_modules.append(dict(name="axisshm", interfaces=["axis_shm"], args=args))
+        self.finish.append(pads.done)
+
+    def add_stream_pads(self, pads, s_axis, m_axis):
+        # Connect simulation module source pads to s_axis and m_axis to sink pads.
+        self.comb += [
+            s_axis.valid.eq(pads.source_valid),
+            pads.source_ready.eq(s_axis.ready),
+            s_axis.data.eq(pads.source_data),
+            s_axis.keep.eq(pads.source_keep),
+            s_axis.last.eq(pads.source_last),
+
+            pads.sink_valid.eq(m_axis.valid),
+            m_axis.ready.eq(pads.sink_ready),
+            pads.sink_data.eq(m_axis.data),
+            pads.sink_keep.eq(m_axis.keep),
+            pads.sink_last.eq(m_axis.last),
+        ]
 
-        axis_syntax_test()
-        axis_integration_test()
+    def add_generator(self, axis):
+        generator = AXISGenerator(axis,
+            seed      = self.seed + 2*len(self.generators),
+            timestamp = self.timestamp if self.latency_histogram else None,
+            **self.generator_config)
+        self.submodules += ClockDomainsRenamer(axis.clock_domain)(generator)
+        self.generators.append(generator)
+        return generator
+
+    def add_checker(self, name, axis):
+        if self.latency_histogram:
+            checker = AXISLatencyChecker(axis, self.timestamp,
+                seed = self.seed + 2*len(self.checkers) + 1,
+                **self.checker_config,
+                **self.histogram_config)
+        else:
+            checker = AXISChecker(axis, seed=self.seed + 2*len(self.checkers) + 1, **self.checker_config)
+        self.submodules += ClockDomainsRenamer(axis.clock_domain)(checker)
+        self.checkers.append((name, checker))
+        return checker
+
+    def add_frame_generator(self, axis, **kwargs):
+        generator = AXISFrameGenerator(axis, seed=self.seed + 2*len(self.generators), **self.generator_config, **kwargs)
+        self.submodules += ClockDomainsRenamer(axis.clock_domain)(generator)
+        self.generators.append(generator)
+        return generator
+
+    def add_frame_scoreboard(self, name, axis, **kwargs):
+        scoreboard = AXISFrameScoreboard(axis, seed=self.seed + 2*len(self.checkers) + 1, **self.checker_config, **kwargs)
+        self.submodules += ClockDomainsRenamer(axis.clock_domain)(scoreboard)
+        self.checkers.append((name, scoreboard))
+        return scoreboard
+
+# Test Runner --------------------------------------------------------------------------------------
+
+_checker_re = re.compile(r"^(?P<name>.+?)\s+Errors :\s*(?P<errors>\d+) / Cycles:\s*(?P<cycles>\d+)"
+    r" / Stalls:\s*(?P<stalls>\d+) / Idles:\s*(?P<idles>\d+)\s*$")
+
+_latency_re   = re.compile(r"^(?P<name>.+?)\s+Latency Max:\s*(?P<max>\d+) / Sum:\s*(?P<sum>\d+)\s*$")
+_histogram_re = re.compile(r"^(?P<name>.+?)\s+Latency \[(?P<low>\d+)-(?P<high>\d+|inf)\]:\s*(?P<count>\d+)\s*$")
+_frames_re    = re.compile(r"^(?P<name>.+?)\s+Frames:\s*(?P<frames>\d+) / Bytes:\s*(?P<bytes>\d+) / Bad:\s*(?P<bad>\d+)\s*$")
+_cycles_re    = re.compile(r"^Cycles\s+:\s*(?P<cycles>\d+)\s*$")
+_status_re    = re.compile(r"^Status\s+:\s*(?P<status>\w+)\s*$")
+_file_re      = re.compile(r"^\[axisfile\] In: (?P<frames_in>\d+) frames / (?P<bytes_in>\d+) bytes, "
+    r"Out: (?P<frames_out>\d+) frames / (?P<bytes_out>\d+) bytes\s*$")
+_shm_re       = re.compile(r"^\[axisshm\] In: (?P<beats_in>\d+) beats, Out: (?P<beats_out>\d+) beats\s*$")
+
+class AXISTestResult:
+    def __init__(self, sim_result, status, checkers=[], histograms={}, frames={}, cycles=0):
+        self.name         = sim_result.name
+        self.status       = status
+        self.checkers     = checkers
+        self.histograms   = histograms
+        self.frames       = frames
+        self.cycles       = cycles
+        self.duration     = sim_result.duration
+        self.sim_duration = sim_result.sim_duration
+        self.log          = sim_result.log
+        self.cached       = sim_result.cached
+
+    @property
+    def cycles_per_second(self):
+        return self.cycles/self.sim_duration if self.sim_duration > 0 else 0.0
+
+    @property
+    def passed(self):
+        return self.status == "PASS"
+
+# Simulation log parsers (checkers/histograms/status ones are also used by sweep_axis.py/tune_axis.py).
+
+def parse_checkers(log):
+    checkers = []
+    with open(log) as f:
+        for line in f:
+            m = _checker_re.match(line.strip())
+            if m is not None:
+                checkers.append((m.group("name"), *[int(m.group(k)) for k in ["errors", "cycles", "stalls", "idles"]]))
+    return checkers
+
+def parse_histograms(log):
+    histograms = {}
+    with open(log) as f:
+        for line in f:
+            m = _latency_re.match(line.strip())
+            if m is not None:
+                histograms[m.group("name")] = {"max": int(m.group("max")), "sum": int(m.group("sum")), "bins": []}
+            m = _histogram_re.match(line.strip())
+            if m is not None:
+                high = None if m.group("high") == "inf" else int(m.group("high"))
+                histograms[m.group("name")]["bins"].append((int(m.group("low")), high, int(m.group("count"))))
+    return histograms
+
+def _parse_frames(log):
+    frames = {}
+    with open(log) as f:
+        for line in f:
+            m = _frames_re.match(line.strip())
+            if m is not None:
+                frames[m.group("name")] = {k: int(m.group(k)) for k in ["frames", "bytes", "bad"]}
+    return frames
+
+def _parse_file(log):
+    with open(log) as f:
+        for line in f:
+            m = _file_re.match(line.strip())
+            if m is not None:
+                return {k: int(v) for k, v in m.groupdict().items()}
+    return None
+
+def _parse_shm(log):
+    with open(log) as f:
+        for line in f:
+            m = _shm_re.match(line.strip())
+            if m is not None:
+                return {k: int(v) for k, v in m.groupdict().items()}
+    return None
+
+def parse_status(log):
+    # Return simulated cycles and end status (DONE or TIMEOUT when beats/frames targets are not met).
+    cycles = 0
+    status = None
+    with open(log) as f:
+        for line in f:
+            m = _cycles_re.match(line.strip())
+            if m is not None:
+                cycles = int(m.group("cycles"))
+            m = _status_re.match(line.strip())
+            if m is not None:
+                status = m.group("status")
+    return cycles, status
+
+def histogram_percentile(histogram, percentile):
+    # Return the upper bound (in cycles) of the bin containing the percentile (None if in last bin).
+    total = sum(count for _, _, count in histogram["bins"])
+    acc   = 0
+    for low, high, count in histogram["bins"]:
+        acc += count
+        if acc >= total*percentile/100:
+            return high
+    return None
+
+def run_axis_test(test, soc_kwargs={}, run_length={}, file_stream={}, shm_frames=100, **kwargs):
+    # Run length (cycles/beats/frames) is passed at runtime and file stream/shared memory args through
+    # the sim config: the same simulation binary is reused.
+    if ("input" in file_stream) and ("output" not in file_stream):
+        output_dir  = kwargs.get("output_dir", "build")
+        file_stream = {"output": os.path.join(output_dir, test, f"{test}.out.{file_stream.get('format', 'raw')}"), **file_stream}
+
+    # Shared memory tests: loopback host (shm_frames random frames sent and checked back), paced by
+    # the host so the cycles timeout guard is disabled (use timeout).
+    bridge   = None
+    sim_host = None
+    if test.endswith("_shm"):
+        shm_dir  = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        bridge   = AXISSharedMemoryBridge(os.path.join(shm_dir, f"axis_{test}_{os.getpid()}"))
+        def sim_host(exited):
+            bridge.exited = exited
+            return shm_loopback_host(bridge, frames=shm_frames, seed=soc_kwargs.get("seed", 1))
+        run_length = {**run_length, "cycles": 2**63}
+    try:
+        r = run_sim(test,
+            soc_factory  = lambda: AXISSimSoC(tests=[test],
+                file_stream = file_stream,
+                shm_stream  = {} if bridge is None else {"path": bridge.path},
+                **soc_kwargs),
+            cache_extra  = {"test": test, **soc_kwargs},
+            python_files = [__file__],
+            sim_args     = [f"+{k}={v or 0}" for k, v in run_length.items()],
+            sim_host     = sim_host,
+            **kwargs
+        )
+    finally:
+        if bridge is not None:
+            bridge.close()
+    if not r.done:
+        return AXISTestResult(r, r.status)
+
+    # Check.
+    checkers       = parse_checkers(r.log)
+    frames         = _parse_frames(r.log)
+    stream         = _parse_file(r.log)
+    shm            = _parse_shm(r.log)
+    cycles, status = parse_status(r.log)
+    if stream is not None:
+        frames = {"File Out": {"frames": stream["frames_out"], "bytes": stream["bytes_out"], "bad": 0}}
+    elif shm is not None:
+        if r.host is None:
+            return AXISTestResult(r, "HOST ERROR")
+        frames = {"SHM Host": {"frames": r.host["frames_rx"], "bytes": r.host["bytes"], "bad": r.host["errors"]}}
+        checkers = [("SHM Host", r.host["errors"], shm["beats_out"], 0, 0)]
+    elif len(checkers) == 0:
+        return AXISTestResult(r, "SIM ERROR")
+    passed = all((errors == 0) and (beats > 0) for _, errors, beats, _, _ in checkers)
+    passed &= all(stats["frames"] > 0 for stats in frames.values())
+    status = "SIM TIMEOUT" if status == "TIMEOUT" else ("PASS" if passed else "FAIL")
+    return AXISTestResult(r, status, checkers, parse_histograms(r.log), frames, cycles)
+
+def axis_tests_report(results, sys_clk_freq=100e6):
+    print("-"*110)
+    print(f"{'Test':<24s} {'Status':<18s} {'Checker':<20s} {'Errors':>8s} {'Cycles':>8s} {'Stalls':>8s} {'Idles':>8s} {'Efficiency':>10s}")
+    print("-"*110)
+    for r in results:
+        checkers = r.checkers if len(r.checkers) else [("-", "-", "-", "-", "-")]
+        for i, (name, errors, cycles, stalls, idles) in enumerate(checkers):
+            test       = r.name   if i == 0 else ""
+            status     = r.status if i == 0 else ""
+            efficiency = "-" if cycles == "-" else f"{100*cycles/max(1, cycles + idles):.1f}%"
+            print(f"{test:<24s} {status:<18s} {name:<20s} {errors:>8} {cycles:>8} {stalls:>8} {idles:>8} {efficiency:>10s}")
+        if not r.passed:
+            print(f"{'':<24s} See {r.log}")
+    print("-"*110)
+    for r in results:
+        for name, histogram in r.histograms.items():
+            total = sum(count for _, _, count in histogram["bins"])
+            p50   = histogram_percentile(histogram, 50)
+            p99   = histogram_percentile(histogram, 99)
+            print(f"{r.name} / {name} latency (cycles): avg {histogram['sum']/max(1, total):.1f}, "
+                f"p50 <= {'inf' if p50 is None else p50}, "
+                f"p99 <= {'inf' if p99 is None else p99}, "
+                f"max {histogram['max']}")
+            for low, high, count in histogram["bins"]:
+                bar = "#"*int(50*count/max(1, total))
+                print(f"  [{low:>6d}-{'inf' if high is None else high:>6}] {count:>10d} {bar}")
+    for r in results:
+        for name, stats in r.frames.items():
+            duration = max(1, r.cycles)/sys_clk_freq
+            print(f"{r.name} / {name} frames: {stats['frames']} ({stats['bad']} bad), "
+                f"{stats['frames']/duration/1e6:.3f} Mframes/s, "
+                f"{8*stats['bytes']/duration/1e9:.3f} Gbps "
+                f"(@ {sys_clk_freq/1e6:.0f}MHz)")
+    for r in results:
+        if r.cycles:
+            print(f"{r.name} simulation: {r.cycles} cycles in {r.sim_duration:.2f}s "
+                f"({r.cycles_per_second/1e3:.1f} kcycles/s), total {r.duration:.2f}s")
+    passed = sum(r.passed for r in results)
+    print(f"{passed}/{len(results)} tests passed.")
 
 # Build --------------------------------------------------------------------------------------------
 
 def main():
     parser = argparse.ArgumentParser(description="LiteX Verilog AXIS test simulation SoC ")
+    parser.add_argument("--test",        default=[], action="append",  help="Test(s) to run (default: all).", choices=list(axis_tests.keys()))
+    parser.add_argument("--parallel",    default=os.cpu_count(), type=int, help="Number of tests built/simulated in parallel.")
+    parser.add_argument("--cycles",      default=10000,          type=int, help="Number of simulated cycles per test (Timeout guard with --beats/--frames).")
+    parser.add_argument("--beats",       default=None,           type=int, help="Run until every checker has seen N beats.")
+    parser.add_argument("--frames",      default=None,           type=int, help="Run until every frame scoreboard has seen N frames.")
+    parser.add_argument("--timeout",     default=None,           type=float, help="Simulation timeout per test (s).")
+    parser.add_argument("--valid-probability", default=100,      type=int, help="Generators valid probability (%%).")
+    parser.add_argument("--valid-burst",       default=1,        type=int, help="Generators valid burst length (cycles).")
+    parser.add_argument("--ready-probability", default=100,      type=int, help="Checkers ready probability (%%).")
+    parser.add_argument("--ready-burst",       default=1,        type=int, help="Checkers ready burst length (cycles).")
+    parser.add_argument("--seed",              default=1,        type=int, help="Generators/Checkers LFSR seed.")
+    parser.add_argument("--latency-histogram", action="store_true",          help="Measure latency histograms (timestamps in data).")
+    parser.add_argument("--histogram-bins",    default=16,       type=int, help="Latency histogram number of bins.")
+    parser.add_argument("--histogram-width",   default=1,        type=int, help="Latency histogram bin width (cycles).")
+    parser.add_argument("--trace-window",      default=None,               help="Trace cycle window (START:END, START: or :END).")
+    parser.add_argument("--trace-trigger",     default=[], action="append", help="Start trace on hardware trigger.", choices=["error", "overflow"])
+    parser.add_argument("--trace-length",      default=0,        type=int, help="Trace length after trigger (cycles, 0: until end).")
+    parser.add_argument("--trace-scope",       default=[], action="append", help="Only trace Verilog instances matching scope (ex axis_fifo).")
+    parser.add_argument("--input",             default=None,               help="Input file for file tests (*_file).")
+    parser.add_argument("--output",            default=None,               help="Output file for file tests (default: <output-dir>/<test>/<test>.out.<format>).")
+    parser.add_argument("--format",            default="raw",              help="Input/Output file format.", choices=["raw", "pcap"])
+    parser.add_argument("--frame-size",        default=0,        type=int, help="Raw format frame size (bytes, 0: single frame).")
+    parser.add_argument("--shm-frames",        default=100,      type=int, help="Frames sent by the Python host in shared memory tests (*_shm).")
+    parser.add_argument("--output-dir",  default="build",                  help="Base output directory.")
+    parser.add_argument("--cache-dir",   default=None,                     help="Build cache directory (default: <output-dir>/cache).")
+    parser.add_argument("--cache-size",  default=4.0,            type=float, help="Build cache maximum size (GB).")
+    parser.add_argument("--no-cache",    action="store_true",              help="Disable build cache.")
     verilator_build_args(parser)
     args = parser.parse_args()
-    verilator_build_kwargs = verilator_build_argdict(args)
-    sim_config = SimConfig(default_clk="sys_clk")
 
-    soc = AXISSimSoC()
-    builder = Builder(soc)
-    builder.build(sim_config=sim_config, **verilator_build_kwargs)
+    # Wrappers logs (in each test/benchmark log).
+    logging.basicConfig(level=logging.INFO)
+
+    file_tests = [t for t in axis_tests.keys() if t.endswith("_file")]
+    if args.input is None:
+        tests = args.test if len(args.test) else [t for t in axis_tests.keys() if t not in file_tests + list(axis_tests_skipped)]
+        if any(t in file_tests for t in tests):
+            parser.error("File tests require an --input file.")
+    else:
+        tests = args.test if len(args.test) else file_tests
+    for test, reason in axis_tests_skipped.items():
+        if (len(args.test) == 0) and (args.input is None):
+            print(f"{test}: {colorer('SKIPPED', color='yellow')} ({reason}, run it with --test {test}).")
+    file_stream = {} if args.input is None else dict(input=args.input, format=args.format, frame_size=args.frame_size)
+    if args.output is not None:
+        file_stream["output"] = args.output
+    trace_start, trace_end = None, None
+    if args.trace_window is not None:
+        trace_start, trace_end = [int(v) if v else None for v in args.trace_window.split(":")]
+    results = run_parallel(run_axis_test, tests,
+        jobs                   = args.parallel,
+        output_dir             = args.output_dir,
+        file_stream            = file_stream,
+        shm_frames             = args.shm_frames,
+        run_length             = dict(
+            cycles = args.cycles,
+            beats  = args.beats,
+            frames = args.frames,
+        ),
+        soc_kwargs             = dict(
+            valid_probability = args.valid_probability,
+            valid_burst       = args.valid_burst,
+            ready_probability = args.ready_probability,
+            ready_burst       = args.ready_burst,
+            seed              = args.seed,
+            latency_histogram = args.latency_histogram,
+            histogram_bins    = args.histogram_bins,
+            histogram_width   = args.histogram_width,
+            trace_start       = trace_start,
+            trace_end         = trace_end,
+            trace_triggers    = args.trace_trigger,
+            trace_length      = args.trace_length,
+            trace_scopes      = args.trace_scope,
+        ),
+        timeout                = args.timeout,
+        verilator_build_kwargs = verilator_build_argdict(args),
+        cache_dir              = None if args.no_cache else (args.cache_dir or os.path.join(args.output_dir, "cache")),
+        cache_size             = int(args.cache_size*1e9),
+    )
+    axis_tests_report(results)
+    sys.exit(0 if all(r.passed for r in results) else 1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,50 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Elaboration tests: an AXISElaborationReport must only collect the wrappers parameters (one entry
+# per wrapper class/parameters) and generate the same Verilog as per-instance logs.
+
+import os
+import pytest
+
+from migen import *
+
+from litex.gen.fhdl import verilog
+
+import verilog_axis
+from verilog_axis.axis_common import *
+from verilog_axis.axis_sources import rtl_dir
+
+from test_axis import Platform
+from bench_elab import elab_benches, elab_interfaces
+
+# The wrappers add their RTL sources from the verilog-axis submodule (git submodule update --init).
+pytestmark = pytest.mark.skipif(not os.path.isdir(rtl_dir), reason="verilog-axis submodule not checked out.")
+
+def elab_verilog(name, report=None, n=4, **kwargs):
+    cls        = verilog_axis.get(name)
+    kwargs     = {**elab_benches[name], **kwargs}
+    interfaces = elab_interfaces(n)
+    platform   = Platform()
+    top        = Module()
+    top.clock_domains.cd_sys = ClockDomain("sys")
+    if report is not None:
+        with report:
+            wrappers = [cls(platform, *args, **kwargs) for args in interfaces]
+    else:
+        wrappers = [cls(platform, *args, **kwargs) for args in interfaces]
+    top.submodules += wrappers
+    # Generated Verilog without the header comments (generation date).
+    return "\n".join(line for line in str(verilog.convert(top, platform=platform)).splitlines()
+        if not line.startswith("//"))
+
+@pytest.mark.parametrize("with_csr", [False, True])
+@pytest.mark.parametrize("name", list(elab_benches.keys()))
+def test_elaboration_report_verilog(name, with_csr):
+    report = AXISElaborationReport()
+    assert elab_verilog(name, report, with_csr=with_csr) == elab_verilog(name, with_csr=with_csr)
+    assert len(report) == 4*len(report.entries)
+    assert all(entry["count"] == 4 for entry in report.as_list())
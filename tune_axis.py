@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import re
+import sys
+import math
+import logging
+import json
+import time
+import argparse
+import itertools
+
+from functools import partial
+
+from migen import *
+
+from litex.build.sim.verilator import verilator_build_args, verilator_build_argdict
+
+from verilog_axis.axis_common import *
+from verilog_axis.axis_fifo import AXISFIFO
+from verilog_axis.axis_async_fifo import AXISAsyncFIFO
+from verilog_axis.axis_srl_fifo import AXISSRLFIFO
+from verilog_axis.axis_auto_fifo import AXISAutoFIFO, axis_auto_fifo_select
+from verilog_axis.axis_resources import AXISResourceModel
+
+from sim.runner import run_sim, run_parallel
+
+import test_axis
+from test_axis import AXISSimSoC, axis_tests, axis_tests_skipped, parse_checkers, parse_status
+
+# Traffic Profiles ---------------------------------------------------------------------------------
+
+# Traffic profiles (AXISSimSoC generators/checkers configuration) the FIFOs are tuned against. The
+# sinks must sustain the average rate of the sources: otherwise any FIFO fills up whatever its depth
+# (reported as saturated).
+
+axis_traffic_profiles = {
+    #  Profile          Sources                                  Sinks.
+    "line_rate"     : dict(valid_probability=100,                  ready_probability=100),
+    "bursty_source" : dict(valid_probability=50, valid_burst=64,   ready_probability=100),
+    "bursty_sink"   : dict(valid_probability=50,                   ready_probability=75, ready_burst=64),
+    "random"        : dict(valid_probability=50,                   ready_probability=75),
+}
+
+# FIFOs --------------------------------------------------------------------------------------------
+
+# FIFO wrappers -> (Kind, Verilog-AXIS core).
+_fifo_kinds = {
+    AXISFIFO      : ("fifo",       "axis_fifo"),
+    AXISAsyncFIFO : ("async_fifo", "axis_async_fifo"),
+    AXISSRLFIFO   : ("srl_fifo",   "axis_srl_fifo"),
+}
+
+def axis_fifos(module, prefix=""):
+    # Return the (path, fifo) of the FIFO wrappers of a module hierarchy, path being the submodules
+    # names joined with "." (ex axis_fifo.cdc, unnamed submodules are named from their class/index).
+    # AXISAutoFIFOs are tuned as a whole (their implementation FIFO is not returned).
+    fifos = []
+    for n, (name, submodule) in enumerate(module._submodules):
+        name = f"{type(submodule).__name__.lower()}{n}" if name is None else name
+        path = name if prefix == "" else f"{prefix}.{name}"
+        if isinstance(submodule, AXISAutoFIFO):
+            fifos.append((path, submodule))
+            fifos += axis_fifos(submodule.fifo, f"{path}.fifo") # CDC/Width adaptation FIFOs.
+            continue
+        if type(submodule) in _fifo_kinds:
+            fifos.append((path, submodule))
+        fifos += axis_fifos(submodule, path)
+    return fifos
+
+def _fifo_parameters(fifo):
+    # DEPTH/DATA_WIDTH of the Verilog-AXIS Instance of a FIFO wrapper (CDC/Width adaptation
+    # submodules excluded).
+    for special in fifo._fragment.specials:
+        if isinstance(special, Instance):
+            return {item.name: item.value.value for item in special.items
+                if isinstance(item, Instance.Parameter) and (item.name in ["DEPTH", "DATA_WIDTH"])}
+    raise ValueError(f"No Instance in {type(fifo).__name__}.")
+
+def axis_tune_fifos(soc, platform, fifo_depths):
+    # Instrumentation (to be run after the tests): Displays the index (in fifo_depths, see
+    # AXISFIFODepths), depth and peak occupancy of each FIFO at the end of the run. Depth/Peak are in
+    # the unit of the Instance (AXISAutoFIFO: its implementation FIFO, kind auto_<kind>).
+    for path, fifo in axis_fifos(soc):
+        index = fifo_depths.index(fifo)
+        kind  = ""
+        if isinstance(fifo, AXISAutoFIFO):
+            kind = "auto_"
+            fifo = fifo.fifo
+        kind      += _fifo_kinds[type(fifo)][0]
+        parameters = _fifo_parameters(fifo)
+        soc.displays.append(Display(f"FIFO {index} {path} ({kind}, Data Width: {parameters['DATA_WIDTH']}, "
+            f"Depth: {parameters['DEPTH']}) Peak: %d", fifo.peak))
+
+def axis_tune_soc(test, depths={}, **kwargs):
+    # AXISSimSoC of a test with its FIFOs constructed with depths (FIFO index -> depth, see
+    # AXISFIFODepths) and their peak occupancy displayed at the end of the run.
+    with AXISFIFODepths(depths) as fifo_depths:
+        return AXISSimSoC(tests=[test, partial(axis_tune_fifos, fifo_depths=fifo_depths)], **kwargs)
+
+_fifo_re = re.compile(r"^FIFO (?P<index>\d+) (?P<path>\S+) \((?P<kind>\w+), Data Width: (?P<data_width>\d+), "
+    r"Depth: (?P<depth>\d+)\) Peak:\s*(?P<peak>\d+)\s*$")
+
+def _parse_fifos(log):
+    fifos = {}
+    with open(log) as f:
+        for line in f:
+            m = _fifo_re.match(line.strip())
+            if m is not None:
+                fifos[m.group("path")] = {
+                    "kind"       : m.group("kind"),
+                    **{k: int(m.group(k)) for k in ["index", "data_width", "depth", "peak"]},
+                }
+    return fifos
+
+# Depth Tuning -------------------------------------------------------------------------------------
+
+def fifo_depth_unit(kind, data_width):
+    # Depth unit of a FIFO (in beats): axis_fifo/axis_async_fifo depths are in bytes when tkeep is
+    # enabled (data width > 8), axis_srl_fifo depth is in beats.
+    if kind.endswith("srl_fifo"):
+        return 1
+    return math.ceil(data_width/8) if data_width > 8 else 1
+
+def fifo_wrapper_depth(kind, data_width, depth):
+    # Depth parameter of the wrapper for a depth in the unit of its Instance (AXISAutoFIFO: beats).
+    if kind.startswith("auto_"):
+        return depth//fifo_depth_unit(kind, data_width)
+    return depth
+
+def fifo_tuned_depth(kind, data_width, depth, peak, margin=0.25):
+    # Minimum depth holding peak with margin (ratio), rounded as implemented: SRL FIFO: beats (2 min),
+    # RAM FIFOs: power of 2 beats (2 min). Never above depth, None when saturated (peak reached
+    # depth: the FIFO was full and backpressured upstream, depth is not large enough for the profile).
+    if peak >= depth:
+        return None
+    unit  = fifo_depth_unit(kind, data_width)
+    beats = max(2, math.ceil(peak*(1 + margin)/unit))
+    if not kind.endswith("srl_fifo"):
+        beats = 2**math.ceil(math.log2(beats))
+    return min(depth, beats*unit)
+
+def fifo_resources(kind, data_width, depth, model=None):
+    # Estimated resources of a FIFO (see AXISResourceModel, tdata/tkeep/tlast beats, AXISAutoFIFO:
+    # implementation selected for depth).
+    model = AXISResourceModel() if model is None else model
+    if kind.startswith("auto_"):
+        impl, beats = axis_auto_fifo_select(fifo_wrapper_depth(kind, data_width, depth), data_width)
+        kind  = "srl_fifo" if impl == "srl" else "fifo"
+        depth = beats*fifo_depth_unit(kind, data_width)
+    core = {v[0]: v[1] for v in _fifo_kinds.values()}[kind]
+    return model.estimate_parameters(core, {"DEPTH": depth, "DATA_WIDTH": data_width})
+
+def axis_tuned_depths(results, margin=0.25):
+    # Tuned depth of each FIFO of each test over all the profiles (worst peak) as test -> path ->
+    # {kind, data_width, depth, peak, tuned (None when saturated), profile (of the worst peak)}.
+    tuned = {}
+    for r in results:
+        for path, fifo in r.fifos.items():
+            t = tuned.setdefault(r.test, {}).setdefault(path, dict(fifo, peak=-1, profile=None))
+            if fifo["peak"] > t["peak"]:
+                t["peak"]    = fifo["peak"]
+                t["profile"] = r.profile
+    for fifos in tuned.values():
+        for t in fifos.values():
+            t["tuned"] = fifo_tuned_depth(t["kind"], t["data_width"], t["depth"], t["peak"], margin)
+    return tuned
+
+# Tune Runner --------------------------------------------------------------------------------------
+
+class AXISTuneResult:
+    def __init__(self, sim_result, test, profile, status, fifos={}, checkers=[], cycles=0):
+        self.name     = sim_result.name
+        self.test     = test
+        self.profile  = profile
+        self.status   = status
+        self.fifos    = fifos
+        self.checkers = checkers
+        self.cycles   = cycles
+        self.duration = sim_result.duration
+        self.log      = sim_result.log
+        self.cached   = sim_result.cached
+
+    @property
+    def passed(self):
+        return self.status == "PASS"
+
+    @property
+    def beats(self):
+        return {name: beats for name, _, beats, _, _ in self.checkers}
+
+    def to_dict(self):
+        return {
+            "test"     : self.test,
+            "profile"  : self.profile,
+            "status"   : self.status,
+            "cycles"   : self.cycles,
+            "beats"    : self.beats,
+            "fifos"    : self.fifos,
+        }
+
+def run_axis_tune(point, cycles=10000, depths={}, soc_kwargs={}, **kwargs):
+    test, profile = point
+    name = f"{test}_{profile}" + ("_tuned" if len(depths.get(test, {})) else "")
+    r = run_sim(name,
+        soc_factory  = lambda: axis_tune_soc(test, depths.get(test, {}), **axis_traffic_profiles[profile], **soc_kwargs),
+        cache_extra  = {"test": test, "profile": profile, "depths": depths.get(test, {}), **soc_kwargs},
+        python_files = [__file__, test_axis.__file__],
+        sim_args     = [f"+cycles={cycles}"],
+        **kwargs
+    )
+    if not r.done:
+        return AXISTuneResult(r, test, profile, r.status)
+
+    # Analyze.
+    fifos    = _parse_fifos(r.log)
+    checkers = parse_checkers(r.log)
+    sim_cycles, status = parse_status(r.log)
+    if sim_cycles == 0:
+        return AXISTuneResult(r, test, profile, "SIM ERROR")
+    if len(fifos) == 0:
+        return AXISTuneResult(r, test, profile, "NO FIFO")
+    passed = all(errors == 0 for _, errors, _, _, _ in checkers)
+    return AXISTuneResult(r, test, profile, "PASS" if passed else "FAIL", fifos, checkers, sim_cycles)
+
+def axis_tune_report(tuned, model=None):
+    model  = AXISResourceModel() if model is None else model
+    totals = {"before": {"bram": 0, "lutram": 0}, "after": {"bram": 0, "lutram": 0}}
+    print("-"*120)
+    print(f"{'Test/FIFO':<52s} {'Kind':<10s} {'Width':>5s} {'Depth':>6s} {'Peak':>6s} {'Tuned':>10s} {'BRAM':>9s} {'LUTRAM':>9s} Profile")
+    print("-"*120)
+    for test, fifos in tuned.items():
+        for path, t in fifos.items():
+            depth  = t["depth"] if t["tuned"] is None else t["tuned"]
+            before = fifo_resources(t["kind"], t["data_width"], t["depth"], model)
+            after  = fifo_resources(t["kind"], t["data_width"], depth, model)
+            for r in totals["before"].keys():
+                totals["before"][r] += before[r]
+                totals["after"][r]  += after[r]
+            tuned_s = colorer(f"{'SATURATED':>10s}", color="red") if t["tuned"] is None else f"{t['tuned']:>10d}"
+            print(f"{test + '/' + path:<52s} {t['kind']:<10s} {t['data_width']:>5d} {t['depth']:>6d} {t['peak']:>6d} {tuned_s:>10s}"
+                  f" {before['bram']:>4d}>{after['bram']:<4d} {before['lutram']:>4d}>{after['lutram']:<4d} {t['profile']}")
+    print("-"*120)
+    print("BRAM: {} -> {}, LUTRAM: {} -> {} (estimated, see AXISResourceModel).".format(
+        totals["before"]["bram"],   totals["after"]["bram"],
+        totals["before"]["lutram"], totals["after"]["lutram"]))
+
+def axis_tune_verify(results, tuned_results):
+    # Tuned depths are verified when, for every test/profile, the FIFOs are numbered the same, none
+    # saturates and the checkers see the same beats as with the original depths (same traffic, no
+    # added upstream backpressure).
+    verified = True
+    for r, t in zip(results, tuned_results):
+        ok = t.passed and (t.beats == r.beats) and all(f["peak"] < f["depth"] for f in t.fifos.values())
+        ok = ok and ({p: f["index"] for p, f in t.fifos.items()} == {p: f["index"] for p, f in r.fifos.items()})
+        if not ok:
+            print(colorer(f"{r.test}/{r.profile}: Tuned depths not verified (see {t.log}).", color="red"))
+        verified &= ok
+    print(colorer("Tuned depths verified.", color="green") if verified else colorer("Tuned depths not verified.", color="red"))
+    return verified
+
+# Build --------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX Verilog AXIS FIFO depth tuner (from simulated traffic profiles).")
+    parser.add_argument("--test",        default=[], action="append",  help="Test(s)/pipeline(s) to tune (default: all with FIFOs).", choices=list(axis_tests.keys()))
+    parser.add_argument("--profile",     default=[], action="append",  help="Traffic profile(s) (default: all).", choices=list(axis_traffic_profiles.keys()))
+    parser.add_argument("--margin",      default=0.25,           type=float, help="Margin over the peak occupancy (ratio).")
+    parser.add_argument("--apply",       action="store_true",              help="Re-simulate with the tuned depths to verify them.")
+    parser.add_argument("--parallel",    default=os.cpu_count(), type=int, help="Number of points built/simulated in parallel.")
+    parser.add_argument("--cycles",      default=100000,         type=int, help="Number of simulated cycles per point.")
+    parser.add_argument("--timeout",     default=None,           type=float, help="Simulation timeout per point (s).")
+    parser.add_argument("--seed",        default=1,              type=int, help="Generators/Checkers LFSR seed.")
+    parser.add_argument("--output-dir",  default="build/tune",             help="Base output directory.")
+    parser.add_argument("--cache-dir",   default="build/cache",            help="Build cache directory.")
+    parser.add_argument("--cache-size",  default=4.0,            type=float, help="Build cache maximum size (GB).")
+    parser.add_argument("--no-cache",    action="store_true",              help="Disable build cache.")
+    parser.add_argument("--json",        default="tune_axis.json",         help="JSON results file.")
+    verilator_build_args(parser)
+    args = parser.parse_args()
+
+    # Wrappers logs (in each test log).
+    logging.basicConfig(level=logging.INFO)
+
+    tests    = args.test    if len(args.test)    else [t for t in axis_tests.keys() if not t.endswith(("_file", "_shm")) and t not in axis_tests_skipped]
+    profiles = args.profile if len(args.profile) else list(axis_traffic_profiles.keys())
+    points   = list(itertools.product(tests, profiles))
+    run_kwargs = dict(
+        jobs                   = args.parallel,
+        output_dir             = args.output_dir,
+        cycles                 = args.cycles,
+        soc_kwargs             = dict(seed=args.seed),
+        timeout                = args.timeout,
+        verilator_build_kwargs = verilator_build_argdict(args),
+        cache_dir              = None if args.no_cache else args.cache_dir,
+        cache_size             = int(args.cache_size*1e9),
+    )
+
+    # Peak occupancies with the original depths.
+    results = run_parallel(run_axis_tune, points, **run_kwargs)
+    results = [r for r in results if r.status != "NO FIFO"]
+    tuned   = axis_tuned_depths([r for r in results if r.passed], margin=args.margin)
+    axis_tune_report(tuned)
+
+    # Verification with the tuned depths.
+    verified = None
+    if args.apply:
+        depths = {test: {t["index"]: fifo_wrapper_depth(t["kind"], t["data_width"], t["tuned"])
+            for t in fifos.values() if t["tuned"] is not None} for test, fifos in tuned.items()}
+        tuned_results = run_parallel(run_axis_tune, [(r.test, r.profile) for r in results],
+            depths = depths,
+            **run_kwargs
+        )
+        verified = axis_tune_verify(results, tuned_results)
+
+    with open(args.json, "w") as f:
+        json.dump({
+            "date"     : time.strftime("%Y-%m-%d %H:%M:%S"),
+            "cycles"   : args.cycles,
+            "margin"   : args.margin,
+            "verified" : verified,
+            "depths"   : {test: {path: fifo_wrapper_depth(t["kind"], t["data_width"], t["depth"] if t["tuned"] is None else t["tuned"])
+                for path, t in fifos.items()} for test, fifos in tuned.items()},
+            "fifos"    : tuned,
+            "results"  : [r.to_dict() for r in results],
+        }, f, indent=4)
+    print(f"Results written to {args.json}.")
+    sys.exit(0 if all(r.passed for r in results) and (verified is not False) else 1)
+
+if __name__ == "__main__":
+    main()
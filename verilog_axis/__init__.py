@@ -0,0 +1,54 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# LiteX wrappers around Alex Forencich Verilog-AXIS's cores.
+#
+# Wrappers are registered by name and their modules (and Migen/LiteX) only imported on first use,
+# so enumerating the available cores or using one of them does not import the others. No global
+# logging configuration is done: wrappers log through logging.getLogger(<Wrapper>), configuration
+# is left to the application (ex logging.basicConfig(level=logging.INFO)).
+
+import importlib
+
+# Wrappers Registry --------------------------------------------------------------------------------
+
+wrappers = {
+    # Name                Class.
+    "axis_adapter"      : "AXISAdapter",
+    "axis_arb_mux"      : "AXISArbMux",
+    "axis_async_fifo"   : "AXISAsyncFIFO",
+    "axis_auto_fifo"    : "AXISAutoFIFO",
+    "axis_broadcast"    : "AXISBroadcast",
+    "axis_crosspoint"   : "AXISCrosspoint",
+    "axis_demux"        : "AXISDemux",
+    "axis_fifo"         : "AXISFIFO",
+    "axis_mux"          : "AXISMux",
+    "axis_ram_switch"   : "AXISRAMSwitch",
+    "axis_rate_limit"   : "AXISRateLimit",
+    "axis_register"     : "AXISRegister",
+    "axis_srl_fifo"     : "AXISSRLFIFO",
+    "axis_srl_register" : "AXISSRLRegister",
+    "axis_stat_counter" : "AXISStatCounter",
+    "axis_switch"       : "AXISSwitch",
+    "axis_tap"          : "AXISTap",
+}
+
+def available():
+    return list(wrappers.keys())
+
+def get(name):
+    # Return the wrapper class of core name (ex get("axis_fifo") -> AXISFIFO), importing its module.
+    if name not in wrappers:
+        raise ValueError(f"Unknown core {name}, available: {', '.join(available())}.")
+    module = importlib.import_module(f"{__name__}.{name}")
+    return getattr(module, wrappers[name])
+
+def __getattr__(name):
+    # Lazy access to wrapper classes (ex verilog_axis.AXISFIFO).
+    for core, cls in wrappers.items():
+        if cls == name:
+            return get(core)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,20 +6,20 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_adapter.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Adapter -------------------------------------------------------------------------------------
 
-class AXISAdapter(Module):
-    def __init__(self, platform, s_axis, m_axis):
+class AXISAdapter(Module, AutoCSR):
+    def __init__(self, platform, s_axis, m_axis, with_csr=False):
         self.logger = logging.getLogger("AXISAdapter")
 
         # Get/Check Parameters.
@@ -27,25 +27,35 @@ class AXISAdapter(Module):
 
         # Clock Domain.
         clock_domain = s_axis.clock_domain
-        self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data widths.
         s_data_width = len(s_axis.data)
         m_data_width = len(m_axis.data)
-        self.logger.info(f"Slave  Data Width: {colorer(s_data_width)}")
-        self.logger.info(f"Master Data Width: {colorer(m_data_width)}")
 
         # ID width.
         id_width = s_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = s_axis.dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = s_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain"      : clock_domain,
+            "Slave  Data Width" : s_data_width,
+            "Master Data Width" : m_data_width,
+            "ID Width"          : id_width,
+            "Dest Width"        : dest_width,
+            "User Width"        : user_width,
+        })
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(s_axis=s_axis, m_axis=m_axis))
 
         # Module instance.
         # ----------------
@@ -96,5 +106,4 @@ class AXISAdapter(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_adapter.v"))
+        add_verilog_sources(platform, "axis_adapter")
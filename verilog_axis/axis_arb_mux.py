@@ -6,24 +6,26 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_arb_mux.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
+from litex.soc.interconnect.axi import AXIStreamInterface
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Arb Mux -------------------------------------------------------------------------------------
 
-class AXISArbMux(Module):
+class AXISArbMux(Module, AutoCSR):
     def __init__(self, platform, s_axis, m_axis,
         last_enable           = 1,
         update_tid            = 0,
         arb_type_round_robin  = 0,
         arb_lsb_high_priority = 1,
+        with_csr              = False,
     ):
         self.logger = logging.getLogger("AXISARBMux")
 
@@ -39,23 +41,33 @@ class AXISArbMux(Module):
 
         # Clock Domain.
         clock_domain = s_axis[0].clock_domain
-        self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis[0].data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
 
         # ID width.
         id_width = s_axis[0].id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = s_axis[0].dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = s_axis[0].user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(s_axis=s_axis, m_axis=m_axis))
 
         # Module instance.
         # ----------------
@@ -83,25 +95,25 @@ class AXISArbMux(Module):
 
             # AXI Inputs.
             # -----------
-            o_s_axis_tdata  = Cat(*[axis.data  for axis in s_axis]),
-            o_s_axis_tkeep  = Cat(*[axis.keep  for axis in s_axis]),
-            o_s_axis_tvalid = Cat(*[axis.valid for axis in s_axis]),
-            i_s_axis_tready = Cat(*[axis.ready for axis in s_axis]),
-            o_s_axis_tlast  = Cat(*[axis.last  for axis in s_axis]),
-            o_s_axis_tid    = Cat(*[axis.id    for axis in s_axis]),
-            o_s_axis_tdest  = Cat(*[axis.dest  for axis in s_axis]),
-            o_s_axis_tuser  = Cat(*[axis.user  for axis in s_axis]),
+            i_s_axis_tdata  = Cat(*[axis.data  for axis in s_axis]),
+            i_s_axis_tkeep  = Cat(*[axis.keep  for axis in s_axis]),
+            i_s_axis_tvalid = Cat(*[axis.valid for axis in s_axis]),
+            o_s_axis_tready = Cat(*[axis.ready for axis in s_axis]),
+            i_s_axis_tlast  = Cat(*[axis.last  for axis in s_axis]),
+            i_s_axis_tid    = Cat(*[axis.id    for axis in s_axis]),
+            i_s_axis_tdest  = Cat(*[axis.dest  for axis in s_axis]),
+            i_s_axis_tuser  = Cat(*[axis.user  for axis in s_axis]),
 
             # AXI Output.
             # -----------
-            i_m_axis_tdata  = m_axis.data,
-            i_m_axis_tkeep  = m_axis.keep,
-            i_m_axis_tvalid = m_axis.valid,
-            o_m_axis_tready = m_axis.ready,
-            i_m_axis_tlast  = m_axis.last,
-            i_m_axis_tid    = m_axis.id,
-            i_m_axis_tdest  = m_axis.dest,
-            i_m_axis_tuser  = m_axis.user,
+            o_m_axis_tdata  = m_axis.data,
+            o_m_axis_tkeep  = m_axis.keep,
+            o_m_axis_tvalid = m_axis.valid,
+            i_m_axis_tready = m_axis.ready,
+            o_m_axis_tlast  = m_axis.last,
+            o_m_axis_tid    = m_axis.id,
+            o_m_axis_tdest  = m_axis.dest,
+            o_m_axis_tuser  = m_axis.user,
         )
 
         # Add Sources.
@@ -110,7 +122,4 @@ class AXISArbMux(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "arbiter.v"))
-        platform.add_source(os.path.join(rtl_dir, "priority_encoder.v"))
-        platform.add_source(os.path.join(rtl_dir, "axis_arb_mux.v"))
+        add_verilog_sources(platform, "axis_arb_mux")
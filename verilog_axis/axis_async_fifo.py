@@ -6,63 +6,122 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_async_fifo.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Async FIFO ----------------------------------------------------------------------------------
 
-class AXISAsyncFIFO(Module):
+class AXISAsyncFIFO(Module, AutoCSR):
     def __init__(self, platform, s_axis, m_axis, depth=4096,
         last_enable          = 1,
-        pipeline_output      = 2, # FIXME: Add constants.
+        pipeline_output      = 2, # Number of output pipeline registers.
         frame_fifo           = 0,
         user_bad_frame_value = 1,
         user_bad_frame_mask  = 1,
         drop_bad_frame       = 0,
         drop_when_full       = 0,
+        almost_full          = None, # Almost Full threshold (default: 3/4 of depth).
+        almost_empty         = None, # Almost Empty threshold (default: 1/4 of depth).
+        adapt                = False,
+        with_csr             = False,
     ):
         self.logger = logging.getLogger("AXISAsyncFIFO")
+        depth       = axis_fifo_depth(self, depth) # Overridden in an AXISFIFODepths context.
 
         # Status.
         # -------
-        self.s_overflow   = Signal()
-        self.s_bad_frame  = Signal()
-        self.s_good_frame = Signal()
-        self.m_overflow   = Signal()
-        self.m_bad_frame  = Signal()
-        self.m_good_frame = Signal()
+        self.s_overflow   = Signal(name="s_overflow")
+        self.s_bad_frame  = Signal(name="s_bad_frame")
+        self.s_good_frame = Signal(name="s_good_frame")
+        self.m_overflow   = Signal(name="m_overflow")
+        self.m_bad_frame  = Signal(name="m_bad_frame")
+        self.m_good_frame = Signal(name="m_good_frame")
+
+        # Occupancy (in depth unit: bytes when tkeep is enabled, $clog2(DEPTH)+1 bits as axis_async_fifo),
+        # seen from each clock domain.
+        level_width = log2_int(depth, need_pow2=False) + 1
+        self.s_level        = Signal(level_width, name="s_level")        # Current (Slave).
+        self.s_level_commit = Signal(level_width, name="s_level_commit") # Committed (Slave, Frame FIFO).
+        self.m_level        = Signal(level_width, name="m_level")        # Current (Master).
+        self.m_level_commit = Signal(level_width, name="m_level_commit") # Committed (Master, Frame FIFO).
+        self.peak           = Signal(level_width, name="peak")           # High-water mark (Slave).
+        self.almost_full    = Signal(name="almost_full")                 # s_level >= almost_full_level (Slave).
+        self.almost_empty   = Signal(name="almost_empty")                # m_level <= almost_empty_level (Master).
+
+        # Control.
+        # --------
+        self.almost_full_level  = Signal(level_width, reset=(3*depth)//4 if almost_full  is None else almost_full)  # Slave.
+        self.almost_empty_level = Signal(level_width, reset=depth//4     if almost_empty is None else almost_empty) # Master.
+        self.peak_clear         = Signal()                                                                          # Slave.
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(
+                ports  = axis_statistics_ports(s_axis=s_axis, m_axis=m_axis),
+                events = {
+                    "s_overflow"   : (self.s_overflow, s_axis.clock_domain),
+                    "s_bad_frame"  : (self.s_bad_frame, s_axis.clock_domain),
+                    "s_good_frame" : (self.s_good_frame, s_axis.clock_domain),
+                    "m_overflow"   : (self.m_overflow, m_axis.clock_domain),
+                    "m_bad_frame"  : (self.m_bad_frame, m_axis.clock_domain),
+                    "m_good_frame" : (self.m_good_frame, m_axis.clock_domain),
+                },
+                gauges = {
+                    "s_level" : (self.s_level, s_axis.clock_domain),
+                    "m_level" : (self.m_level, m_axis.clock_domain),
+                    "peak"    : (self.peak,    s_axis.clock_domain),
+                },
+            )
 
         # Get/Check Parameters.
         # ---------------------
 
+        # Width Adaptation (Optional, AXISAdapter on the narrower side, see axis_adapt).
+        if adapt and (len(s_axis.data) != len(m_axis.data)):
+            s_axis, m_axis = axis_adapt(self, platform, s_axis, m_axis, adapt)
+
         # Clock Domains.
         s_clock_domain = s_axis.clock_domain
         m_clock_domain = m_axis.clock_domain
-        self.logger.info(f"Slave  Clock Domain: {colorer(s_clock_domain)}")
-        self.logger.info(f"Master Clock Domain: {colorer(m_clock_domain)}")
 
         # Data width.
         data_width = len(s_axis.data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
+        if len(m_axis.data) != data_width:
+            self.logger.error("{} on {} (Slave: {} / Master: {}), should be {}.".format(
+                colorer("Different Data Width", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(data_width),
+                colorer(len(m_axis.data)),
+                colorer("the same")))
+            raise AXIError()
 
         # ID width.
         id_width = s_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = s_axis.dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = s_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Slave  Clock Domain" : s_clock_domain,
+            "Master Clock Domain" : m_clock_domain,
+            "Data Width"          : data_width,
+            "ID Width"            : id_width,
+            "Dest Width"          : dest_width,
+            "User Width"          : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -88,12 +147,16 @@ class AXISAsyncFIFO(Module):
 
             # Status.
             # -------
-            o_s_status_overflow   = self.s_overflow,
-            o_s_status_bad_frame  = self.s_bad_frame,
-            o_s_status_good_frame = self.s_good_frame,
-            o_m_status_overflow   = self.m_overflow,
-            o_m_status_bad_frame  = self.m_bad_frame,
-            o_m_status_good_frame = self.m_good_frame,
+            o_s_status_depth        = self.s_level,
+            o_s_status_depth_commit = self.s_level_commit,
+            o_s_status_overflow     = self.s_overflow,
+            o_s_status_bad_frame    = self.s_bad_frame,
+            o_s_status_good_frame   = self.s_good_frame,
+            o_m_status_depth        = self.m_level,
+            o_m_status_depth_commit = self.m_level_commit,
+            o_m_status_overflow     = self.m_overflow,
+            o_m_status_bad_frame    = self.m_bad_frame,
+            o_m_status_good_frame   = self.m_good_frame,
 
             # AXI Input.
             # ----------
@@ -122,11 +185,19 @@ class AXISAsyncFIFO(Module):
             o_m_axis_tuser  = m_axis.user,
         )
 
+        # Occupancy Flags/Peak.
+        # ---------------------
+        self.comb += [
+            self.almost_full.eq(self.s_level  >= self.almost_full_level),
+            self.almost_empty.eq(self.m_level <= self.almost_empty_level),
+        ]
+        s_sync = getattr(self.sync, s_clock_domain)
+        s_sync += If(self.peak_clear | (self.s_level > self.peak), self.peak.eq(self.s_level))
+
         # Add Sources.
         # ------------
         self.add_sources(platform)
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_async_fifo.v"))
+        add_verilog_sources(platform, "axis_async_fifo")
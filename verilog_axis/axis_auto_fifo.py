@@ -0,0 +1,116 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# LiteX FIFO front-end selecting between Alex Forencich Verilog-AXIS's axis_srl_fifo.v and
+# axis_fifo.v (Distributed or Block RAM) from the depth/data width and a resource/Fmax profile.
+
+import math
+
+from migen import *
+
+from litex.soc.interconnect.csr import AutoCSR
+
+from verilog_axis.axis_common import *
+from verilog_axis.axis_fifo import AXISFIFO
+from verilog_axis.axis_srl_fifo import AXISSRLFIFO
+
+# AXIS Auto FIFO Profiles --------------------------------------------------------------------------
+
+# Selection thresholds of each profile:
+# - srl_max_depth/srl_max_width : SRL FIFO up to this depth/data width (the shift enable and output
+#   mux fan out to depth x data_width SRLs and limit Fmax on wide FIFOs).
+# - dist_max_depth/dist_max_bits: Distributed RAM FIFO up to this depth/size (depth x data_width
+#   bits, memories below these thresholds are inferred as LUTRAM), Block RAM FIFO above.
+# "balanced" is the default, "bram" saves Block RAMs (LUTRAM used on larger buffers) and "fmax"
+# favors timing (narrower SRLs, smaller LUTRAMs).
+
+axis_auto_fifo_profiles = {
+    # Profile    SRL Max Depth/Width                Distributed RAM Max Depth/Bits.
+    "balanced" : dict(srl_max_depth=16, srl_max_width=128, dist_max_depth=64,  dist_max_bits=4096),
+    "bram"     : dict(srl_max_depth=16, srl_max_width=256, dist_max_depth=256, dist_max_bits=16384),
+    "fmax"     : dict(srl_max_depth=16, srl_max_width=64,  dist_max_depth=32,  dist_max_bits=2048),
+}
+
+# AXISFIFO parameters only supported by the axis_fifo implementations (SRL FIFO excluded when set).
+_axis_fifo_only_parameters = [
+    "frame_fifo",
+    "drop_oversize_frame",
+    "drop_bad_frame",
+    "drop_when_full",
+]
+
+def axis_auto_fifo_select(depth, data_width, profile="balanced", srl=True):
+    # Return (implementation, depth) with implementation in "srl", "distributed" or "block" and the
+    # depth (in beats) rounded as implemented (SRL: as requested, RAM: next power of 2).
+    if profile not in axis_auto_fifo_profiles:
+        raise ValueError(f"Unknown profile {profile}, available: {', '.join(axis_auto_fifo_profiles.keys())}.")
+    p = axis_auto_fifo_profiles[profile]
+    if srl and (depth <= p["srl_max_depth"]) and (data_width <= p["srl_max_width"]):
+        return "srl", depth
+    depth = 2**math.ceil(math.log2(max(depth, 2)))
+    if (depth <= p["dist_max_depth"]) and (depth*data_width <= p["dist_max_bits"]):
+        return "distributed", depth
+    return "block", depth
+
+# AXIS Auto FIFO -----------------------------------------------------------------------------------
+
+class AXISAutoFIFO(Module, AutoCSR):
+    def __init__(self, platform, s_axis, m_axis, depth=16, profile="balanced",
+        last_enable = 1,
+        cdc         = False,
+        adapt       = False,
+        with_csr    = False,
+        **kwargs, # AXISFIFO parameters (frame_fifo, drop_when_full, etc...).
+    ):
+        self.logger = logging.getLogger("AXISAutoFIFO")
+        depth       = axis_fifo_depth(self, depth) # Overridden in an AXISFIFODepths context.
+
+        # Get/Check Parameters.
+        # ---------------------
+
+        # Data width (Core: widest interface when adapted, see axis_adapt).
+        data_width = len(s_axis.data)
+        if adapt:
+            data_width = max(data_width, len(m_axis.data))
+
+        # Implementation.
+        srl = not any(kwargs.get(k, 0) for k in _axis_fifo_only_parameters)
+        impl, impl_depth = axis_auto_fifo_select(depth, data_width, profile, srl=srl)
+        self.impl  = impl
+        self.depth = impl_depth
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Profile"        : profile,
+            "Data Width"     : data_width,
+            "Depth"          : f"{depth} -> {impl_depth}",
+            "Implementation" : impl,
+        })
+
+        # FIFO.
+        # -----
+        if impl == "srl":
+            self.submodules.fifo = AXISSRLFIFO(platform, s_axis, m_axis,
+                depth       = impl_depth,
+                last_enable = last_enable,
+                cdc         = cdc,
+                adapt       = adapt,
+                with_csr    = with_csr,
+            )
+        else:
+            # axis_fifo's DEPTH is in bytes when tkeep is enabled (data_width > 8), 1 output register
+            # is enough for LUTRAM (asynchronous read), 2 for Block RAM (output register).
+            keep_width = math.ceil(data_width/8) if data_width > 8 else 1
+            self.submodules.fifo = AXISFIFO(platform, s_axis, m_axis,
+                depth           = impl_depth*keep_width,
+                last_enable     = last_enable,
+                pipeline_output = kwargs.pop("pipeline_output", {"distributed": 1, "block": 2}[impl]),
+                cdc             = cdc,
+                adapt           = adapt,
+                with_csr        = with_csr,
+                **kwargs
+            )
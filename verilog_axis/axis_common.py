@@ -5,18 +5,19 @@
 # SPDX-License-Identifier: BSD-2-Clause
 
 import sys
+import math
 import logging
 
 from enum import IntEnum
 
 from migen import *
 
-logging.basicConfig(level=logging.INFO)
-
 # Helpers ------------------------------------------------------------------------------------------
 
 class Open(Signal): pass
 
+class AXIError(Exception): pass
+
 def colorer(s, color="bright"):
     header  = {
         "bright": "\x1b[1m",
@@ -27,3 +28,220 @@ def colorer(s, color="bright"):
         "underline": "\x1b[4m"}[color]
     trailer = "\x1b[0m"
     return header + str(s) + trailer
+
+# Register Types -----------------------------------------------------------------------------------
+
+# Register slice types of axis_register.v (REG_TYPE) and axis_switch.v (S_REG_TYPE/M_REG_TYPE).
+
+class AXISRegType(IntEnum):
+    BYPASS = 0 # No register (combinational).
+    SIMPLE = 1 # Simple register (data/ready registered, inserts bubble cycles).
+    SKID   = 2 # Skid buffer (data/ready registered, full throughput).
+
+# Parameters Report --------------------------------------------------------------------------------
+
+# Wrappers report their derived parameters once (report_parameters) instead of emitting one log line
+# per parameter: outside of an AXISElaborationReport, they are logged (formatted only when INFO is
+# enabled for the wrapper logger); inside, they are collected in the report (no per-instance log).
+
+_elaboration_reports = []
+
+class AXISElaborationReport:
+    def __init__(self):
+        self.entries = {} # (Wrapper, Parameters) -> Count.
+
+    def add(self, wrapper, parameters, count=1):
+        key = (wrapper, tuple(parameters.items()))
+        self.entries[key] = self.entries.get(key, 0) + count
+
+    def __enter__(self):
+        _elaboration_reports.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _elaboration_reports.remove(self)
+
+    def __len__(self):
+        return sum(self.entries.values())
+
+    def as_list(self):
+        return [{"wrapper": wrapper, "count": count, "parameters": dict(parameters)}
+            for (wrapper, parameters), count in self.entries.items()]
+
+    def __str__(self):
+        r = []
+        for (wrapper, parameters), count in self.entries.items():
+            r.append(f"{colorer(wrapper)} x{count}: " + ", ".join(f"{k}: {v}" for k, v in parameters))
+        return "\n".join(r)
+
+def report_parameters(wrapper, parameters):
+    wrapper.parameters = parameters
+    if len(_elaboration_reports):
+        _elaboration_reports[-1].add(wrapper.logger.name, parameters)
+    elif wrapper.logger.isEnabledFor(logging.INFO):
+        for name, value in parameters.items():
+            wrapper.logger.info(f"{name}: {colorer(value)}")
+
+# FIFO Depths --------------------------------------------------------------------------------------
+
+# FIFO wrappers (AXISFIFO, AXISAsyncFIFO, AXISSRLFIFO, AXISAutoFIFO) get their depth from
+# axis_fifo_depth: outside of an AXISFIFODepths context, it is their depth parameter; inside, FIFOs
+# are numbered in construction order (deterministic for a given design) and the n-th FIFO is
+# constructed with depths[n] when present (ex tuned depths from tune_axis.py), everything derived
+# from depth (occupancy widths, thresholds, implementation) following the overridden depth.
+
+_fifo_depths = []
+
+class AXISFIFODepths:
+    def __init__(self, depths={}):
+        self.depths = depths # FIFO index -> Depth.
+        self.fifos  = []     # Constructed FIFOs (construction order).
+
+    def __enter__(self):
+        _fifo_depths.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _fifo_depths.remove(self)
+
+    def index(self, fifo):
+        for n, f in enumerate(self.fifos):
+            if f is fifo:
+                return n
+        raise ValueError(f"{type(fifo).__name__} not constructed in this context.")
+
+def axis_fifo_depth(fifo, depth):
+    if len(_fifo_depths) == 0:
+        return depth
+    context = _fifo_depths[-1]
+    context.fifos.append(fifo)
+    return context.depths.get(len(context.fifos) - 1, depth)
+
+# Clock Domain Crossing ----------------------------------------------------------------------------
+
+# Opt-in automatic CDC (cdc parameter of the single clock domain wrappers): when s_axis/m_axis are
+# on different clock domains, an AXISAsyncFIFO is inserted on the wrapper's side (s or m) and the
+# core runs in the clock domain of the other side. cdc is True or a dict with:
+# - depth      : AXISAsyncFIFO depth (default: axis_cdc_depth from the other parameters).
+# - burst      : Expected burst size (beats) written at full rate.
+# - s_clk_freq : s_axis clock frequency.
+# - m_clk_freq : m_axis clock frequency.
+
+AXIS_CDC_SYNC_MARGIN = 16 # Entries covering the pointers synchronization latency (full throughput).
+
+def axis_cdc_depth(burst=256, s_clk_freq=None, m_clk_freq=None):
+    # Entries accumulated while a burst is written at full rate and read at the (slower) m clock rate
+    # (whole burst when the clock ratio is unknown), plus the synchronization margin, rounded up to a
+    # power of 2.
+    if (s_clk_freq is None) or (m_clk_freq is None):
+        accumulated = burst
+    else:
+        accumulated = math.ceil(burst*max(0, 1 - m_clk_freq/s_clk_freq))
+    return 2**math.ceil(math.log2(accumulated + AXIS_CDC_SYNC_MARGIN))
+
+def axis_cdc(module, platform, s_axis, m_axis, cdc, side="m"):
+    from litex.soc.interconnect.axi import AXIStreamInterface
+    from verilog_axis.axis_async_fifo import AXISAsyncFIFO
+    assert side in ["s", "m"]
+    cdc   = {} if cdc is True else cdc
+    depth = cdc.get("depth", None) or axis_cdc_depth(
+        burst      = cdc.get("burst", 256),
+        s_clk_freq = cdc.get("s_clk_freq", None),
+        m_clk_freq = cdc.get("m_clk_freq", None),
+    )
+
+    # Interface between the core and the CDC, in the core's clock domain.
+    axis = AXIStreamInterface(
+        data_width   = len(s_axis.data),
+        keep_width   = len(s_axis.keep),
+        id_width     = s_axis.id_width,
+        dest_width   = s_axis.dest_width,
+        user_width   = s_axis.user_width,
+        clock_domain = (m_axis if side == "s" else s_axis).clock_domain,
+        name         = "cdc_axis",
+    )
+    module.logger.info("CDC: {} (Depth: {}) on {} side ({} -> {}).".format(
+        colorer("AXISAsyncFIFO"),
+        colorer(depth),
+        colorer({"s": "Slave", "m": "Master"}[side]),
+        colorer(s_axis.clock_domain),
+        colorer(m_axis.clock_domain)))
+    if side == "s":
+        module.submodules.cdc = AXISAsyncFIFO(platform, s_axis, axis, depth=depth)
+        return axis, m_axis
+    else:
+        module.submodules.cdc = AXISAsyncFIFO(platform, axis, m_axis, depth=depth)
+        return s_axis, axis
+
+# Width Adaptation ---------------------------------------------------------------------------------
+
+# Opt-in automatic width adaptation (adapt parameter of the wrappers): when the interfaces data
+# widths differ, an AXISAdapter is inserted on each interface narrower/wider than the core. The core
+# runs at the widest data width (to keep its per-cycle throughput: upsizing before the core,
+# downsizing after it), unless the clock ratio does not allow downsizing after it: when the Master
+# side can not sustain the Slave side bandwidth and a core at the Master data width (downsizing
+# before it, in the Slave clock domain) still sustains the Master side bandwidth, the core runs at
+# the Master data width (same sustained bandwidth, narrower core). adapt is True or a dict with
+# s_clk_freq/m_clk_freq (bandwidths compared in bits/cycle when both are unknown, widest core when
+# only one is known), the sustained bandwidth of each side is logged and a warning is emitted when
+# the Master side can not sustain the Slave side bandwidth.
+
+def _axis_bandwidth(width, clk_freq):
+    return f"{width} bits/cycle" if clk_freq is None else f"{width*clk_freq/1e9:.2f} Gbps"
+
+def axis_adapt(module, platform, s_axis, m_axis, adapt):
+    from litex.soc.interconnect.axi import AXIStreamInterface
+    from verilog_axis.axis_adapter import AXISAdapter
+    adapt      = {} if adapt is True else adapt
+    s_list     = s_axis if isinstance(s_axis, list) else [s_axis]
+    m_list     = m_axis if isinstance(m_axis, list) else [m_axis]
+    s_clk_freq = adapt.get("s_clk_freq", None)
+    m_clk_freq = adapt.get("m_clk_freq", None)
+    s_width    = sum(len(axis.data) for axis in s_list)
+    m_width    = sum(len(axis.data) for axis in m_list)
+
+    # Core data width (see above).
+    data_width = max(len(axis.data) for axis in s_list + m_list)
+    bottleneck = False
+    if (s_clk_freq is None) == (m_clk_freq is None):
+        m_data_width = max(len(axis.data) for axis in m_list)
+        s_bandwidth  = s_width*(s_clk_freq or 1)
+        m_bandwidth  = m_width*(m_clk_freq or 1)
+        n_bandwidth  = sum(min(len(axis.data), m_data_width) for axis in s_list)*(s_clk_freq or 1)
+        bottleneck   = m_bandwidth < s_bandwidth
+        if bottleneck and (n_bandwidth >= m_bandwidth):
+            data_width = m_data_width
+
+    def adapted(axis, side):
+        if len(axis.data) == data_width:
+            return axis
+        core_axis = AXIStreamInterface(
+            data_width   = data_width,
+            id_width     = axis.id_width,
+            dest_width   = axis.dest_width,
+            user_width   = axis.user_width,
+            clock_domain = axis.clock_domain,
+            name         = "adapt_axis",
+        )
+        if side == "s":
+            module.submodules += AXISAdapter(platform, axis, core_axis)
+        else:
+            module.submodules += AXISAdapter(platform, core_axis, axis)
+        return core_axis
+
+    # Bandwidth report.
+    module.logger.info("Width Adaptation: {} (Slave: {} / Master: {}).".format(
+        colorer(f"{data_width}-bit core"),
+        colorer(_axis_bandwidth(s_width, s_clk_freq)),
+        colorer(_axis_bandwidth(m_width, m_clk_freq))))
+    if bottleneck:
+        module.logger.warning("{}: Master side limits sustained bandwidth to {}.".format(
+            colorer("Width Adaptation", color="yellow"),
+            colorer(_axis_bandwidth(m_width, m_clk_freq))))
+
+    s_core = [adapted(axis, "s") for axis in s_list]
+    m_core = [adapted(axis, "m") for axis in m_list]
+    return (
+        s_core if isinstance(s_axis, list) else s_core[0],
+        m_core if isinstance(m_axis, list) else m_core[0],
+    )
@@ -6,20 +6,21 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_demux.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
+from litex.soc.interconnect.axi import AXIStreamInterface
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Demux ---------------------------------------------------------------------------------------
 
-class AXISDemux(Module):
-    def __init__(self, platform, s_axis, m_axis, tdest_route=0):
+class AXISDemux(Module, AutoCSR):
+    def __init__(self, platform, s_axis, m_axis, tdest_route=0, with_csr=False):
         self.logger = logging.getLogger("AXISDemux")
 
         # FIXME: Add Logs/Checks.
@@ -33,29 +34,39 @@ class AXISDemux(Module):
 
         # Clock Domain.
         clock_domain = s_axis.clock_domain
-        self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis.data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
 
         # ID width.
         id_width = s_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
-        # Dest width.
-        dest_width = s_axis.data_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
+        # Dest width (Master, Slave Dest includes port selection in MSBs).
+        dest_width = m_axis[0].dest_width
 
         # User width.
         user_width = s_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
 
         # Controls.
         # ---------
-        self.enable = Signal(reset=1)
-        self.drop   = Signal()
-        self.select = Signal(max=len(m_axis))
+        self.enable = Signal(reset=1, name="enable")
+        self.drop   = Signal(name="drop")
+        self.select = Signal(max=len(m_axis), name="select")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(s_axis=s_axis, m_axis=m_axis))
 
         # Module instance.
         # ----------------
@@ -113,5 +124,4 @@ class AXISDemux(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_demux.v"))
+        add_verilog_sources(platform, "axis_demux")
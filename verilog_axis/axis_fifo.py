@@ -6,40 +6,84 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_fifo.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS FIFO ----------------------------------------------------------------------------------------
 
-class AXISFIFO(Module):
+class AXISFIFO(Module, AutoCSR):
     def __init__(self, platform, s_axis, m_axis, depth=4096,
         last_enable          = 1,
-        pipeline_output      = 2, # FIXME: Add constants.
+        pipeline_output      = 2, # Number of output pipeline registers.
         frame_fifo           = 0,
         user_bad_frame_value = 1,
         user_bad_frame_mask  = 1,
         drop_oversize_frame  = 0,
         drop_bad_frame       = 0,
         drop_when_full       = 0,
+        almost_full          = None, # Almost Full threshold (default: 3/4 of depth).
+        almost_empty         = None, # Almost Empty threshold (default: 1/4 of depth).
+        cdc                  = False,
+        adapt                = False,
+        with_csr             = False,
     ):
         self.logger = logging.getLogger("AXISFIFO")
+        depth       = axis_fifo_depth(self, depth) # Overridden in an AXISFIFODepths context.
 
         # Status.
         # -------
-        self.overflow   = Signal()
-        self.bad_frame  = Signal()
-        self.good_frame = Signal()
+        self.overflow   = Signal(name="overflow")
+        self.bad_frame  = Signal(name="bad_frame")
+        self.good_frame = Signal(name="good_frame")
+
+        # Occupancy (in depth unit: bytes when tkeep is enabled, $clog2(DEPTH)+1 bits as axis_fifo).
+        level_width = log2_int(depth, need_pow2=False) + 1
+        self.level        = Signal(level_width, name="level")        # Current.
+        self.level_commit = Signal(level_width, name="level_commit") # Committed (Frame FIFO).
+        self.peak         = Signal(level_width, name="peak")         # High-water mark.
+        self.almost_full  = Signal(name="almost_full")               # level >= almost_full_level.
+        self.almost_empty = Signal(name="almost_empty")              # level <= almost_empty_level.
+
+        # Control.
+        # --------
+        self.almost_full_level  = Signal(level_width, reset=(3*depth)//4 if almost_full  is None else almost_full)
+        self.almost_empty_level = Signal(level_width, reset=depth//4     if almost_empty is None else almost_empty)
+        self.peak_clear         = Signal()
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(
+                ports  = axis_statistics_ports(s_axis=s_axis, m_axis=m_axis),
+                events = {
+                    "overflow"   : (self.overflow, s_axis.clock_domain),
+                    "bad_frame"  : (self.bad_frame, s_axis.clock_domain),
+                    "good_frame" : (self.good_frame, s_axis.clock_domain),
+                },
+                gauges = {
+                    "level" : (self.level, s_axis.clock_domain),
+                    "peak"  : (self.peak,  s_axis.clock_domain),
+                },
+            )
 
         # Get/Check Parameters.
         # ---------------------
 
+        # Width Adaptation (Optional, AXISAdapter on the narrower side, see axis_adapt).
+        if adapt and (len(s_axis.data) != len(m_axis.data)):
+            s_axis, m_axis = axis_adapt(self, platform, s_axis, m_axis, adapt)
+
+        # Clock Domain Crossing (Optional, AXISAsyncFIFO on Master side, see axis_cdc).
+        if cdc and (s_axis.clock_domain != m_axis.clock_domain):
+            s_axis, m_axis = axis_cdc(self, platform, s_axis, m_axis, cdc, side="m")
+
         # Clock Domain.
         clock_domain = s_axis.clock_domain
         if s_axis.clock_domain != m_axis.clock_domain:
@@ -50,24 +94,36 @@ class AXISFIFO(Module):
                 colorer(m_axis.clock_domain),
                 colorer("the same")))
             raise AXIError()
-        else:
-            self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis.data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
+        if len(m_axis.data) != data_width:
+            self.logger.error("{} on {} (Slave: {} / Master: {}), should be {}.".format(
+                colorer("Different Data Width", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(data_width),
+                colorer(len(m_axis.data)),
+                colorer("the same")))
+            raise AXIError()
 
         # ID width.
         id_width = s_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = s_axis.dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = s_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -99,9 +155,11 @@ class AXISFIFO(Module):
 
             # Status.
             # -------
-            o_status_overflow   = self.overflow,
-            o_status_bad_frame  = self.bad_frame,
-            o_status_good_frame = self.good_frame,
+            o_status_depth        = self.level,
+            o_status_depth_commit = self.level_commit,
+            o_status_overflow     = self.overflow,
+            o_status_bad_frame    = self.bad_frame,
+            o_status_good_frame   = self.good_frame,
 
             # AXI Input.
             # ----------
@@ -126,11 +184,19 @@ class AXISFIFO(Module):
             o_m_axis_tuser  = m_axis.user,
         )
 
+        # Occupancy Flags/Peak.
+        # ---------------------
+        self.comb += [
+            self.almost_full.eq(self.level  >= self.almost_full_level),
+            self.almost_empty.eq(self.level <= self.almost_empty_level),
+        ]
+        sync = getattr(self.sync, clock_domain)
+        sync += If(self.peak_clear | (self.level > self.peak), self.peak.eq(self.level))
+
         # Add Sources.
         # ------------
         self.add_sources(platform)
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_fifo.v"))
+        add_verilog_sources(platform, "axis_fifo")
@@ -6,20 +6,21 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_mux.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
+from litex.soc.interconnect.axi import AXIStreamInterface
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Mux -----------------------------------------------------------------------------------------
 
-class AXISMux(Module):
-    def __init__(self, platform, s_axis, m_axis):
+class AXISMux(Module, AutoCSR):
+    def __init__(self, platform, s_axis, m_axis, with_csr=False):
         self.logger = logging.getLogger("AXISMux")
 
         # FIXME: Add Logs/Checks.
@@ -33,28 +34,38 @@ class AXISMux(Module):
 
         # Clock Domain.
         clock_domain = s_axis[0].clock_domain
-        self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis[0].data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
 
         # ID width.
         id_width = s_axis[0].id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
-        dest_width = s_axis[0].data_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
+        dest_width = s_axis[0].dest_width
 
         # User width.
         user_width = s_axis[0].user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
 
         # Controls.
         # ---------
-        self.enable = Signal(reset=1)
-        self.select = Signal(max=len(s_axis))
+        self.enable = Signal(reset=1, name="enable")
+        self.select = Signal(max=len(s_axis), name="select")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(s_axis=s_axis, m_axis=m_axis))
 
         # Module instance.
         # ----------------
@@ -110,5 +121,4 @@ class AXISMux(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_mux.v"))
+        add_verilog_sources(platform, "axis_mux")
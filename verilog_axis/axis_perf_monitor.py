@@ -0,0 +1,187 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Native passive AXI-Stream performance monitor (bandwidth/backpressure/starvation sampling).
+
+from migen import *
+from migen.genlib.cdc import MultiReg, PulseSynchronizer
+
+from litex.soc.interconnect.csr import *
+
+from verilog_axis.axis_common import *
+
+# AXIS Perf Monitor --------------------------------------------------------------------------------
+
+# Attached to any AXI-Stream interface (only observed, ready is never driven), in its clock domain.
+# Every window cycles, a sample of the window is recorded:
+# - beats    : valid & ready cycles (bandwidth = beats*data_width/window*clk_freq).
+# - stalls   : valid & ~ready cycles (backpressure ratio = stalls/window).
+# - idles    : ~valid & ready cycles (starvation ratio = idles/window).
+# - max_stall: Longest run of consecutive stall cycles ending in the window.
+# Samples are stored in a ring buffer of depth entries (in sys clock domain, the oldest sample is
+# overwritten when full and counted in overwrites) drained by software: level gives the number of
+# samples available, sample_* the oldest one, writing control.next drops it (pop signal from the
+# logic). Along a chain of cores, the hop limiting the throughput is the one whose input shows
+# backpressure while its output shows starvation.
+# Samples of other clock domains than sys are transferred through a PulseSynchronizer: window must
+# be a few cycles longer than the synchronization (>= 8 cycles).
+
+class AXISPerfMonitor(Module, AutoCSR):
+    def __init__(self, axis, window=1024, depth=16, width=32):
+        assert window >= 8
+        self.logger = logging.getLogger("AXISPerfMonitor")
+        self.pop = Signal()
+
+        self.control    = CSRStorage(fields=[
+            CSRField("enable", size=1, offset=0, reset=1, description="Enable sampling."),
+            CSRField("next",   size=1, offset=1, pulse=True, description="Drop the oldest sample."),
+        ])
+        self.window     = CSRStorage(width, reset=window, description="Sampling window (cycles).")
+        self.level      = CSRStatus(bits_for(depth), description="Samples available.")
+        self.overwrites = CSRStatus(width, description="Samples overwritten (buffer full).")
+        self.sample_beats     = CSRStatus(width)
+        self.sample_stalls    = CSRStatus(width)
+        self.sample_idles     = CSRStatus(width)
+        self.sample_max_stall = CSRStatus(width)
+
+        # # #
+
+        # Parameters Report.
+        # ------------------
+        clock_domain = axis.clock_domain
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : len(axis.data),
+            "Window"       : window,
+            "Depth"        : depth,
+        })
+
+        # Sampling (Interface clock domain).
+        # ----------------------------------
+        sync = getattr(self.sync, clock_domain)
+
+        # Configuration (Quasi-static).
+        enable       = Signal()
+        window_value = Signal(width)
+        if clock_domain == "sys":
+            self.comb += [
+                enable.eq(self.control.fields.enable),
+                window_value.eq(self.window.storage),
+            ]
+        else:
+            self.specials += [
+                MultiReg(self.control.fields.enable, enable, clock_domain),
+                MultiReg(self.window.storage, window_value, clock_domain),
+            ]
+
+        # Window.
+        timer = Signal(width)
+        done  = Signal()
+        self.comb += done.eq(enable & (timer >= (window_value - 1)))
+        sync += If(~enable | done, timer.eq(0)).Else(timer.eq(timer + 1))
+
+        # Counters.
+        beats     = Signal(width)
+        stalls    = Signal(width)
+        idles     = Signal(width)
+        stall_run = Signal(width)
+        max_stall = Signal(width)
+        beat      = axis.valid &  axis.ready
+        stall     = axis.valid & ~axis.ready
+        idle      = ~axis.valid & axis.ready
+        stall_run_next = Signal(width)
+        self.comb += [
+            stall_run_next.eq(0),
+            If(stall,
+                stall_run_next.eq(stall_run + (stall_run != (2**width - 1)))
+            )
+        ]
+        sync += [
+            stall_run.eq(stall_run_next),
+            If(done | ~enable,
+                beats.eq(0),
+                stalls.eq(0),
+                idles.eq(0),
+                max_stall.eq(0),
+            ).Else(
+                beats.eq(beats   + beat),
+                stalls.eq(stalls + stall),
+                idles.eq(idles   + idle),
+                If(stall_run_next > max_stall,
+                    max_stall.eq(stall_run_next)
+                )
+            )
+        ]
+
+        # Sample (Held until the end of the next window).
+        sample = Record([("beats", width), ("stalls", width), ("idles", width), ("max_stall", width)])
+        sync += If(done,
+            sample.beats.eq(beats   + beat),
+            sample.stalls.eq(stalls + stall),
+            sample.idles.eq(idles   + idle),
+            sample.max_stall.eq(Mux(stall_run_next > max_stall, stall_run_next, max_stall)),
+        )
+
+        # Sample valid (sys clock domain, one cycle after sample update).
+        sample_valid = Signal()
+        if clock_domain == "sys":
+            self.sync += sample_valid.eq(done)
+        else:
+            sample_ps = PulseSynchronizer(clock_domain, "sys")
+            self.submodules += sample_ps
+            self.comb += sample_ps.i.eq(done)
+            self.sync += sample_valid.eq(sample_ps.o)
+
+        # Ring Buffer (sys clock domain).
+        # -------------------------------
+        mem     = Memory(len(sample), depth)
+        wr_port = mem.get_port(write_capable=True)
+        rd_port = mem.get_port(async_read=True)
+        self.specials += mem, wr_port, rd_port
+
+        wr_ptr = Signal(max=depth)
+        rd_ptr = Signal(max=depth)
+        level  = Signal(max=depth + 1)
+        pop    = Signal()
+        full   = Signal()
+        self.comb += [
+            pop.eq((self.control.fields.next | self.pop) & (level != 0)),
+            full.eq(level == depth),
+            wr_port.adr.eq(wr_ptr),
+            wr_port.dat_w.eq(sample.raw_bits()),
+            wr_port.we.eq(sample_valid),
+            rd_port.adr.eq(rd_ptr),
+        ]
+
+        def incr(ptr):
+            return If(ptr == (depth - 1), ptr.eq(0)).Else(ptr.eq(ptr + 1))
+
+        self.sync += [
+            If(sample_valid,
+                incr(wr_ptr),
+                If(full | pop, incr(rd_ptr)),
+                # Full: Oldest sample overwritten (unless popped).
+                If(full & ~pop,
+                    self.overwrites.status.eq(self.overwrites.status + 1)
+                ).Else(
+                    level.eq(level + 1 - pop)
+                )
+            ).Elif(pop,
+                incr(rd_ptr),
+                level.eq(level - 1)
+            )
+        ]
+
+        # Oldest sample.
+        head = Record(sample.layout)
+        self.comb += [
+            head.raw_bits().eq(rd_port.dat_r),
+            self.level.status.eq(level),
+            self.sample_beats.status.eq(head.beats),
+            self.sample_stalls.status.eq(head.stalls),
+            self.sample_idles.status.eq(head.idles),
+            self.sample_max_stall.status.eq(head.max_stall),
+        ]
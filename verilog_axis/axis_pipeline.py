@@ -0,0 +1,266 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Timing-driven pipeline register planner: walks a graph of AXIS cores (nodes) connected by
+# AXI-Stream interfaces (edges), estimates the logic depth/fanout of each combinational segment from
+# the cores data width/port count and selects the register slices (AXISSwitch's S/M registers or
+# AXISRegisters inserted on the edges) needed to reach a target clock frequency.
+
+import math
+
+from migen import *
+
+from verilog_axis.axis_common import *
+
+# Timing Model -------------------------------------------------------------------------------------
+
+# Coarse LUT6 based model (defaults roughly matching a 7-Series -1/-2 device): a segment of levels
+# LUTs with a maximum fanout fanout has a delay of:
+#   t_cq + levels*(t_lut + t_net) + t_fanout*log2(fanout/fanout_free) + t_setup
+# Only intended to rank/break segments early, not to replace a timing analysis.
+
+class AXISTimingModel:
+    def __init__(self, t_cq=0.45, t_setup=0.10, t_lut=0.12, t_net=0.45, t_fanout=0.15, fanout_free=16):
+        self.t_cq        = t_cq
+        self.t_setup     = t_setup
+        self.t_lut       = t_lut
+        self.t_net       = t_net
+        self.t_fanout    = t_fanout
+        self.fanout_free = fanout_free
+
+    def delay(self, levels, fanout=1):
+        t = self.t_cq + self.t_setup + levels*(self.t_lut + self.t_net)
+        if fanout > self.fanout_free:
+            t += self.t_fanout*math.log2(fanout/self.fanout_free)
+        return t
+
+def _mux_levels(n):
+    # LUT6 levels of a n:1 mux (4:1 mux per LUT6).
+    return max(1, math.ceil(math.log(max(n, 2), 4)))
+
+def _arb_levels(n):
+    # LUT6 levels of a n ports round-robin/priority arbiter (request masking + priority encoding).
+    return 0 if n <= 1 else 1 + math.ceil(math.log(n, 6))
+
+def axis_node_timing(kind, data_width, s_count=1, m_count=1, levels=None, fanout=None):
+    # Return (in_levels, in_fanout, core_levels, core_fanout) of a core:
+    # - in_levels/in_fanout    : Input logic up to the first internal register (outputs of all the
+    #   cores are registered, except AXISSwitch with a bypassed Master register).
+    # - core_levels/core_fanout: AXISSwitch crossbar (between its S and M registers).
+    nodes = {
+        #  Kind           In Levels                             In Fanout
+        "source"       : (0,                                   1),
+        "sink"         : (1,                                   1),
+        "register"     : (1,                                   data_width),
+        "srl_register" : (1,                                   data_width),
+        "fifo"         : (2,                                   data_width),
+        "async_fifo"   : (2,                                   data_width),
+        "srl_fifo"     : (1,                                   16*data_width),
+        "adapter"      : (2,                                   data_width),
+        "rate_limit"   : (2,                                   data_width),
+        "tap"          : (2,                                   data_width),
+        "broadcast"    : (1,                                   m_count*data_width),
+        "demux"        : (1 + _mux_levels(m_count),            m_count*data_width),
+        "mux"          : (_mux_levels(s_count) + 1,            data_width),
+        "arb_mux"      : (_arb_levels(s_count) + _mux_levels(s_count), data_width),
+        "switch"       : (1,                                   data_width),
+        "custom"       : (levels if levels is not None else 1, fanout if fanout is not None else 1),
+    }
+    if kind not in nodes:
+        raise ValueError(f"Unknown node kind {kind}, available: {', '.join(nodes.keys())}.")
+    in_levels, in_fanout = nodes[kind]
+    core_levels, core_fanout = 0, 1
+    if kind == "switch":
+        core_levels = 1 + _arb_levels(s_count) + _mux_levels(s_count) # Dest decode + Arb + Mux.
+        core_fanout = m_count*data_width
+    return in_levels, in_fanout, core_levels, core_fanout
+
+# Pipeline Plan ------------------------------------------------------------------------------------
+
+class AXISPipelinePlan:
+    def __init__(self, planner):
+        self.planner   = planner
+        self.reg_types = {} # Switch node -> {"s_reg_type": AXISRegType, "m_reg_type": AXISRegType}.
+        self.edges     = {} # (Src, Dst) -> AXISRegType (inserted register, BYPASS if none).
+        self.segments  = [] # (Description, Delay (ns)) of the resulting worst segments.
+        self.unmet     = [] # (Description, Delay (ns)) of segments that can't be met with registers.
+
+    def switch_parameters(self, node):
+        # AXISSwitch reg parameters of node (ex AXISSwitch(platform, s, m, **plan.switch_parameters("sw"))).
+        return dict(self.reg_types[node])
+
+    def edge_reg_type(self, src, dst):
+        return self.edges[(src, dst)]
+
+    def connect(self, module, platform, src, dst, s_axis, m_axis):
+        # Connect s_axis (output of src) to m_axis (input of dst) with the planned register slice.
+        from verilog_axis.axis_register import AXISRegister
+        reg_type = self.edges[(src, dst)]
+        if reg_type == AXISRegType.BYPASS:
+            module.comb += s_axis.connect(m_axis)
+        else:
+            module.submodules += AXISRegister(platform, s_axis, m_axis, reg_type=reg_type)
+
+    def latency(self, path):
+        # Added latency (in cycles) along path (list of nodes).
+        latency = 0
+        for i, node in enumerate(path):
+            if node in self.reg_types:
+                latency += (self.reg_types[node]["s_reg_type"] != AXISRegType.BYPASS)
+                latency += (self.reg_types[node]["m_reg_type"] != AXISRegType.BYPASS)
+            if i + 1 < len(path):
+                latency += (self.edges[(node, path[i + 1])] != AXISRegType.BYPASS)
+        return latency
+
+    def paths(self):
+        # All paths from the nodes without inputs to the nodes without outputs.
+        planner = self.planner
+        paths   = []
+        def walk(path):
+            succs = planner.successors(path[-1])
+            if not len(succs):
+                paths.append(path)
+            for succ in succs:
+                walk(path + [succ])
+        for node in planner.nodes:
+            if not len(planner.predecessors(node)):
+                walk([node])
+        return paths
+
+    def __str__(self):
+        period = 1e9/self.planner.clk_freq
+        r = []
+        r.append(f"Target: {self.planner.clk_freq/1e6:.1f}MHz ({period:.2f}ns)")
+        for node, reg_types in self.reg_types.items():
+            r.append(f"{colorer(node)}: S Reg: {reg_types['s_reg_type'].name}, M Reg: {reg_types['m_reg_type'].name}")
+        for (src, dst), reg_type in self.edges.items():
+            if reg_type != AXISRegType.BYPASS:
+                r.append(f"{colorer(src)} -> {colorer(dst)}: {reg_type.name} register inserted")
+        for path in self.paths():
+            r.append(f"{' -> '.join(path)}: +{self.latency(path)} cycle(s)")
+        for description, delay in self.unmet:
+            r.append(colorer(f"Unmet: {description}: {delay:.2f}ns > {period:.2f}ns", color="red"))
+        return "\n".join(r)
+
+# Pipeline Planner ---------------------------------------------------------------------------------
+
+# Usage:
+#   planner = AXISPipelinePlanner(clk_freq=250e6)
+#   planner.add_node("dma",    "source", data_width=512)
+#   planner.add_node("switch", "switch", data_width=512, s_count=4, m_count=4)
+#   planner.add_node("fifo",   "fifo",   data_width=512)
+#   planner.add_edge("dma", "switch")
+#   planner.add_edge("switch", "fifo")
+#   plan = planner.plan()
+#   AXISSwitch(platform, s_axis, m_axis, **plan.switch_parameters("switch"))
+#   plan.connect(self, platform, "switch", "fifo", switch_m_axis0, fifo_s_axis)
+#
+# Nodes are processed in topological order and the combinational segments reaching each node are
+# broken when exceeding the clock period: on the Slave register of an AXISSwitch (crossbar fed by
+# its inputs), else on the Master register of an upstream AXISSwitch, else with a register inserted
+# on the edge. Registers are SKID (full throughput) unless the edge is declared with
+# full_throughput=False (SIMPLE: half the registers, inserts bubble cycles). Segments that can't be
+# met with registers (ex crossbar of a wide switch) are reported as unmet.
+
+class AXISPipelinePlanner:
+    def __init__(self, clk_freq, model=None):
+        self.clk_freq = clk_freq
+        self.model    = AXISTimingModel() if model is None else model
+        self.nodes    = {} # Name -> (Kind, Data Width, Node timing (axis_node_timing)).
+        self.edges    = {} # (Src, Dst) -> Edge parameters.
+
+    def add_node(self, name, kind, data_width, s_count=1, m_count=1, **kwargs):
+        if name in self.nodes:
+            raise ValueError(f"Node {name} already exists.")
+        self.nodes[name] = (kind, data_width, axis_node_timing(kind, data_width, s_count, m_count, **kwargs))
+
+    def add_edge(self, src, dst, levels=0, full_throughput=True):
+        # levels: Additional logic/routing levels on the edge (ex long route or SLR crossing).
+        for node in [src, dst]:
+            if node not in self.nodes:
+                raise ValueError(f"Unknown node {node}.")
+        self.edges[(src, dst)] = dict(levels=levels, full_throughput=full_throughput)
+
+    def predecessors(self, node):
+        return [src for (src, dst) in self.edges.keys() if dst == node]
+
+    def successors(self, node):
+        return [dst for (src, dst) in self.edges.keys() if src == node]
+
+    def _topological_order(self):
+        order   = []
+        visited = set()
+        active  = set()
+        def visit(node):
+            if node in active:
+                raise ValueError(f"Combinational loop through {node}.")
+            if node not in visited:
+                active.add(node)
+                for pred in self.predecessors(node):
+                    visit(pred)
+                active.remove(node)
+                visited.add(node)
+                order.append(node)
+        for node in self.nodes:
+            visit(node)
+        return order
+
+    def plan(self):
+        model  = self.model
+        period = 1e9/self.clk_freq
+        plan   = AXISPipelinePlan(self)
+        out    = {} # Node -> (Levels, Fanout) of the combinational segment at its outputs.
+        reg    = (0, 1)
+
+        def delay(segment):
+            return model.delay(*segment)
+
+        def merge(*segments):
+            return (sum(s[0] for s in segments), max(s[1] for s in segments))
+
+        def edge(pred, node):
+            return (self.edges[(pred, node)]["levels"], 1)
+
+        def check(description, segment):
+            plan.segments.append((description, delay(segment)))
+            if delay(segment) > period:
+                plan.unmet.append((description, delay(segment)))
+
+        for node in self._topological_order():
+            kind, data_width, (in_levels, in_fanout, core_levels, core_fanout) = self.nodes[node]
+            preds = self.predecessors(node)
+            for pred in preds:
+                plan.edges[(pred, node)] = AXISRegType.BYPASS
+
+            # Switch: Crossbar combinational from the inputs unless the Slave register is used.
+            if kind == "switch":
+                plan.reg_types[node] = {"s_reg_type": AXISRegType.BYPASS, "m_reg_type": AXISRegType.BYPASS}
+                arrival = max([merge(out[pred], edge(pred, node)) for pred in preds] + [reg], key=delay)
+                if delay(merge(arrival, (core_levels, core_fanout))) <= period:
+                    out[node] = merge(arrival, (core_levels, core_fanout))
+                    check(f"{node} crossbar", out[node])
+                    continue
+                plan.reg_types[node]["s_reg_type"] = AXISRegType.SKID
+                out[node] = (core_levels, core_fanout)
+                check(f"{node} crossbar", out[node])
+            else:
+                out[node] = reg
+
+            # Inputs: Up to the first internal register, broken on the Master register of an upstream
+            # switch, else with a register inserted on the edge (at the input of node).
+            for pred in preds:
+                segment = merge(out[pred], edge(pred, node), (in_levels, in_fanout))
+                if (delay(segment) > period) and (pred in plan.reg_types) and (out[pred] != reg):
+                    plan.reg_types[pred]["m_reg_type"] = AXISRegType.SKID
+                    out[pred] = reg
+                    segment   = merge(reg, edge(pred, node), (in_levels, in_fanout))
+                if (delay(segment) > period) and (delay(merge(reg, (in_levels, in_fanout))) < delay(segment)):
+                    full_throughput = self.edges[(pred, node)]["full_throughput"]
+                    plan.edges[(pred, node)] = AXISRegType.SKID if full_throughput else AXISRegType.SIMPLE
+                    check(f"{pred} -> {node} register", merge(out[pred], edge(pred, node), (1, data_width)))
+                    segment = merge(reg, (in_levels, in_fanout))
+                check(f"{pred} -> {node}", segment)
+        return plan
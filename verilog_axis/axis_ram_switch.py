@@ -6,19 +6,19 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_ram_switch.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS RAM_Switch ----------------------------------------------------------------------------------
 
-class AXISRAMSwitch(Module):
+class AXISRAMSwitch(Module, AutoCSR):
     def __init__(self, platform, s_axis, m_axis, fifo_depth=4096, cmd_fifo_depth=32,
         speedup               = 0,
         user_bad_frame_value  = 1,
@@ -31,6 +31,7 @@ class AXISRAMSwitch(Module):
         arb_type_round_robin  = 1,
         arb_lsb_high_priority = 1,
         ram_pipeline          = 2,
+        with_csr              = False,
     ):
         self.logger = logging.getLogger("AXISRAMSwitch")
 
@@ -46,31 +47,48 @@ class AXISRAMSwitch(Module):
 
         # Clock Domain.
         clock_domain = s_axis[0].clock_domain
-        self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data widths.
         s_data_width = len(s_axis[0].data)
         m_data_width = len(m_axis[0].data)
-        self.logger.info(f"Slave  Data Width: {colorer(s_data_width)}")
-        self.logger.info(f"Master Data Width: {colorer(m_data_width)}")
 
         # ID width.
         id_width = s_axis[0].id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
-        # Dest width.
-        dest_width = s_axis[0].data_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
+        # Dest width (Master, Slave Dest includes port selection in MSBs).
+        dest_width = m_axis[0].dest_width
 
         # User width.
         user_width = s_axis[0].user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
 
         # Status.
         # -------
-        self.s_overflow   = Signal(len(s_axis))
-        self.s_bad_frame  = Signal(len(s_axis))
-        self.s_good_frame = Signal(len(s_axis))
+        self.s_overflow   = Signal(len(s_axis), name="s_overflow")
+        self.s_bad_frame  = Signal(len(s_axis), name="s_bad_frame")
+        self.s_good_frame = Signal(len(s_axis), name="s_good_frame")
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(
+                ports  = axis_statistics_ports(s_axis=s_axis, m_axis=m_axis),
+                events = {
+                    "s_overflow"   : (self.s_overflow, clock_domain),
+                    "s_bad_frame"  : (self.s_bad_frame, clock_domain),
+                    "s_good_frame" : (self.s_good_frame, clock_domain),
+                },
+            )
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain"      : clock_domain,
+            "Slave  Data Width" : s_data_width,
+            "Master Data Width" : m_data_width,
+            "ID Width"          : id_width,
+            "Dest Width"        : dest_width,
+            "User Width"        : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -140,7 +158,4 @@ class AXISRAMSwitch(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "arbiter.v"))
-        platform.add_source(os.path.join(rtl_dir, "axis_adapter.v"))
-        platform.add_source(os.path.join(rtl_dir, "axis_ram_switch.v"))
+        add_verilog_sources(platform, "axis_ram_switch")
@@ -6,31 +6,44 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_rate_limit.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Rate Limit ----------------------------------------------------------------------------------
 
-class AXISRateLimit(Module):
-    def __init__(self, platform, s_axis, m_axis, last_enable=1):
-        self.logger = logging.getLogger("AXISSRLFIFO")
+class AXISRateLimit(Module, AutoCSR):
+    def __init__(self, platform, s_axis, m_axis, last_enable=1, cdc=False, adapt=False, with_csr=False):
+        self.logger = logging.getLogger("AXISRateLimit")
 
         # Control.
         # --------
-        self.rate_num      = Signal(8, reset=128)
-        self.rate_denom    = Signal(8, reset=128)
-        self.rate_by_frame = Signal()
+        self.rate_num      = Signal(8, reset=128, name="rate_num")
+        self.rate_denom    = Signal(8, reset=128, name="rate_denom")
+        self.rate_by_frame = Signal(name="rate_by_frame")
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(s_axis=s_axis, m_axis=m_axis))
 
         # Get/Check Parameters.
         # ---------------------
 
+        # Width Adaptation (Optional, AXISAdapter on the narrower side, see axis_adapt).
+        if adapt and (len(s_axis.data) != len(m_axis.data)):
+            s_axis, m_axis = axis_adapt(self, platform, s_axis, m_axis, adapt)
+
+        # Clock Domain Crossing (Optional, AXISAsyncFIFO on Slave side, see axis_cdc).
+        if cdc and (s_axis.clock_domain != m_axis.clock_domain):
+            s_axis, m_axis = axis_cdc(self, platform, s_axis, m_axis, cdc, side="s")
+
         # Clock Domain.
         clock_domain = s_axis.clock_domain
         if s_axis.clock_domain != m_axis.clock_domain:
@@ -41,24 +54,36 @@ class AXISRateLimit(Module):
                 colorer(m_axis.clock_domain),
                 colorer("the same")))
             raise AXIError()
-        else:
-            self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis.data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
+        if len(m_axis.data) != data_width:
+            self.logger.error("{} on {} (Slave: {} / Master: {}), should be {}.".format(
+                colorer("Different Data Width", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(data_width),
+                colorer(len(m_axis.data)),
+                colorer("the same")))
+            raise AXIError()
 
         # ID width.
         id_width = s_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = s_axis.dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = s_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -115,5 +140,4 @@ class AXISRateLimit(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_rate_limit.v"))
+        add_verilog_sources(platform, "axis_rate_limit")
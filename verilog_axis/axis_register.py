@@ -6,31 +6,44 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_register.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Register ------------------------------------------------------------------------------------
 
-class AXISRegister(Module):
-    def __init__(self, platform, s_axis, m_axis, last_enable=1, reg_type=2): # FIXME: Add constants.
+class AXISRegister(Module, AutoCSR):
+    def __init__(self, platform, s_axis, m_axis, last_enable=1, reg_type=AXISRegType.SKID, cdc=False, adapt=False, with_csr=False):
         self.logger = logging.getLogger("AXISRegister")
 
         # Status.
         # -------
-        self.overflow   = Signal()
-        self.bad_frame  = Signal()
-        self.good_frame = Signal()
+        self.overflow   = Signal(name="overflow")
+        self.bad_frame  = Signal(name="bad_frame")
+        self.good_frame = Signal(name="good_frame")
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(s_axis=s_axis, m_axis=m_axis))
 
         # Get/Check Parameters.
         # ---------------------
 
+        # Width Adaptation (Optional, AXISAdapter on the narrower side, see axis_adapt).
+        if adapt and (len(s_axis.data) != len(m_axis.data)):
+            s_axis, m_axis = axis_adapt(self, platform, s_axis, m_axis, adapt)
+
+        # Clock Domain Crossing (Optional, AXISAsyncFIFO on Master side, see axis_cdc).
+        if cdc and (s_axis.clock_domain != m_axis.clock_domain):
+            s_axis, m_axis = axis_cdc(self, platform, s_axis, m_axis, cdc, side="m")
+
         # Clock Domain.
         clock_domain = s_axis.clock_domain
         if s_axis.clock_domain != m_axis.clock_domain:
@@ -41,24 +54,36 @@ class AXISRegister(Module):
                 colorer(m_axis.clock_domain),
                 colorer("the same")))
             raise AXIError()
-        else:
-            self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis.data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
+        if len(m_axis.data) != data_width:
+            self.logger.error("{} on {} (Slave: {} / Master: {}), should be {}.".format(
+                colorer("Different Data Width", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(data_width),
+                colorer(len(m_axis.data)),
+                colorer("the same")))
+            raise AXIError()
 
         # ID width.
         id_width = s_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = s_axis.dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = s_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -110,5 +135,4 @@ class AXISRegister(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_register.v"))
+        add_verilog_sources(platform, "axis_register")
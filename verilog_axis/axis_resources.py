@@ -0,0 +1,300 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# FPGA resource estimator: estimates the LUT/FF/SRL/LUTRAM/BRAM usage of the wrapped Verilog-AXIS
+# cores from the parameters the wrappers pass to their Instance (DEPTH, DATA_WIDTH, S_COUNT/M_COUNT,
+# FIFO_DEPTH, ID/Dest/User enables, etc...), without synthesis. The model is linear on a few features
+# derived from these parameters (per core); its default coefficients are analytical (Xilinx 7-Series
+# mapping) and can be calibrated against Yosys synthesis results (see calibrate).
+
+import json
+import math
+
+from migen import *
+
+# Resources ----------------------------------------------------------------------------------------
+
+axis_resources = ["lut", "ff", "srl", "lutram", "bram"]
+
+# Yosys cell -> resource (BRAM in 36Kb equivalents) for the supported families.
+_yosys_cells = {
+    "xilinx" : {
+        "LUT1"      : ("lut", 1), "LUT2"      : ("lut", 1), "LUT3"     : ("lut", 1),
+        "LUT4"      : ("lut", 1), "LUT5"      : ("lut", 1), "LUT6"     : ("lut", 1),
+        "FDRE"      : ("ff", 1),  "FDSE"      : ("ff", 1),  "FDCE"     : ("ff", 1), "FDPE" : ("ff", 1),
+        "SRL16E"    : ("srl", 1), "SRLC32E"   : ("srl", 1),
+        "RAM32M"    : ("lutram", 1), "RAM64M" : ("lutram", 1), "RAM32X1D" : ("lutram", 1),
+        "RAM64X1D"  : ("lutram", 1), "RAM128X1D" : ("lutram", 1), "RAM32M16" : ("lutram", 1),
+        "RAM64M8"   : ("lutram", 1),
+        "RAMB18E1"  : ("bram", 0.5), "RAMB36E1" : ("bram", 1),
+        "RAMB18E2"  : ("bram", 0.5), "RAMB36E2" : ("bram", 1),
+    },
+    "ecp5" : {
+        "LUT4"            : ("lut", 1),
+        "TRELLIS_FF"      : ("ff", 1),
+        "TRELLIS_DPR16X4" : ("lutram", 1),
+        "DP16KD"          : ("bram", 0.5),
+    },
+    "ice40" : {
+        "SB_LUT4"     : ("lut", 1),
+        "SB_DFF"      : ("ff", 1), "SB_DFFE"   : ("ff", 1), "SB_DFFR"   : ("ff", 1),
+        "SB_DFFER"    : ("ff", 1), "SB_DFFS"   : ("ff", 1), "SB_DFFES"  : ("ff", 1),
+        "SB_DFFSR"    : ("ff", 1), "SB_DFFESR" : ("ff", 1), "SB_DFFSS"  : ("ff", 1),
+        "SB_DFFESS"   : ("ff", 1),
+        "SB_RAM40_4K" : ("bram", 4/36),
+    },
+}
+
+def yosys_stat_resources(cells, family="xilinx"):
+    # Convert the cells count of a Yosys stat report ({cell: count}) to resources.
+    if family not in _yosys_cells:
+        raise ValueError(f"Unsupported family {family}, supported: {', '.join(_yosys_cells.keys())}.")
+    resources = {r: 0 for r in axis_resources}
+    for cell, count in cells.items():
+        if cell in _yosys_cells[family]:
+            resource, weight = _yosys_cells[family][cell]
+            resources[resource] += weight*count
+    return resources
+
+# Instance Parameters ------------------------------------------------------------------------------
+
+def axis_instances(wrapper):
+    # Return the (core, parameters) of the Verilog-AXIS Instances of a wrapper (and of its
+    # submodules, ex CDC/Width adaptation or AXISAutoFIFO).
+    instances = []
+    for special in wrapper._fragment.specials:
+        if isinstance(special, Instance):
+            parameters = {}
+            for item in special.items:
+                if isinstance(item, Instance.Parameter):
+                    value = item.value
+                    parameters[item.name] = value.value if isinstance(value, Constant) else value
+            instances.append((special.of, parameters))
+    for name, submodule in wrapper._submodules:
+        instances += axis_instances(submodule)
+    return instances
+
+# Features -----------------------------------------------------------------------------------------
+
+def _log2(n):
+    return max(1, math.ceil(math.log2(max(n, 2))))
+
+def _beat_bits(p, data_width=None):
+    # Bits of a beat (tdata, tkeep, tlast, tid, tdest, tuser) as stored/registered by the cores.
+    data_width = p.get("DATA_WIDTH", 8) if data_width is None else data_width
+    keep_width = math.ceil(data_width/8) if (p.get("KEEP_ENABLE", data_width > 8)) else 0
+    id_width   = p.get("ID_WIDTH",   p.get("S_ID_WIDTH", 0))   if p.get("ID_ENABLE",   0) else 0
+    dest_width = p.get("DEST_WIDTH", p.get("M_DEST_WIDTH", 0)) if p.get("DEST_ENABLE", 0) else 0
+    user_width = p.get("USER_WIDTH", 0) if p.get("USER_ENABLE", 0) else 0
+    return data_width + keep_width + p.get("LAST_ENABLE", 1) + id_width + dest_width + user_width
+
+def _reg_bits(reg_type, bits):
+    # Registered bits of an axis_register (Bypass: 0, Simple: 1x, Skid: 2x).
+    return {0: 0, 1: bits, 2: 2*bits}[int(reg_type)]
+
+def _mux_luts(bits, n):
+    # LUT6s of a n:1 mux of bits (4:1 mux per LUT6 and per bit, 3 inputs per additional LUT).
+    return bits*math.ceil((n - 1)/3) if n > 1 else 0
+
+def _ram_features(words, bits, lutram_max_words=64):
+    # Memory of words x bits: LUTRAM (RAM64M: 64 x 3 bits) when shallow, else BRAM (RAMB36: 1K x 36).
+    if words <= lutram_max_words:
+        return {"lutram": math.ceil(bits/3)*math.ceil(words/64), "bram36": 0}
+    return {"lutram": 0, "bram36": math.ceil(bits/36)*math.ceil(words/1024)}
+
+def _fifo_features(p):
+    data_width = p.get("DATA_WIDTH", 8)
+    bits       = _beat_bits(p)
+    keep_width = math.ceil(data_width/8) if data_width > 8 else 1
+    words      = 2**_log2(p.get("DEPTH", 4096)//keep_width)
+    features   = {"addr": _log2(words), "out_bits": p.get("PIPELINE_OUTPUT", 2)*bits}
+    features.update(_ram_features(words, bits))
+    return features
+
+def _srl_fifo_features(p):
+    bits = _beat_bits(p)
+    return {"addr": _log2(p.get("DEPTH", 16)), "srl": bits*math.ceil(p.get("DEPTH", 16)/32), "out_bits": bits}
+
+def _register_features(p):
+    bits = _beat_bits(p)
+    return {"reg_bits": _reg_bits(p.get("REG_TYPE", 2), bits), "mux_bits": bits if p.get("REG_TYPE", 2) == 2 else 0}
+
+def _srl_register_features(p):
+    bits = _beat_bits(p)
+    return {"srl": bits, "out_bits": bits}
+
+def _adapter_features(p):
+    bits = max(_beat_bits(p, p.get("S_DATA_WIDTH", 8)), _beat_bits(p, p.get("M_DATA_WIDTH", 8)))
+    return {"reg_bits": 2*bits, "mux_bits": bits}
+
+def _mux_features(p):
+    bits = _beat_bits(p)
+    s    = p.get("S_COUNT", 4)
+    return {"reg_bits": 2*bits, "mux_bits": _mux_luts(bits, s), "arb": s}
+
+def _demux_features(p):
+    bits = _beat_bits(p)
+    m    = p.get("M_COUNT", 4)
+    return {"reg_bits": 2*bits, "ports": m}
+
+def _switch_features(p):
+    bits = _beat_bits(p)
+    s, m = p.get("S_COUNT", 4), p.get("M_COUNT", 4)
+    return {
+        "reg_bits" : s*_reg_bits(p.get("S_REG_TYPE", 0), bits) + m*_reg_bits(p.get("M_REG_TYPE", 2), bits),
+        "mux_bits" : m*_mux_luts(bits, s),
+        "arb"      : s*m,
+        "ports"    : s + m,
+    }
+
+def _crosspoint_features(p):
+    bits = _beat_bits(p)
+    s, m = p.get("S_COUNT", 4), p.get("M_COUNT", 4)
+    return {"reg_bits": (s + m)*bits, "mux_bits": m*_mux_luts(bits, s), "ports": s + m}
+
+def _ram_switch_features(p):
+    bits  = max(_beat_bits(p, p.get("S_DATA_WIDTH", 8)), _beat_bits(p, p.get("M_DATA_WIDTH", 8)))
+    s, m  = p.get("S_COUNT", 4), p.get("M_COUNT", 4)
+    words = 2**_log2(p.get("FIFO_DEPTH", 4096)//max(1, math.ceil(p.get("S_DATA_WIDTH", 8)/8)))
+    ram   = _ram_features(words, bits)
+    return {
+        "reg_bits" : 2*(s + m)*bits,
+        "mux_bits" : m*_mux_luts(bits, s),
+        "arb"      : s*m,
+        "addr"     : m*_log2(words),
+        "lutram"   : m*ram["lutram"],
+        "bram36"   : m*ram["bram36"],
+    }
+
+def _stat_counter_features(p):
+    counts = [p.get(f"{c}_COUNT_WIDTH", 32)*p.get(f"{c}_COUNT_ENABLE", 1) for c in ["TICK", "BYTE", "FRAME"]]
+    nbytes = sum(math.ceil(w/8) for w in counts) + math.ceil(p.get("TAG_WIDTH", 16)/8)*p.get("TAG_ENABLE", 1)
+    # Counters and their output copies, tkeep popcount on the byte counter, frame serializer.
+    return {"reg_bits": 2*sum(counts), "mux_bits": _mux_luts(8, nbytes) + math.ceil(p.get("DATA_WIDTH", 64)/8)}
+
+def _default_features(p):
+    return {"reg_bits": 2*_beat_bits(p)}
+
+_features = {
+    "axis_fifo"         : _fifo_features,
+    "axis_async_fifo"   : _fifo_features,
+    "axis_srl_fifo"     : _srl_fifo_features,
+    "axis_register"     : _register_features,
+    "axis_srl_register" : _srl_register_features,
+    "axis_adapter"      : _adapter_features,
+    "axis_mux"          : _mux_features,
+    "axis_arb_mux"      : _mux_features,
+    "axis_demux"        : _demux_features,
+    "axis_broadcast"    : _demux_features,
+    "axis_switch"       : _switch_features,
+    "axis_crosspoint"   : _crosspoint_features,
+    "axis_ram_switch"   : _ram_switch_features,
+    "axis_stat_counter" : _stat_counter_features,
+}
+
+def axis_features(core, parameters):
+    features = _features.get(core, _default_features)(parameters)
+    features["one"] = 1
+    return features
+
+# Default Coefficients -----------------------------------------------------------------------------
+
+# Resource -> {Feature: Coefficient}, shared by all the cores until calibrated.
+_default_coefficients = {
+    "lut"    : {"one": 8, "addr": 4, "out_bits": 0.5, "reg_bits": 0.5, "mux_bits": 1, "arb": 3, "ports": 2},
+    "ff"     : {"one": 4, "addr": 4, "out_bits": 1,   "reg_bits": 1,   "arb": 1,      "ports": 1},
+    "srl"    : {"srl": 1},
+    "lutram" : {"lutram": 1},
+    "bram"   : {"bram36": 1},
+}
+
+# Resource Model -----------------------------------------------------------------------------------
+
+class AXISResourceModel:
+    def __init__(self, filename=None):
+        self.family       = "xilinx"
+        self.coefficients = {} # Core -> Resource -> {Feature: Coefficient} (calibrated cores).
+        if filename is not None:
+            self.load(filename)
+
+    def _coefficients(self, core, resource):
+        return self.coefficients.get(core, {}).get(resource, _default_coefficients[resource])
+
+    # Estimation.
+    def estimate_parameters(self, core, parameters):
+        features = axis_features(core, parameters)
+        return {r: max(0, round(sum(c*features.get(f, 0) for f, c in self._coefficients(core, r).items())))
+            for r in axis_resources}
+
+    def estimate(self, wrapper):
+        # Total resources of a wrapper (all its Instances).
+        resources = {r: 0 for r in axis_resources}
+        for core, parameters in axis_instances(wrapper):
+            for r, v in self.estimate_parameters(core, parameters).items():
+                resources[r] += v
+        return resources
+
+    # Calibration.
+    def calibrate(self, samples, family="xilinx", ridge=1e-6):
+        # Fit the coefficients of each core/resource (ridge regression on the core features) from
+        # samples of (core, parameters, resources), ex resources from yosys_stat_resources.
+        self.family = family
+        cores = {}
+        for core, parameters, resources in samples:
+            cores.setdefault(core, []).append((axis_features(core, parameters), resources))
+        for core, core_samples in cores.items():
+            names = sorted(set(f for features, _ in core_samples for f in features))
+            x     = [[features.get(f, 0) for f in names] for features, _ in core_samples]
+            self.coefficients[core] = {}
+            for r in axis_resources:
+                y    = [resources.get(r, 0) for _, resources in core_samples]
+                coef = _ridge_fit(x, y, ridge)
+                self.coefficients[core][r] = {f: c for f, c in zip(names, coef) if c != 0}
+
+    def error(self, samples):
+        # Mean absolute relative error per resource (on samples with non-zero usage).
+        errors = {r: [] for r in axis_resources}
+        for core, parameters, resources in samples:
+            estimate = self.estimate_parameters(core, parameters)
+            for r in axis_resources:
+                if resources.get(r, 0):
+                    errors[r].append(abs(estimate[r] - resources[r])/resources[r])
+        return {r: (sum(e)/len(e) if len(e) else 0.0) for r, e in errors.items()}
+
+    # Save/Load.
+    def save(self, filename):
+        with open(filename, "w") as f:
+            json.dump({"family": self.family, "coefficients": self.coefficients}, f, indent=4)
+
+    def load(self, filename):
+        with open(filename) as f:
+            model = json.load(f)
+        self.family       = model["family"]
+        self.coefficients = model["coefficients"]
+
+# Ridge Regression ---------------------------------------------------------------------------------
+
+def _ridge_fit(x, y, ridge):
+    # Solve (X^T.X + ridge.I).c = X^T.y on features normalized to unit RMS (Gauss-Jordan with partial
+    # pivoting), features are few (< 10) so no numerical library is needed.
+    n     = len(x[0])
+    scale = [math.sqrt(sum(row[i]**2 for row in x)/len(x)) or 1 for i in range(n)]
+    x     = [[v/s for v, s in zip(row, scale)] for row in x]
+    xtx = [[sum(row[i]*row[j] for row in x) for j in range(n)] for i in range(n)]
+    xty = [sum(row[i]*v for row, v in zip(x, y)) for i in range(n)]
+    a   = [xtx[i] + [xty[i]] for i in range(n)]
+    for i in range(n):
+        a[i][i] += ridge*len(x)
+    for i in range(n):
+        pivot = max(range(i, n), key=lambda k: abs(a[k][i]))
+        a[i], a[pivot] = a[pivot], a[i]
+        if a[i][i] == 0:
+            continue
+        for k in range(n):
+            if k != i:
+                ratio = a[k][i]/a[i][i]
+                a[k]  = [vk - ratio*vi for vk, vi in zip(a[k], a[i])]
+    return [a[i][n]/a[i][i]/scale[i] if a[i][i] != 0 else 0 for i in range(n)]
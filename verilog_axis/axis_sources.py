@@ -0,0 +1,87 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Verilog-AXIS source registry: module -> file mapping and module dependency graph built from the
+# Verilog instantiations, used by the wrappers to add their RTL sources (with dependencies) once.
+
+import os
+import re
+import weakref
+
+# Verilog Parsing ----------------------------------------------------------------------------------
+
+_comment_re = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_module_re  = re.compile(r"\bmodule\s+([A-Za-z_]\w*)(.*?)\bendmodule\b", re.DOTALL)
+_inst_re    = re.compile(r"\b([A-Za-z_]\w*)\s*(?:#\s*\(|[A-Za-z_]\w*\s*(?:\[[^\]]*\]\s*)?\()")
+
+def _parse_verilog(filename):
+    # Return {module: set of instantiated identifiers} (identifiers are filtered against the known
+    # modules by the registry, so keywords/function calls matching the pattern are harmless).
+    with open(filename) as f:
+        content = _comment_re.sub("", f.read())
+    return {m.group(1): set(_inst_re.findall(m.group(2))) for m in _module_re.finditer(content)}
+
+# Verilog Sources ----------------------------------------------------------------------------------
+
+class VerilogSources:
+    def __init__(self, rtl_dir):
+        self.rtl_dir = rtl_dir
+        self.files   = {} # Module -> File.
+        self.deps    = {} # Module -> Instantiated modules.
+        self._cache  = {}
+
+        # Scan RTL directory (once).
+        instances = {}
+        for filename in sorted(os.listdir(rtl_dir)):
+            if not filename.endswith((".v", ".sv")):
+                continue
+            for module, idents in _parse_verilog(os.path.join(rtl_dir, filename)).items():
+                self.files[module] = os.path.join(rtl_dir, filename)
+                instances[module]  = idents
+        for module, idents in instances.items():
+            self.deps[module] = sorted(i for i in idents if (i in self.files) and (i != module))
+
+    def resolve(self, module):
+        # Return the files of module and of its (transitive) dependencies, dependencies first and
+        # each file once.
+        if module not in self._cache:
+            if module not in self.files:
+                raise ValueError(f"Unknown Verilog module {module} (not found in {self.rtl_dir}).")
+            files   = []
+            visited = set()
+            def visit(m):
+                if m in visited:
+                    return
+                visited.add(m)
+                for dep in self.deps[m]:
+                    visit(dep)
+                if self.files[m] not in files:
+                    files.append(self.files[m])
+            visit(module)
+            self._cache[module] = files
+        return self._cache[module]
+
+# Registry -----------------------------------------------------------------------------------------
+
+rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
+
+_sources          = None
+_platform_sources = weakref.WeakKeyDictionary() # Platform -> Files already added.
+
+def verilog_sources():
+    global _sources
+    if _sources is None:
+        _sources = VerilogSources(rtl_dir)
+    return _sources
+
+def add_verilog_sources(platform, module):
+    # Add the sources of module (and of its dependencies) to platform, files already added by other
+    # instances are skipped without going through platform.add_source.
+    added = _platform_sources.setdefault(platform, set())
+    for filename in verilog_sources().resolve(module):
+        if filename not in added:
+            platform.add_source(filename)
+            added.add(filename)
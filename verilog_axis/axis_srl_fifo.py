@@ -6,30 +6,66 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_srl_fifo.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS SRL FIFO ------------------------------------------------------------------------------------
 
-class AXISSRLFIFO(Module):
-    def __init__(self, platform, s_axis, m_axis, depth=16, last_enable=1):
-        assert depth <= 16
+class AXISSRLFIFO(Module, AutoCSR):
+    def __init__(self, platform, s_axis, m_axis, depth=16, last_enable=1,
+        almost_full  = None, # Almost Full threshold (default: 3/4 of depth).
+        almost_empty = None, # Almost Empty threshold (default: 1/4 of depth).
+        cdc          = False,
+        adapt        = False,
+        with_csr     = False,
+    ):
         self.logger = logging.getLogger("AXISSRLFIFO")
+        depth       = axis_fifo_depth(self, depth) # Overridden in an AXISFIFODepths context.
+        assert depth <= 16
 
         # Status.
         # -------
-        self.count = Signal()
+        # Occupancy (in beats, $clog2(DEPTH+1) bits as axis_srl_fifo).
+        self.count        = Signal(bits_for(depth), name="count") # Current.
+        self.peak         = Signal(bits_for(depth), name="peak")  # High-water mark.
+        self.almost_full  = Signal(name="almost_full")            # count >= almost_full_level.
+        self.almost_empty = Signal(name="almost_empty")           # count <= almost_empty_level.
+
+        # Control.
+        # --------
+        self.almost_full_level  = Signal(bits_for(depth), reset=(3*depth)//4 if almost_full  is None else almost_full)
+        self.almost_empty_level = Signal(bits_for(depth), reset=depth//4     if almost_empty is None else almost_empty)
+        self.peak_clear         = Signal()
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(
+                ports  = axis_statistics_ports(s_axis=s_axis, m_axis=m_axis),
+                gauges = {
+                    "count" : (self.count, s_axis.clock_domain),
+                    "peak"  : (self.peak,  s_axis.clock_domain),
+                },
+            )
 
         # Get/Check Parameters.
         # ---------------------
 
+        # Width Adaptation (Optional, AXISAdapter on the narrower side, see axis_adapt).
+        if adapt and (len(s_axis.data) != len(m_axis.data)):
+            s_axis, m_axis = axis_adapt(self, platform, s_axis, m_axis, adapt)
+
+        # Clock Domain Crossing (Optional, AXISAsyncFIFO on Master side, see axis_cdc).
+        if cdc and (s_axis.clock_domain != m_axis.clock_domain):
+            s_axis, m_axis = axis_cdc(self, platform, s_axis, m_axis, cdc, side="m")
+
         # Clock Domain.
         clock_domain = s_axis.clock_domain
         if s_axis.clock_domain != m_axis.clock_domain:
@@ -40,24 +76,36 @@ class AXISSRLFIFO(Module):
                 colorer(m_axis.clock_domain),
                 colorer("the same")))
             raise AXIError()
-        else:
-            self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis.data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
+        if len(m_axis.data) != data_width:
+            self.logger.error("{} on {} (Slave: {} / Master: {}), should be {}.".format(
+                colorer("Different Data Width", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(data_width),
+                colorer(len(m_axis.data)),
+                colorer("the same")))
+            raise AXIError()
 
         # ID width.
         id_width = s_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = s_axis.dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = s_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -107,11 +155,19 @@ class AXISSRLFIFO(Module):
             o_m_axis_tuser  = m_axis.user,
         )
 
+        # Occupancy Flags/Peak.
+        # ---------------------
+        self.comb += [
+            self.almost_full.eq(self.count  >= self.almost_full_level),
+            self.almost_empty.eq(self.count <= self.almost_empty_level),
+        ]
+        sync = getattr(self.sync, clock_domain)
+        sync += If(self.peak_clear | (self.count > self.peak), self.peak.eq(self.count))
+
         # Add Sources.
         # ------------
         self.add_sources(platform)
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_srl_fifo.v"))
+        add_verilog_sources(platform, "axis_srl_fifo")
@@ -6,25 +6,34 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_srl_register.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS SRL Register --------------------------------------------------------------------------------
 
-class AXISSRLRegister(Module):
-    def __init__(self, platform, s_axis, m_axis, last_enable=1):
+class AXISSRLRegister(Module, AutoCSR):
+    def __init__(self, platform, s_axis, m_axis, last_enable=1, adapt=False, with_csr=False):
         self.logger = logging.getLogger("AXISSRLRegister")
 
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(s_axis=s_axis, m_axis=m_axis))
+
         # Get/Check Parameters.
         # ---------------------
 
+        # Width Adaptation (Optional, AXISAdapter on the narrower side, see axis_adapt).
+        if adapt and (len(s_axis.data) != len(m_axis.data)):
+            s_axis, m_axis = axis_adapt(self, platform, s_axis, m_axis, adapt)
+
         # Clock Domain.
         clock_domain = s_axis.clock_domain
         if s_axis.clock_domain != m_axis.clock_domain:
@@ -35,24 +44,36 @@ class AXISSRLRegister(Module):
                 colorer(m_axis.clock_domain),
                 colorer("the same")))
             raise AXIError()
-        else:
-            self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis.data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
+        if len(m_axis.data) != data_width:
+            self.logger.error("{} on {} (Slave: {} / Master: {}), should be {}.".format(
+                colorer("Different Data Width", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(data_width),
+                colorer(len(m_axis.data)),
+                colorer("the same")))
+            raise AXIError()
 
         # ID width.
         id_width = s_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = s_axis.dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = s_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -103,5 +124,4 @@ class AXISSRLRegister(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_srl_register.v"))
+        add_verilog_sources(platform, "axis_srl_register")
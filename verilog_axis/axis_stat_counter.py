@@ -0,0 +1,275 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# LiteX wrapper around Alex Forencich Verilog-AXIS's axis_stat_counter.v.
+
+import math
+
+from functools import reduce
+from operator import or_
+
+from migen import *
+from migen.genlib.cdc import MultiReg, PulseSynchronizer
+
+from litex.soc.interconnect.csr import *
+from litex.soc.interconnect.axi import AXIStreamInterface
+
+from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
+from verilog_axis.axis_arb_mux import AXISArbMux
+from verilog_axis.axis_async_fifo import AXISAsyncFIFO
+
+# AXIS Stat Counter --------------------------------------------------------------------------------
+
+# Passively monitors monitor_axis (ready is an input) and counts ticks (cycles), bytes (tkeep) and
+# frames (tlast). On trigger, the counters are restarted and their values sent on m_axis (8-bit) as
+# a frame of tag, tick count, byte count and frame count, each MSB first.
+
+class AXISStatCounter(Module, AutoCSR):
+    def __init__(self, platform, monitor_axis, m_axis,
+        tag_width         = 16,
+        tick_count_width  = 32,
+        byte_count_width  = 32,
+        frame_count_width = 32,
+        with_csr          = False,
+    ):
+        self.logger = logging.getLogger("AXISStatCounter")
+
+        # Control.
+        # --------
+        self.tag     = Signal(max(1, tag_width), name="tag")
+        self.trigger = Signal(name="trigger")
+
+        # Status.
+        # -------
+        self.busy = Signal(name="busy")
+
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(monitor_axis=monitor_axis, m_axis=m_axis))
+
+        # Get/Check Parameters.
+        # ---------------------
+
+        # Clock Domain.
+        clock_domain = monitor_axis.clock_domain
+        if monitor_axis.clock_domain != m_axis.clock_domain:
+            self.logger.error("{} on {} (Monitor: {} / Master: {}), should be {}.".format(
+                colorer("Different Clock Domain", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(monitor_axis.clock_domain),
+                colorer(m_axis.clock_domain),
+                colorer("the same")))
+            raise AXIError()
+
+        # Data width.
+        data_width = len(monitor_axis.data)
+        if len(m_axis.data) != 8:
+            self.logger.error("{} on {} (Master: {}), should be {}.".format(
+                colorer("Invalid Data Width", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(len(m_axis.data)),
+                colorer("8")))
+            raise AXIError()
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain"      : clock_domain,
+            "Data Width"        : data_width,
+            "Tag Width"         : tag_width,
+            "Tick Count Width"  : tick_count_width,
+            "Byte Count Width"  : byte_count_width,
+            "Frame Count Width" : frame_count_width,
+        })
+
+        # Module instance.
+        # ----------------
+
+        self.specials += Instance("axis_stat_counter",
+            # Parameters.
+            # -----------
+            p_DATA_WIDTH         = data_width,
+            p_TAG_ENABLE         = tag_width > 0,
+            p_TAG_WIDTH          = max(1, tag_width),
+            p_TICK_COUNT_ENABLE  = tick_count_width > 0,
+            p_TICK_COUNT_WIDTH   = max(1, tick_count_width),
+            p_BYTE_COUNT_ENABLE  = byte_count_width > 0,
+            p_BYTE_COUNT_WIDTH   = max(1, byte_count_width),
+            p_FRAME_COUNT_ENABLE = frame_count_width > 0,
+            p_FRAME_COUNT_WIDTH  = max(1, frame_count_width),
+
+            # Clk / Rst.
+            # ----------
+            i_clk = ClockSignal(clock_domain),
+            i_rst = ResetSignal(clock_domain),
+
+            # AXI Monitor.
+            # ------------
+            i_monitor_axis_tkeep  = monitor_axis.keep,
+            i_monitor_axis_tvalid = monitor_axis.valid,
+            i_monitor_axis_tready = monitor_axis.ready,
+            i_monitor_axis_tlast  = monitor_axis.last,
+
+            # AXI Status Output.
+            # ------------------
+            o_m_axis_tdata  = m_axis.data,
+            o_m_axis_tvalid = m_axis.valid,
+            i_m_axis_tready = m_axis.ready,
+            o_m_axis_tlast  = m_axis.last,
+            o_m_axis_tuser  = m_axis.user,
+
+            # Configuration.
+            # --------------
+            i_tag     = self.tag,
+            i_trigger = self.trigger,
+
+            # Status.
+            # -------
+            o_busy = self.busy,
+        )
+
+        # Add Sources.
+        # ------------
+        self.add_sources(platform)
+
+    @staticmethod
+    def add_sources(platform):
+        add_verilog_sources(platform, "axis_stat_counter")
+
+# AXIS Stat Counters -------------------------------------------------------------------------------
+
+# Throughput accounting of a set of AXI-Stream interfaces (dict of name -> interface, or list named
+# port0, port1, ...): an AXISStatCounter is attached in tap mode (valid/ready/keep/last only) to each
+# interface, in its clock domain, with its index as tag. All the counters are triggered together
+# from the control CSR, from the trigger signal or every period sys clock cycles (continuous
+# accounting: bytes/ticks of each window), counts being restarted on each trigger.
+# - with_csr: Stat frames are decoded back to {name}_ticks/_bytes/_frames CSRs (updated in the
+#   interface clock domain a few cycles after the trigger, status.busy set in the meantime).
+# - m_axis  : Stat frames of all the counters are also merged (AXISArbMux, after AXISAsyncFIFOs for
+#   interfaces on other clock domains) on m_axis (8-bit) for an external collector.
+
+class AXISStatCounters(Module, AutoCSR):
+    def __init__(self, platform, ports, m_axis=None, period=None, with_csr=True,
+        tick_count_width  = 32,
+        byte_count_width  = 32,
+        frame_count_width = 32,
+    ):
+        self.logger = logging.getLogger("AXISStatCounters")
+
+        # Control.
+        # --------
+        self.trigger = Signal()
+
+        # Get/Check Parameters.
+        # ---------------------
+        if isinstance(ports, list):
+            ports = axis_statistics_ports(port=ports)
+        if not isinstance(ports, dict):
+            ports = axis_statistics_ports(port=[ports])
+        assert len(ports) < 2**16 # 16-bit tags.
+        widths = [16, tick_count_width, byte_count_width, frame_count_width]
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Ports"  : ", ".join(ports.keys()),
+            "Period" : period,
+            "CSR"    : with_csr,
+            "Stream" : m_axis is not None,
+        })
+
+        # Trigger.
+        # --------
+        trigger = Signal()
+        self.comb += trigger.eq(self.trigger)
+        if with_csr:
+            self.control = CSRStorage(fields=[
+                CSRField("trigger", size=1, offset=0, pulse=True, description="Trigger the counters."),
+            ])
+            self.status = CSRStatus(fields=[
+                CSRField("busy", size=1, offset=0, description="Counters update in progress."),
+            ])
+            self.comb += If(self.control.fields.trigger, trigger.eq(1))
+        if period is not None:
+            timer = Signal(max=period)
+            self.sync += If(timer == 0, timer.eq(period - 1)).Else(timer.eq(timer - 1))
+            self.comb += If(timer == 0, trigger.eq(1))
+
+        # Stat Counters.
+        # --------------
+        busy    = []
+        streams = []
+        for n, (name, axis) in enumerate(ports.items()):
+            clock_domain = axis.clock_domain
+            stats = AXIStreamInterface(data_width=8, user_width=1, clock_domain=clock_domain)
+            counter = AXISStatCounter(platform, axis, stats,
+                tag_width         = widths[0],
+                tick_count_width  = widths[1],
+                byte_count_width  = widths[2],
+                frame_count_width = widths[3],
+            )
+            setattr(self.submodules, f"{name}_counter", counter)
+            self.comb += counter.tag.eq(n)
+
+            # Trigger (Resynchronized to the interface clock domain).
+            if clock_domain == "sys":
+                self.comb += counter.trigger.eq(trigger)
+            else:
+                trigger_ps = PulseSynchronizer("sys", clock_domain)
+                self.submodules += trigger_ps
+                self.comb += [
+                    trigger_ps.i.eq(trigger),
+                    counter.trigger.eq(trigger_ps.o),
+                ]
+
+            # Stat frame decoding to CSRs (passive, frame is shifted in MSB first).
+            if with_csr:
+                frame = Signal(sum(8*math.ceil(w/8) for w in widths))
+                shift = Cat(stats.data, frame)[:len(frame)]
+                sync  = getattr(self.sync, clock_domain)
+                sync += If(stats.valid & stats.ready, frame.eq(shift))
+                offset = len(frame)
+                for field, width in zip(["tag", "ticks", "bytes", "frames"], widths):
+                    offset -= 8*math.ceil(width/8)
+                    if field != "tag":
+                        csr = CSRStatus(width, name=f"{name}_{field}")
+                        setattr(self, f"{name}_{field}", csr)
+                        sync += If(stats.valid & stats.ready & stats.last,
+                            csr.status.eq(shift[offset:offset + width])
+                        )
+                port_busy = Signal()
+                busy_sync = Signal()
+                self.comb += port_busy.eq(counter.busy | stats.valid)
+                self.specials += MultiReg(port_busy, busy_sync)
+                busy.append(busy_sync)
+
+            # Stat frame to m_axis clock domain.
+            if m_axis is None:
+                self.comb += stats.ready.eq(1)
+            elif clock_domain == m_axis.clock_domain:
+                streams.append(stats)
+            else:
+                cdc_stats = AXIStreamInterface(data_width=8, user_width=1, clock_domain=m_axis.clock_domain)
+                cdc = AXISAsyncFIFO(platform, stats, cdc_stats, depth=32)
+                setattr(self.submodules, f"{name}_cdc", cdc)
+                streams.append(cdc_stats)
+
+        if with_csr:
+            self.comb += self.status.fields.busy.eq(reduce(or_, busy))
+
+        # Stat Frames Merging.
+        # --------------------
+        if m_axis is not None:
+            if len(streams) == 1:
+                self.comb += streams[0].connect(m_axis)
+            else:
+                self.submodules.arb_mux = AXISArbMux(platform, streams, m_axis,
+                    last_enable          = 1,
+                    arb_type_round_robin = 1,
+                )
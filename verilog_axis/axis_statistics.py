@@ -0,0 +1,112 @@
+#
+# This file is part of LiteX-Verilog-AXIS-Test
+#
+# Copyright (c) 2022 Florent Kermarrec <florent@enjoy-digital.fr>
+# SPDX-License-Identifier: BSD-2-Clause
+
+# Hardware statistics counters of the wrappers (with_csr parameter), exposed as LiteX CSRs.
+
+from migen import *
+from migen.genlib.cdc import PulseSynchronizer
+
+from litex.soc.interconnect.csr import *
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def axis_statistics_ports(**interfaces):
+    # Name the interfaces of a wrapper for AXISStatistics (ex s_axis=[a, b], m_axis=c -> {"s_axis0": a,
+    # "s_axis1": b, "m_axis": c}).
+    ports = {}
+    for name, axis in interfaces.items():
+        if isinstance(axis, list):
+            for n, a in enumerate(axis):
+                ports[f"{name}{n}"] = a
+        else:
+            ports[name] = axis
+    return ports
+
+# AXIS Statistics ----------------------------------------------------------------------------------
+
+# Passive saturating counters (ready is never driven) of width bits:
+# - Per port: beats (valid & ready), stalls (valid & ~ready: backpressure) and idles (~valid & ready:
+#   starvation) cycles, in the clock domain of the port.
+# - Per event: status pulses of the core (ex overflow, bad_frame, good_frame), one counter per bit
+#   for vectors (ex per-port status of AXISRAMSwitch), in the given clock domain.
+# - Per gauge: value of a status signal (ex FIFO level/peak), in the given clock domain.
+# Writing control.snapshot copies all the counters (and gauges) to their CSR at once (atomic snapshot), writing
+# control.clear clears them (after the snapshot when written together); snapshot/clear can also be
+# pulsed from the logic (sys clock domain, ex periodic snapshots). Counters of other clock
+# domains than sys are snapshot/cleared through a PulseSynchronizer (a few cycles later); their CSRs
+# are stable until the next snapshot.
+
+class AXISStatistics(Module, AutoCSR):
+    def __init__(self, ports={}, events={}, gauges={}, width=32):
+        self.snapshot = Signal()
+        self.clear    = Signal()
+        self.control  = CSRStorage(fields=[
+            CSRField("snapshot", size=1, offset=0, pulse=True, description="Snapshot the counters."),
+            CSRField("clear",    size=1, offset=1, pulse=True, description="Clear the counters."),
+        ])
+
+        # # #
+
+        # Counters.
+        counters = []
+        for name, axis in ports.items():
+            counters.append((f"{name}_beats",  axis.valid &  axis.ready, axis.clock_domain))
+            counters.append((f"{name}_stalls", axis.valid & ~axis.ready, axis.clock_domain))
+            counters.append((f"{name}_idles",  ~axis.valid & axis.ready, axis.clock_domain))
+        for name, (event, clock_domain) in events.items():
+            if len(event) == 1:
+                counters.append((name, event, clock_domain))
+            else:
+                for n in range(len(event)):
+                    counters.append((f"{name}{n}", event[n], clock_domain))
+
+        # Gauges.
+        gauges = [(name, gauge, clock_domain) for name, (gauge, clock_domain) in gauges.items()]
+
+        # Snapshot/Clear (Logic or CSR, resynchronized to each clock domain).
+        snapshot = Signal()
+        clear    = Signal()
+        self.comb += [
+            snapshot.eq(self.snapshot | self.control.fields.snapshot),
+            clear.eq(self.clear | self.control.fields.clear),
+        ]
+        controls = {"sys": (snapshot, clear)}
+        for clock_domain in sorted(set(cd for _, _, cd in counters + gauges) - {"sys"}):
+            snapshot_ps = PulseSynchronizer("sys", clock_domain)
+            clear_ps    = PulseSynchronizer("sys", clock_domain)
+            self.submodules += snapshot_ps, clear_ps
+            self.comb += [
+                snapshot_ps.i.eq(snapshot),
+                clear_ps.i.eq(clear),
+            ]
+            controls[clock_domain] = (snapshot_ps.o, clear_ps.o)
+
+        # Saturating Counters/Snapshots.
+        for name, event, clock_domain in counters:
+            snapshot, clear = controls[clock_domain]
+            count  = Signal(width)
+            status = CSRStatus(width, name=name)
+            setattr(self, name, status)
+            sync = getattr(self.sync, clock_domain)
+            sync += [
+                If(event & (count != (2**width - 1)),
+                    count.eq(count + 1)
+                ),
+                If(snapshot,
+                    status.status.eq(count)
+                ),
+                If(clear,
+                    count.eq(0)
+                )
+            ]
+
+        # Gauges/Snapshots.
+        for name, gauge, clock_domain in gauges:
+            snapshot, clear = controls[clock_domain]
+            status = CSRStatus(len(gauge), name=name)
+            setattr(self, name, status)
+            sync = getattr(self.sync, clock_domain)
+            sync += If(snapshot, status.status.eq(gauge))
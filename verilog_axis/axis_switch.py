@@ -6,33 +6,40 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_switch.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Switch --------------------------------------------------------------------------------------
 
-class AXISSwitch(Module):
+class AXISSwitch(Module, AutoCSR):
     def __init__(self, platform, s_axis, m_axis,
         m_base                = 0,
         m_top                 = 0,
         update_tid            = 0,
-        s_reg_type            = 0, # FIXME: Add constants.
-        m_reg_type            = 2, # FIXME: Add constants.
+        s_reg_type            = AXISRegType.BYPASS,
+        m_reg_type            = AXISRegType.SKID,
         arb_type_round_robin  = 1,
         arb_lsb_high_priority = 1,
+        adapt                 = False,
+        with_csr              = False,
     ):
         self.logger = logging.getLogger("AXISSwitch")
 
         # FIXME: Add Logs/Checks.
         # FIXME: Add Dynamic support?
 
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(s_axis=s_axis, m_axis=m_axis))
+
         # Get/Check Parameters.
         # ---------------------
         if not isinstance(s_axis, list):
@@ -40,25 +47,41 @@ class AXISSwitch(Module):
         if not isinstance(m_axis, list):
             m_axis = [m_axis]
 
+        # Width Adaptation (Optional, AXISAdapters on the narrower ports, see axis_adapt).
+        if adapt and (len(set(len(axis.data) for axis in s_axis + m_axis)) > 1):
+            s_axis, m_axis = axis_adapt(self, platform, s_axis, m_axis, adapt)
+
         # Clock Domain.
         clock_domain = s_axis[0].clock_domain
-        self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(s_axis[0].data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
+        if any(len(axis.data) != data_width for axis in s_axis + m_axis):
+            self.logger.error("{} on {} ({}), should be {}.".format(
+                colorer("Different Data Width", color="red"),
+                colorer("AXI-Stream interfaces."),
+                colorer(", ".join(str(len(axis.data)) for axis in s_axis + m_axis)),
+                colorer("the same")))
+            raise AXIError()
 
         # ID width.
         id_width = s_axis[0].id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
-        # Dest width.
-        dest_width = s_axis[0].data_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
+        # Dest width (Master, Slave Dest includes port selection in MSBs).
+        dest_width = m_axis[0].dest_width
 
         # User width.
         user_width = s_axis[0].user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -116,7 +139,4 @@ class AXISSwitch(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "arbiter.v"))
-        platform.add_source(os.path.join(rtl_dir, "axis_register.v"))
-        platform.add_source(os.path.join(rtl_dir, "axis_switch.v"))
+        add_verilog_sources(platform, "axis_switch")
@@ -6,28 +6,39 @@
 
 # LiteX wrapper around Alex Forencich Verilog-AXIS's axi_tap.v.
 
-import os
 import math
 
 from migen import *
 
-from litex.soc.interconnect import stream
-from litex.soc.interconnect.axi import *
+from litex.soc.interconnect.csr import AutoCSR
 
 from verilog_axis.axis_common import *
+from verilog_axis.axis_statistics import AXISStatistics, axis_statistics_ports
+from verilog_axis.axis_sources import add_verilog_sources
 
 # AXIS Tap -----------------------------------------------------------------------------------------
 
-class AXISTap(Module):
+class AXISTap(Module, AutoCSR):
     def __init__(self, platform, tap_axis, m_axis,
         user_bad_frame_value = 1,
         user_bad_frame_mask  = 1,
+        cdc                  = False,
+        with_csr             = False,
     ):
         self.logger = logging.getLogger("AXISTap")
 
+        # Statistics.
+        # -----------
+        if with_csr:
+            self.submodules.statistics = AXISStatistics(ports=axis_statistics_ports(tap_axis=tap_axis, m_axis=m_axis))
+
         # Get/Check Parameters.
         # ---------------------
 
+        # Clock Domain Crossing (Optional, AXISAsyncFIFO on Master side, see axis_cdc).
+        if cdc and (tap_axis.clock_domain != m_axis.clock_domain):
+            tap_axis, m_axis = axis_cdc(self, platform, tap_axis, m_axis, cdc, side="m")
+
         # Clock Domain.
         clock_domain = tap_axis.clock_domain
         if tap_axis.clock_domain != m_axis.clock_domain:
@@ -38,24 +49,28 @@ class AXISTap(Module):
                 colorer(m_axis.clock_domain),
                 colorer("the same")))
             raise AXIError()
-        else:
-            self.logger.info(f"Clock Domain: {colorer(clock_domain)}")
 
         # Data width.
         data_width = len(tap_axis.data)
-        self.logger.info(f"Data Width: {colorer(data_width)}")
 
         # ID width.
         id_width = tap_axis.id_width
-        self.logger.info(f"ID Width: {colorer(id_width)}")
 
         # Dest width.
         dest_width = tap_axis.dest_width
-        self.logger.info(f"Dest Width: {colorer(dest_width)}")
 
         # User width.
         user_width = tap_axis.user_width
-        self.logger.info(f"User Width: {colorer(user_width)}")
+
+        # Parameters Report.
+        # ------------------
+        report_parameters(self, {
+            "Clock Domain" : clock_domain,
+            "Data Width"   : data_width,
+            "ID Width"     : id_width,
+            "Dest Width"   : dest_width,
+            "User Width"   : user_width,
+        })
 
         # Module instance.
         # ----------------
@@ -107,5 +122,4 @@ class AXISTap(Module):
 
     @staticmethod
     def add_sources(platform):
-        rtl_dir = os.path.join(os.path.dirname(__file__), "verilog", "rtl")
-        platform.add_source(os.path.join(rtl_dir, "axis_tap.v"))
+        add_verilog_sources(platform, "axis_tap")